@@ -1,12 +1,18 @@
 import os
 
-def is_image(filename):
-    return filename.lower().endswith((".jpg", ".jpeg", ".png"))
+from organizer import sniff_image_type
+
+def image_type(path):
+    # Look at the file's first bytes instead of trusting the extension
+    with open(path, "rb") as f:
+        return sniff_image_type(f.read(32))
 
 folder = "."
 
 for filename in os.listdir(folder):
-    if is_image(filename):
-        print("Image file:", filename)
+    path = os.path.join(folder, filename)
+    kind = image_type(path) if os.path.isfile(path) else None
+    if kind:
+        print("Image file:", filename, f"({kind})")
     else:
         print("Not an image:", filename)
@@ -1,55 +1,867 @@
 import os
+import errno
+import hashlib
+import json
+import mmap
+import select
 import shutil
+import struct
 import sys
+import time
 import argparse
+import ctypes
+import ctypes.util
+import zlib
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 LOG_FILE = "organizer_log.txt"
+IMAGE_DIR = "images"
+OTHER_DIR = "other_files"
 
-def log(message):
+# Cross-device copies run in a thread pool; same-device moves are plain renames
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+COPY_CHUNK = 8 * 1024 * 1024
+
+# Dedupe: hash the first PARTIAL_HASH_BYTES of same-size files before hashing them fully
+DUPLICATES_DIR = "duplicates"
+DUPLICATES_REPORT = "duplicates_report.txt"
+PARTIAL_HASH_BYTES = 64 * 1024
+
+# --sort-by date/camera only reads this much of each file (grown for large EXIF blocks)
+HEADER_BYTES = 16 * 1024
+MAX_HEADER_BYTES = 128 * 1024
+SORT_MODES = ("type", "date", "camera")
+
+# Incremental runs remember (size, mtime) per entry; --watch waits this long
+# after the last write before touching a new file
+STATE_FILE = ".organizer_state.json"
+WATCH_DEBOUNCE = 2.0
+WATCH_POLL_INTERVAL = 1.0
+
+# Log lines are buffered and written in batches instead of reopening the log per file
+LOG_FLUSH_EVERY = 1000
+_log_buffer = []
+
+def log(message, echo=True):
+    _log_buffer.append(message)
+    if echo:
+        print(message)
+    if len(_log_buffer) >= LOG_FLUSH_EVERY:
+        flush_log()
+
+def flush_log():
+    if not _log_buffer:
+        return
     with open(LOG_FILE, "a") as f:
-        f.write(message + "\n")
-    print(message)
+        f.write("\n".join(_log_buffer) + "\n")
+    _log_buffer.clear()
 
 def is_image(filename):
     return filename.lower().endswith((".jpg", ".jpeg", ".png"))
 
-def main(folder, dry_run=False):
-    files = os.listdir(folder)
+# Magic bytes -> image type, checked against the start of the file
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"BM", "bmp"),
+)
+
+# EXIF tags we care about
+EXIF_MAKE = 0x010F
+EXIF_MODEL = 0x0110
+EXIF_DATETIME = 0x0132
+EXIF_SOFTWARE = 0x0131
+EXIF_IFD_POINTER = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+
+def sniff_image_type(header):
+    """
+    Return the image type from the first bytes of a file ('jpeg', 'png', 'webp', ...),
+    or None if it is not an image we recognize.
+    """
+    for magic, kind in IMAGE_SIGNATURES:
+        if header.startswith(magic):
+            return kind
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header[4:8] == b"ftyp" and header[8:12] in (b"heic", b"heix", b"mif1", b"msf1", b"avif"):
+        return "avif" if header[8:12] == b"avif" else "heic"
+    return None
+
+def _parse_tiff_tags(data):
+    """
+    Read ASCII tags (make, model, dates, software) from a TIFF/EXIF block,
+    following the Exif sub-IFD pointer. Offsets outside data are ignored.
+    """
+    if data[:2] == b"II":
+        endian = "<"
+    elif data[:2] == b"MM":
+        endian = ">"
+    else:
+        return {}
+
+    tags = {}
+
+    def read_ifd(offset, depth=0):
+        if depth > 2 or offset + 2 > len(data):
+            return
+        (count,) = struct.unpack_from(endian + "H", data, offset)
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            if entry + 12 > len(data):
+                return
+            tag, typ, n, value = struct.unpack_from(endian + "HHII", data, entry)
+            if tag == EXIF_IFD_POINTER:
+                read_ifd(value, depth + 1)
+            elif typ == 2 and tag in (EXIF_MAKE, EXIF_MODEL, EXIF_DATETIME, EXIF_SOFTWARE, EXIF_DATETIME_ORIGINAL):
+                start = entry + 8 if n <= 4 else value
+                raw = data[start:start + n]
+                tags[tag] = raw.split(b"\x00", 1)[0].decode("latin-1").strip()
+
+    (ifd0,) = struct.unpack_from(endian + "I", data, 4)
+    read_ifd(ifd0)
+    return tags
+
+def _jpeg_exif(header):
+    """
+    Walk JPEG segments up to the image data and return the APP1 Exif payload.
+    Returns (payload, needed_bytes): needed_bytes > len(header) means the
+    Exif block is cut off and the caller should read more.
+    """
+    offset = 2
+    while offset + 4 <= len(header):
+        if header[offset] != 0xFF:
+            return None, 0
+        marker = header[offset + 1]
+        if marker == 0xDA:  # start of scan: pixel data begins
+            return None, 0
+        (length,) = struct.unpack_from(">H", header, offset + 2)
+        if marker == 0xE1 and header[offset + 4:offset + 10] == b"Exif\x00\x00":
+            end = offset + 2 + length
+            if end > len(header):
+                return None, end
+            return header[offset + 10:end], 0
+        offset += 2 + length
+    return None, 0
+
+def _png_text_chunks(header):
+    """
+    Collect tEXt/zTXt/iTXt keywords (and an eXIf block) from the PNG chunks
+    that come before the first IDAT.
+    """
+    texts = {}
+    exif = None
+    offset = 8
+    while offset + 8 <= len(header):
+        length, kind = struct.unpack_from(">I4s", header, offset)
+        data = header[offset + 8:offset + 8 + length]
+        if kind == b"IDAT" or len(data) < length:
+            break
+        try:
+            if kind == b"tEXt":
+                key, _, value = data.partition(b"\x00")
+                texts[key.decode("latin-1")] = value.decode("latin-1")
+            elif kind == b"zTXt":
+                key, _, value = data.partition(b"\x00")
+                texts[key.decode("latin-1")] = zlib.decompress(value[1:]).decode("latin-1")
+            elif kind == b"iTXt":
+                key, _, rest = data.partition(b"\x00")
+                compressed, rest = rest[0], rest[2:]
+                _, _, rest = rest.partition(b"\x00")  # language tag
+                _, _, value = rest.partition(b"\x00")  # translated keyword
+                if compressed:
+                    value = zlib.decompress(value)
+                texts[key.decode("latin-1")] = value.decode("utf-8", errors="replace")
+            elif kind == b"eXIf":
+                exif = data
+        except (zlib.error, IndexError):
+            pass
+        offset += 12 + length
+    return texts, exif
+
+def _parse_date(value):
+    """
+    Parse EXIF ('2024:05:01 12:00:00'), ISO 8601 or RFC 1123 dates. Returns a datetime or None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return datetime.strptime(value[:19], "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+def read_image_metadata(path):
+    """
+    Classify a file from its header only: sniff the real type from magic bytes
+    and pull the capture date and camera/software from EXIF or PNG text chunks.
+    Pixel data is never read or decoded.
+
+    Returns {"type": str | None, "date": datetime | None, "camera": str | None}.
+    """
+    info = {"type": None, "date": None, "camera": None}
+    with open(path, "rb") as f:
+        header = f.read(HEADER_BYTES)
+
+        info["type"] = sniff_image_type(header)
+        tags = {}
+
+        if info["type"] == "jpeg":
+            exif, needed = _jpeg_exif(header)
+            if needed and needed <= MAX_HEADER_BYTES:
+                header += f.read(needed - len(header))
+                exif, _ = _jpeg_exif(header)
+            if exif:
+                tags = _parse_tiff_tags(exif)
+        elif info["type"] == "tiff":
+            tags = _parse_tiff_tags(header)
+        elif info["type"] == "png":
+            texts, exif = _png_text_chunks(header)
+            if exif:
+                tags = _parse_tiff_tags(exif)
+            date_text = texts.get("Creation Time") or texts.get("date:create") or texts.get("DateTimeOriginal")
+            if date_text and EXIF_DATETIME_ORIGINAL not in tags:
+                info["date"] = _parse_date(date_text)
+            if texts.get("Software") and EXIF_SOFTWARE not in tags:
+                tags[EXIF_SOFTWARE] = texts["Software"]
+
+    if info["date"] is None:
+        info["date"] = _parse_date(tags.get(EXIF_DATETIME_ORIGINAL) or tags.get(EXIF_DATETIME))
+
+    camera = " ".join(t for t in (tags.get(EXIF_MAKE), tags.get(EXIF_MODEL)) if t)
+    info["camera"] = camera or tags.get(EXIF_SOFTWARE) or None
+    return info
+
+def classify_files(files, workers=DEFAULT_WORKERS):
+    """
+    Run read_image_metadata over (filename, full_path) files in a thread pool.
+    Returns {full_path: info}; unreadable files get an all-None info.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(read_image_metadata, path): path for _, path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+            except (OSError, struct.error, ValueError) as e:
+                log(f"ERROR reading header of {path}: {e}")
+                results[path] = {"type": None, "date": None, "camera": None}
+    return results
+
+def _safe_folder_name(name):
+    cleaned = "".join(c if c.isalnum() or c in " -_." else "_" for c in name).strip(" .")
+    return cleaned or "unknown"
+
+def scan_folder(folder):
+    """
+    Return (filename, full_path) for every regular file directly inside folder.
+
+    Uses os.scandir so the file-type check comes from the directory entry
+    itself instead of an extra stat per file.
+    """
+    files = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            # Skip directories
+            if entry.is_dir():
+                continue
+
+            # Skip this script and log file
+            if entry.name in ("organizer.py", LOG_FILE, DUPLICATES_REPORT, STATE_FILE):
+                continue
+
+            files.append((entry.name, entry.path))
+    return files
+
+def load_state(folder):
+    """
+    Load the incremental state file: {"hashes": {relpath: [size, mtime, partial_hash, full_hash]}},
+    the hash cache --dedupe reuses between runs.
+    """
+    path = os.path.join(folder, STATE_FILE)
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        state = {}
+    state.pop("entries", None)  # per-entry skip list written by older versions
+    state.setdefault("hashes", {})
+    return state
+
+def save_state(folder, state):
+    path = os.path.join(folder, STATE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def _copy_file_data(src_f, dst_f, size):
+    """
+    Copy size bytes between two open files inside the kernel when possible:
+    copy_file_range first, then sendfile, then a plain buffered copy.
+    """
+    src_fd, dst_fd = src_f.fileno(), dst_f.fileno()
+    copied = 0
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < size:
+                n = os.copy_file_range(src_fd, dst_fd, min(COPY_CHUNK, size - copied))
+                if n == 0:
+                    break
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        try:
+            while copied < size:
+                n = os.sendfile(dst_fd, src_fd, copied, min(COPY_CHUNK, size - copied))
+                if n == 0:
+                    break
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in (errno.ENOSYS, errno.EINVAL):
+                raise
+
+    src_f.seek(copied)
+    dst_f.seek(copied)
+    shutil.copyfileobj(src_f, dst_f, COPY_CHUNK)
+    return size
 
-    for filename in files:
-        full_path = os.path.join(folder, filename)
+def copy_then_delete(source, target):
+    """
+    Move a file across filesystems: copy the bytes, keep timestamps/permissions,
+    check the copy has the source's size, and only then delete the source.
 
-        # Skip directories
-        if os.path.isdir(full_path):
+    Returns the number of bytes copied.
+    """
+    size = os.stat(source).st_size
+
+    with open(source, "rb") as src_f:
+        dst_f = open(target, "wb")
+        try:
+            with dst_f:
+                _copy_file_data(src_f, dst_f, size)
+
+            copied_size = os.stat(target).st_size
+            if copied_size != size:
+                raise OSError(f"Size mismatch after copy ({copied_size} != {size} bytes): {source}")
+
+            shutil.copystat(source, target)
+        except BaseException:
+            # A failed move leaves only the source, never a partial copy
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+            raise
+
+    os.remove(source)
+    return size
+
+def is_same_device(path_a, path_b):
+    return os.stat(path_a).st_dev == os.stat(path_b).st_dev
+
+def plan_moves(files, image_dir, other_dir, classifications=None, sort_by="type"):
+    """
+    Return (filename, source, target, target_label) for each file.
+
+    With classifications (from classify_files), images are detected by their
+    magic bytes instead of the extension, and sort_by 'date' or 'camera' puts
+    them in images/<YYYY-MM>/ or images/<camera>/ subfolders. Files without a
+    capture date fall back to their modification time.
+    """
+    moves = []
+    for filename, full_path in files:
+        info = classifications.get(full_path) if classifications is not None else None
+
+        if info is None:
+            if is_image(filename):
+                moves.append((filename, full_path, os.path.join(image_dir, filename), IMAGE_DIR))
+            else:
+                moves.append((filename, full_path, os.path.join(other_dir, filename), OTHER_DIR))
+            continue
+
+        if not info["type"]:
+            moves.append((filename, full_path, os.path.join(other_dir, filename), OTHER_DIR))
+            continue
+
+        if sort_by == "date":
+            taken = info["date"] or datetime.fromtimestamp(os.stat(full_path).st_mtime)
+            bucket = taken.strftime("%Y-%m")
+        elif sort_by == "camera":
+            bucket = _safe_folder_name(info["camera"] or "unknown_camera")
+        else:
+            bucket = ""
+
+        label = f"{IMAGE_DIR}/{bucket}" if bucket else IMAGE_DIR
+        moves.append((filename, full_path, os.path.join(image_dir, bucket, filename), label))
+    return moves
+
+def _move_message(filename, label):
+    kind = "image" if label.startswith(IMAGE_DIR) else "file"
+    return f"Moved {kind}: {filename} → {label}/"
+
+def move_files(moves, quiet=False, workers=DEFAULT_WORKERS):
+    """
+    Move every planned file.
+
+    Same-device moves use os.rename (a metadata-only operation). Moves whose
+    target directory sits on another filesystem, or that fail with EXDEV,
+    are copied in a thread pool with copy_then_delete.
+
+    Returns stats: renamed, copied, bytes_copied, failed, copy_seconds, workers.
+    """
+    stats = {"renamed": 0, "copied": 0, "bytes_copied": 0, "failed": 0, "copy_seconds": 0.0, "workers": 0}
+    cross_device = []
+    device_cache = {}
+
+    for filename, source, target, label in moves:
+        target_dir = os.path.dirname(target)
+        source_dir = os.path.dirname(source)
+        key = (source_dir, target_dir)
+        if key not in device_cache:
+            device_cache[key] = is_same_device(source_dir, target_dir)
+
+        if not device_cache[key]:
+            cross_device.append((filename, source, target, label))
             continue
 
-        # Skip this script and log file
-        if filename in ("organizer.py", LOG_FILE):
+        try:
+            os.rename(source, target)
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                cross_device.append((filename, source, target, label))
+                continue
+            stats["failed"] += 1
+            log(f"ERROR moving {filename}: {e}")
             continue
 
-        # Target directories inside the same folder
-        image_dir = os.path.join(folder, "images")
-        other_dir = os.path.join(folder, "other_files")
+        stats["renamed"] += 1
+        log(_move_message(filename, label), echo=not quiet)
+
+    if not cross_device:
+        return stats
+
+    stats["workers"] = min(workers, len(cross_device))
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=stats["workers"]) as pool:
+        futures = {
+            pool.submit(copy_then_delete, source, target): (filename, label)
+            for filename, source, target, label in cross_device
+        }
+        for future in as_completed(futures):
+            filename, label = futures[future]
+            try:
+                stats["bytes_copied"] += future.result()
+            except OSError as e:
+                stats["failed"] += 1
+                log(f"ERROR copying {filename}: {e}")
+                continue
+            stats["copied"] += 1
+            log(_move_message(filename, label) + " (cross-device copy)", echo=not quiet)
+
+    stats["copy_seconds"] = time.perf_counter() - start
+    return stats
+
+def report_move_stats(stats, elapsed):
+    moved = stats["renamed"] + stats["copied"]
+    log(
+        f"Moved {moved} files in {elapsed:.2f}s "
+        f"({stats['renamed']} renamed, {stats['copied']} cross-device copies, {stats['failed']} failed)"
+    )
+    if stats["copied"]:
+        mb = stats["bytes_copied"] / (1024 * 1024)
+        seconds = stats["copy_seconds"] or 1e-9
+        log(
+            f"Cross-device copies: {mb:.1f} MB with {stats['workers']} workers "
+            f"→ {mb / seconds:.1f} MB/s, {stats['copied'] / seconds:.1f} files/s"
+        )
+
+def organize_files(files, folder, dry_run=False, quiet=False, target=None, workers=DEFAULT_WORKERS, sort_by="type"):
+    """
+    Sort the given (filename, full_path) files into images/ and other_files/.
+
+    sort_by 'date' or 'camera' classifies files by their headers first
+    (see read_image_metadata) and files images into dated/camera subfolders.
+    """
+    # Target directories (inside the folder unless --target points elsewhere),
+    # created once, not per file
+    target_root = target or folder
+    image_dir = os.path.join(target_root, IMAGE_DIR)
+    other_dir = os.path.join(target_root, OTHER_DIR)
+
+    classifications = None
+    if sort_by != "type" and files:
+        start = time.perf_counter()
+        classifications = classify_files(files, workers=workers)
+        log(f"Classified {len(files)} files from headers in {time.perf_counter() - start:.2f}s")
+
+    moves = plan_moves(files, image_dir, other_dir, classifications=classifications, sort_by=sort_by)
+
+    if dry_run:
+        for filename, _, _, label in moves:
+            kind = "image" if label.startswith(IMAGE_DIR) else "file"
+            log(f"[DRY RUN] Would move {kind}: {filename} → {label}/", echo=not quiet)
+        flush_log()
+        return len(moves)
 
+    if moves:
         os.makedirs(image_dir, exist_ok=True)
         os.makedirs(other_dir, exist_ok=True)
+        for target_dir in {os.path.dirname(t) for _, _, t, _ in moves}:
+            os.makedirs(target_dir, exist_ok=True)
 
-        if is_image(filename):
-            source = full_path
-            target = os.path.join(image_dir, filename)
-            if dry_run:
-                log(f"[DRY RUN] Would move image: {filename} → images/")
-            else:
-                shutil.move(source, target)
-                log(f"Moved image: {filename} → images/")
+        start = time.perf_counter()
+        stats = move_files(moves, quiet=quiet, workers=workers)
+        report_move_stats(stats, time.perf_counter() - start)
+
+    flush_log()
+    return len(moves)
+
+def main(folder, dry_run=False, quiet=False, target=None, workers=DEFAULT_WORKERS, sort_by="type"):
+    # Every top-level file is moved out, so each run only ever sees new arrivals
+    # (or files a failed move left behind); there is nothing worth skipping here.
+    files = scan_folder(folder)
+    return organize_files(
+        files, folder, dry_run=dry_run, quiet=quiet, target=target, workers=workers, sort_by=sort_by
+    )
+
+def scan_images(folder):
+    """
+    Return (full_path, size, mtime) for every image under folder, recursively,
+    skipping the duplicates/ folder.
+    """
+    images = []
+    pending = [folder]
+    while pending:
+        current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != DUPLICATES_DIR:
+                        pending.append(entry.path)
+                    continue
+                if entry.is_file() and is_image(entry.name):
+                    st = entry.stat()
+                    images.append((entry.path, st.st_size, st.st_mtime))
+    return images
+
+def hash_file(path, limit=None):
+    """
+    BLAKE2b of the file contents (or of the first `limit` bytes) via a memory map,
+    so the kernel pages the file in without extra copies into Python buffers.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                end = len(mm) if limit is None else min(limit, len(mm))
+                for offset in range(0, end, COPY_CHUNK):
+                    digest.update(view[offset:min(offset + COPY_CHUNK, end)])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+def _group_by_hash(candidates, workers, limit=None, cache=None):
+    """
+    Hash candidate paths in parallel and return {(size, digest): [entries]} for
+    groups that still have more than one member.
+
+    cache maps path -> [size, mtime, partial_hash, full_hash]; hashes for
+    unchanged files are reused from it and new ones are stored in it.
+    """
+    slot = 2 if limit is not None else 3
+    groups = {}
+    to_hash = []
+    for path, size, mtime in candidates:
+        cached = cache.get(path) if cache is not None else None
+        if cached and cached[0] == size and cached[1] == mtime and cached[slot]:
+            groups.setdefault((size, cached[slot]), []).append((path, size, mtime))
         else:
-            source = full_path
-            target = os.path.join(other_dir, filename)
+            to_hash.append((path, size, mtime))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(hash_file, path, limit): (path, size, mtime) for path, size, mtime in to_hash}
+        for future in as_completed(futures):
+            path, size, mtime = futures[future]
+            try:
+                digest = future.result()
+            except (OSError, ValueError) as e:
+                log(f"ERROR hashing {path}: {e}")
+                continue
+            groups.setdefault((size, digest), []).append((path, size, mtime))
+            if cache is not None:
+                cached = cache.get(path)
+                if not cached or cached[0] != size or cached[1] != mtime:
+                    cached = cache[path] = [size, mtime, None, None]
+                cached[slot] = digest
+    return {key: entries for key, entries in groups.items() if len(entries) > 1}
+
+def find_duplicates(images, workers=DEFAULT_WORKERS, cache=None):
+    """
+    Group identical images in three passes:
+      1. by size (no reads at all, unique sizes are done),
+      2. by a hash of the first PARTIAL_HASH_BYTES,
+      3. by a full hash, only for files larger than the partial window.
+
+    Returns (groups, stats) where each group is a list of (path, size, mtime).
+    Pass a cache dict (see _group_by_hash) to skip re-hashing unchanged files.
+    """
+    by_size = {}
+    for path, size, mtime in images:
+        if size > 0:
+            by_size.setdefault(size, []).append((path, size, mtime))
+
+    candidates = [entry for entries in by_size.values() if len(entries) > 1 for entry in entries]
+    partial_groups = _group_by_hash(candidates, workers, limit=PARTIAL_HASH_BYTES, cache=cache)
+
+    groups = []
+    needs_full = []
+    for (size, _), entries in partial_groups.items():
+        if size <= PARTIAL_HASH_BYTES:
+            groups.append(entries)  # the partial hash already covered the whole file
+        else:
+            needs_full.extend(entries)
+
+    groups.extend(_group_by_hash(needs_full, workers, cache=cache).values())
+
+    stats = {
+        "scanned": len(images),
+        "size_candidates": len(candidates),
+        "full_hashed": len(needs_full),
+    }
+    return groups, stats
+
+def _unique_target(directory, filename):
+    target = os.path.join(directory, filename)
+    stem, ext = os.path.splitext(filename)
+    counter = 1
+    while os.path.exists(target):
+        target = os.path.join(directory, f"{stem}_{counter}{ext}")
+        counter += 1
+    return target
+
+def dedupe(folder, dry_run=False, quiet=False, workers=DEFAULT_WORKERS, incremental=False):
+    """
+    Move duplicate images to duplicates/ and write duplicates_report.txt.
+
+    In each group the oldest file (by mtime, then path) is kept in place.
+    With incremental=True, hashes from earlier runs are reused for files whose
+    size and mtime have not changed.
+    Returns the number of duplicates found.
+    """
+    start = time.perf_counter()
+    images = scan_images(folder)
+
+    state = cache = None
+    if incremental:
+        state = load_state(folder)
+        # The state file stores paths relative to the folder
+        cache = {
+            os.path.join(folder, rel): entry
+            for rel, entry in state["hashes"].items()
+        }
+
+    groups, stats = find_duplicates(images, workers=workers, cache=cache)
+    duplicates_dir = os.path.join(folder, DUPLICATES_DIR)
+
+    report_lines = [
+        f"Duplicate report for: {folder}",
+        f"Images scanned: {stats['scanned']}, same-size candidates: {stats['size_candidates']}, "
+        f"fully hashed: {stats['full_hashed']}",
+        "",
+    ]
+    duplicate_count = 0
+    wasted_bytes = 0
+
+    if groups and not dry_run:
+        os.makedirs(duplicates_dir, exist_ok=True)
+
+    for group in sorted(groups, key=lambda g: min(path for path, _, _ in g)):
+        group.sort(key=lambda entry: (entry[2], entry[0]))
+        (keep_path, size, _), duplicates = group[0], group[1:]
+        report_lines.append(f"KEEP {os.path.relpath(keep_path, folder)} ({size} bytes)")
+
+        for path, _, _ in duplicates:
+            duplicate_count += 1
+            wasted_bytes += size
+            rel = os.path.relpath(path, folder)
             if dry_run:
-                log(f"[DRY RUN] Would move file: {filename} → other_files/")
+                report_lines.append(f"  DUPLICATE {rel}")
+                log(f"[DRY RUN] Would move duplicate: {rel} → {DUPLICATES_DIR}/", echo=not quiet)
+                continue
+
+            target = _unique_target(duplicates_dir, os.path.basename(path))
+            try:
+                shutil.move(path, target)
+            except OSError as e:
+                report_lines.append(f"  DUPLICATE {rel} (move failed: {e})")
+                log(f"ERROR moving duplicate {rel}: {e}")
+                continue
+            report_lines.append(f"  DUPLICATE {rel} → {os.path.relpath(target, folder)}")
+            log(f"Moved duplicate: {rel} → {DUPLICATES_DIR}/", echo=not quiet)
+        report_lines.append("")
+
+    report_lines.append(
+        f"{duplicate_count} duplicates in {len(groups)} groups, "
+        f"{wasted_bytes / (1024 * 1024):.1f} MB reclaimable"
+    )
+
+    report_path = os.path.join(folder, DUPLICATES_REPORT)
+    with open(report_path, "w") as f:
+        f.write("\n".join(report_lines) + "\n")
+
+    if state is not None and not dry_run:
+        live = {path for path, _, _ in images}
+        state["hashes"] = {
+            os.path.relpath(path, folder): entry
+            for path, entry in cache.items()
+            if path in live and os.path.exists(path)
+        }
+        save_state(folder, state)
+
+    log(
+        f"Dedupe: {stats['scanned']} images, {duplicate_count} duplicates in {len(groups)} groups "
+        f"({time.perf_counter() - start:.2f}s). Report: {report_path}"
+    )
+    flush_log()
+    return duplicate_count
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+def _open_inotify(folder):
+    """
+    Return an inotify fd watching folder for new/written files, or None when
+    inotify is not available (e.g. macOS), in which case --watch polls.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(folder), mask) < 0:
+            os.close(fd)
+            return None
+    except (OSError, AttributeError):
+        return None
+    return fd
+
+def _read_inotify_names(fd):
+    """
+    Drain pending inotify events and return the file names they mention.
+    """
+    names = set()
+    while True:
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            break
+        if not data:
+            break
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            _, _, _, name_len = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            if name:
+                names.add(os.fsdecode(name))
+    return names
+
+def watch(folder, quiet=False, target=None, workers=DEFAULT_WORKERS, debounce=WATCH_DEBOUNCE, sort_by="type"):
+    """
+    Keep organizing new files as they land in folder until interrupted.
+
+    A file is only moved once it has had no write events for `debounce`
+    seconds and its size is unchanged since the last check, so downloads
+    that are still being written are left alone.
+    """
+    fd = _open_inotify(folder)
+    log(f"Watching {folder} ({'inotify' if fd is not None else 'polling'}, debounce={debounce}s). Ctrl+C to stop.")
+
+    pending = {}  # filename -> [last_event_time, last_seen_size]
+    known = {name for name, _ in scan_folder(folder)}
+
+    try:
+        while True:
+            now = time.monotonic()
+
+            if fd is not None:
+                ready, _, _ = select.select([fd], [], [], WATCH_POLL_INTERVAL)
+                changed = _read_inotify_names(fd) if ready else set()
             else:
-                shutil.move(source, target)
-                log(f"Moved file: {filename} → other_files/")
+                time.sleep(WATCH_POLL_INTERVAL)
+                listing = {name for name, _ in scan_folder(folder)}
+                changed = listing - known
+                known = listing
+
+            for name in changed:
+                entry = pending.setdefault(name, [now, -1])
+                entry[0] = now
+
+            ready_files = []
+            for name, entry in list(pending.items()):
+                if now - entry[0] < debounce:
+                    continue
+                full_path = os.path.join(folder, name)
+                try:
+                    st = os.stat(full_path)
+                except FileNotFoundError:
+                    del pending[name]
+                    continue
+                if os.path.isdir(full_path) or name in (
+                    "organizer.py", LOG_FILE, DUPLICATES_REPORT, STATE_FILE
+                ):
+                    del pending[name]
+                    continue
+                if st.st_size != entry[1]:
+                    # Still growing (or first check): wait another debounce window
+                    entry[0], entry[1] = now, st.st_size
+                    continue
+                del pending[name]
+                ready_files.append((name, full_path))
+
+            if ready_files:
+                organize_files(ready_files, folder, quiet=quiet, target=target, workers=workers, sort_by=sort_by)
+                known -= {name for name, _ in ready_files}
+    except KeyboardInterrupt:
+        log("Stopped watching.")
+    finally:
+        if fd is not None:
+            os.close(fd)
+        flush_log()
 
 if __name__ == "__main__":
     # Use argparse for robust CLI parsing
@@ -65,6 +877,50 @@ if __name__ == "__main__":
         action="store_true",
         help="Show what would be done without moving any files.",
     )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Only write per-file messages to the log file, not the terminal.",
+    )
+    parser.add_argument(
+        "--target",
+        default=None,
+        help="Put images/ and other_files/ under this folder instead (may be on another drive).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Parallel copies / hashes (default: {DEFAULT_WORKERS}).",
+    )
+    parser.add_argument(
+        "--sort-by",
+        choices=SORT_MODES,
+        default="type",
+        help="type = by extension (default); date/camera = sniff real type from file headers "
+        "and file images into images/YYYY-MM/ or images/<camera>/.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"With --dedupe, reuse content hashes of images unchanged since the last run (cached in {STATE_FILE}).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After organizing, keep running and organize new files as they appear.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=WATCH_DEBOUNCE,
+        help=f"Seconds a new file must stay unchanged before --watch moves it (default: {WATCH_DEBOUNCE}).",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Instead of organizing, move duplicate images (same content) into duplicates/.",
+    )
 
     args = parser.parse_args()
 
@@ -77,5 +933,29 @@ if __name__ == "__main__":
         sys.exit(1)
 
     log(f"Starting organizer on folder: {folder} (dry_run={dry_run})")
-    main(folder, dry_run=dry_run)
-    log("Organizer finished.")
+    try:
+        target = os.path.expanduser(args.target) if args.target else None
+        workers = max(1, args.workers)
+        if args.dedupe:
+            dedupe(folder, dry_run=dry_run, quiet=args.quiet, workers=workers, incremental=args.incremental)
+        else:
+            main(
+                folder,
+                dry_run=dry_run,
+                quiet=args.quiet,
+                target=target,
+                workers=workers,
+                sort_by=args.sort_by,
+            )
+            if args.watch and not dry_run:
+                watch(
+                    folder,
+                    quiet=args.quiet,
+                    target=target,
+                    workers=workers,
+                    debounce=args.debounce,
+                    sort_by=args.sort_by,
+                )
+    finally:
+        log("Organizer finished.")
+        flush_log()
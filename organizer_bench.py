@@ -0,0 +1,97 @@
+import os
+import shutil
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+
+import organizer
+
+# Mix of extensions roughly matching our asset dumps
+EXTENSIONS = (".png", ".jpg", ".jpeg", ".txt", ".mp4", ".json", ".psd")
+
+def make_synthetic_tree(folder, count):
+    """
+    Fill folder with `count` small files plus a few subdirectories to skip.
+    """
+    for i in range(count):
+        ext = EXTENSIONS[i % len(EXTENSIONS)]
+        with open(os.path.join(folder, f"asset_{i:07d}{ext}"), "wb") as f:
+            f.write(b"x")
+    for name in ("renders", "archive", "refs"):
+        os.makedirs(os.path.join(folder, name), exist_ok=True)
+
+def legacy_organize(folder):
+    """
+    The organizer loop as it was before scandir/buffered logging:
+    os.listdir + os.path.isdir, two makedirs and one log open per file.
+    """
+    def log(message):
+        with open(organizer.LOG_FILE, "a") as f:
+            f.write(message + "\n")
+        print(message)
+
+    for filename in os.listdir(folder):
+        full_path = os.path.join(folder, filename)
+        if os.path.isdir(full_path):
+            continue
+        if filename in ("organizer.py", organizer.LOG_FILE):
+            continue
+
+        image_dir = os.path.join(folder, "images")
+        other_dir = os.path.join(folder, "other_files")
+        os.makedirs(image_dir, exist_ok=True)
+        os.makedirs(other_dir, exist_ok=True)
+
+        if organizer.is_image(filename):
+            shutil.move(full_path, os.path.join(image_dir, filename))
+            log(f"Moved image: {filename} → images/")
+        else:
+            shutil.move(full_path, os.path.join(other_dir, filename))
+            log(f"Moved file: {filename} → other_files/")
+
+def current_organize(folder):
+    organizer.main(folder, quiet=True)
+
+def time_run(label, func, count):
+    """
+    Build a fresh tree, run func on it with stdout silenced, return files/sec.
+    """
+    with tempfile.TemporaryDirectory(prefix="organizer_bench_") as tmp:
+        folder = os.path.join(tmp, "dump")
+        os.makedirs(folder)
+        make_synthetic_tree(folder, count)
+
+        # Keep the log file inside the temp dir
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                start = time.perf_counter()
+                func(folder)
+                elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"{label:<8} {count} files in {elapsed:.2f}s  →  {rate:,.0f} files/sec")
+    return rate
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark organizer.py before/after on a synthetic tree.")
+    parser.add_argument(
+        "--files",
+        type=int,
+        default=20000,
+        help="Number of synthetic files to organize (default: 20000).",
+    )
+    args = parser.parse_args()
+
+    if args.files <= 0:
+        print("Error: --files must be positive.")
+        sys.exit(1)
+
+    before = time_run("before", legacy_organize, args.files)
+    after = time_run("after", current_organize, args.files)
+    print(f"speedup  {after / before:.2f}x")
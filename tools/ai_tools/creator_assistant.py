@@ -2,22 +2,83 @@ import os
 import sys
 import argparse
 import re
+import sqlite3
+import hashlib
+import json
+import time
+import queue
+import signal
+import threading
+import contextlib
+import contextvars
+import cProfile
+import pstats
+import io
+import socket
+import socketserver
+import subprocess
+import tempfile
+import traceback
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
 
 from datetime import datetime
 from pathlib import Path
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from openai import APIError
+
+# Shared pooled clients (also loads .env); created on first use, so --replay runs need no API key
+from llm_provider import (
+    get_client,
+    get_backend,
+    resolve_backend,
+    backend_model,
+    fit_max_tokens,
+    backend_slot,
+    PRIORITIES,
+    USER_TAG,
+)
+
+# Backend serving the current command (see llm_provider.DEFAULT_BACKENDS); set in main()
+LLM_BACKEND = {"name": "openai"}
+
+# Scheduling class for this command's LLM calls (see llm_provider PRIORITY SCHEDULER).
+# Commands someone is waiting on are interactive, pipeline stages are batch.
+# Background threads override it for themselves with llm_priority().
+COMMAND_PRIORITY = {
+    "script-draft": "batch",
+    "script-polish": "batch",
+    "publish-pack": "batch",
+    "fill-outline": "batch",
+    "fill-script": "batch",
+}
+LLM_PRIORITY = {"default": "interactive"}
+_priority_local = threading.local()
+
+
+def current_priority() -> str:
+    return getattr(_priority_local, "name", None) or LLM_PRIORITY["default"]
+
+
+@contextlib.contextmanager
+def llm_priority(name: str):
+    """Run this thread's LLM calls at another priority class (e.g. "prefetch")."""
+    previous = getattr(_priority_local, "name", None)
+    _priority_local.name = name
+    try:
+        yield
+    finally:
+        _priority_local.name = previous
 
-# Load environment variables from .env in the Week 1 folder
-load_dotenv()
 
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    print("ERROR: OPENAI_API_KEY not found in .env")
-    sys.exit(1)
+class LLMTruncated(ValueError):
+    """A structured reply hit max_tokens before its JSON was complete."""
+
+
+class LLMRefusal(ValueError):
+    """The model declined: the API's refusal field, a content_filter stop, or a refusal-shaped reply."""
 
-client = OpenAI(api_key=api_key)
 
 def call_llm(
     *,
@@ -26,17 +87,916 @@ def call_llm(
     model: str = "gpt-4o-mini",
     max_tokens: int = 3500,
     temperature: float = 0.4,
+    response_format: dict | None = None,
+    coalesce: bool = True,
+    detect_refusal: bool = False,
 ) -> str:
-    resp = client.chat.completions.create(
+    return call_llm_choices(
+        system=system,
+        user=user,
         model=model,
-        messages=[
+        max_tokens=max_tokens,
+        temperature=temperature,
+        response_format=response_format,
+        coalesce=coalesce,
+        detect_refusal=detect_refusal,
+    )[0]
+
+
+def call_llm_choices(
+    *,
+    system: str,
+    user: str,
+    model: str = "gpt-4o-mini",
+    max_tokens: int = 3500,
+    temperature: float = 0.4,
+    response_format: dict | None = None,
+    n: int = 1,
+    coalesce: bool = True,
+    detect_refusal: bool = False,
+) -> list[str]:
+    """
+    Request n completions of the same prompt in one call (the prompt is billed
+    once) and return every choice's text, in choice order.
+
+    The active backend may pin its own model and clamps max_tokens to its context
+    window; on backends without n support the choices are requested in parallel.
+    Identical requests already in flight are shared (see SINGLE-FLIGHT
+    COALESCING) unless coalesce=False or the temperature asks for diversity.
+
+    Raises LLMTruncated when a structured (response_format) request runs out
+    of max_tokens on every choice, and LLMRefusal when a structured request is
+    refused outright. Free-form callers that need to act on refusals (e.g.
+    polish) pass detect_refusal=True to get LLMRefusal for those too.
+    """
+    backend = LLM_BACKEND["name"]
+    model = backend_model(model, backend)
+    max_tokens = fit_max_tokens(max_tokens, estimate_tokens(system) + estimate_tokens(user), backend)
+    if n > 1 and not get_backend(backend)["supports_n"]:
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            futures = [
+                _submit(
+                    pool,
+                    call_llm_choices,
+                    system=system,
+                    user=user,
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    response_format=response_format,
+                    coalesce=False,  # n distinct samples, not one shared reply
+                    detect_refusal=detect_refusal,
+                )
+                for _ in range(n)
+            ]
+            return [f.result()[0] for f in futures]
+
+    extra = {"response_format": response_format} if response_format else {}
+    if n > 1:
+        extra["n"] = n
+    request = {
+        "model": model,
+        "messages": [
             {"role": "system", "content": system},
             {"role": "user", "content": user},
         ],
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        **extra,
+    }
+
+    if coalesce and temperature <= COALESCE_MAX_TEMPERATURE:
+        reply = _single_flight(f"{backend}:{_request_key(request)}", model, lambda: _complete(backend, request))
+    else:
+        reply = _complete(backend, request)
+
+    if response_format and reply["finish_reasons"] and all(r == "length" for r in reply["finish_reasons"]):
+        raise LLMTruncated(f"reply cut off at max_tokens={max_tokens}")
+    if (response_format or detect_refusal) and _reply_refused(reply, check_text=detect_refusal):
+        raise LLMRefusal(f"{model} refused: {(reply['refusal'] or reply['choices'][0])[:120]}")
+    return reply["choices"]
+
+
+def _reply_refused(reply: dict, check_text: bool = True) -> bool:
+    """
+    True if the API flagged a refusal (refusal field with no content, or a
+    content_filter stop) or, with check_text, every choice opens like a refusal.
+    """
+    if reply["refusal"] and not any(reply["choices"]):
+        return True
+    if "content_filter" in reply["finish_reasons"]:
+        return True
+    return check_text and all(_looks_like_refusal(text) for text in reply["choices"])
+
+
+def _complete(backend: str, request: dict) -> dict:
+    """
+    Send one request (via cassette and hedging) and record it in the ledger.
+    Returns {"choices", "refusal", "finish_reasons"} with each choice's text stripped.
+    """
+    model = request["model"]
+
+    priority = current_priority()  # read here: hedge threads don't inherit it
+
+    def live() -> dict:
+        get_client(backend)  # exit here (not in a hedge thread) if there is no API key
+        return _hedged(lambda cancel: _stream_completion(backend, priority, cancel, **request))
+
+    start = time.perf_counter()
+    try:
+        with trace_span("llm call", category="network", model=model, command=ledger_context()["command"]):
+            result = cassette_call(request, live)
+    except Exception as e:
+        record_llm_call(model=model, latency=time.perf_counter() - start, error=str(e))
+        raise
+
+    reply = {
+        "choices": [text.strip() for text in result["choices"]] or [""],
+        "refusal": result["refusal"],
+        "finish_reasons": result["finish_reasons"],
+    }
+    record_llm_call(
+        model=model,
+        latency=time.perf_counter() - start,
+        ttft=result["ttft"],
+        **_usage_to_dict(result["usage"]),
+        refusal=bool(result["refusal"]) or _reply_refused(reply),
+        hedged=result.get("hedged", False),
+    )
+    return reply
+
+
+# ---------- SINGLE-FLIGHT COALESCING ----------
+
+# Parallel batch runs often send byte-identical requests at the same moment (the
+# same seed to metadata and thumbnails, the same beat in two projects). The first
+# caller sends it; identical callers that arrive while it is in flight wait on the
+# same Future and get the same choices. Above this temperature a repeat is taken
+# as a request for a different sample, so it goes out on its own.
+COALESCE_MAX_TEMPERATURE = 0.8
+
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _single_flight(key: str, model: str, send) -> dict:
+    with _inflight_lock:
+        shared = _inflight.get(key)
+        leader = shared is None
+        if leader:
+            shared = _inflight[key] = Future()
+
+    if not leader:
+        start = time.perf_counter()
+        reply = shared.result()  # re-raises the leader's error
+        # Logged as a cache hit: waited on the leader's call, no tokens billed
+        record_llm_call(model=model, latency=time.perf_counter() - start, cache_hit=True)
+        return {**reply, "choices": list(reply["choices"])}
+
+    try:
+        reply = send()
+    except BaseException as e:
+        shared.set_exception(e)
+        raise
+    else:
+        shared.set_result(reply)
+        return reply
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _stream_completion(backend: str, priority: str, cancel: threading.Event | None = None, **kwargs) -> dict:
+    """
+    One streamed chat completion on a backend (holding one of its machine-wide
+    concurrency slots, queued by priority), collected into {"choices", "refusal",
+    "finish_reasons", "usage", "ttft"}: choices and finish_reasons hold each choice's
+    text and stop reason by index (several when n > 1), ttft is seconds to the first token.
+    Setting cancel (a hedge that lost) closes the stream and raises HedgeCancelled.
+    """
+    if get_backend(backend)["stream_usage"]:
+        kwargs["stream_options"] = {"include_usage": True}
+    content: dict[int, list[str]] = {}
+    refusal: list[str] = []
+    finished: dict[int, str] = {}
+    usage = None
+    ttft = None
+    with backend_slot(backend, priority):
+        if cancel is not None and cancel.is_set():
+            raise HedgeCancelled()
+        t0 = time.perf_counter()
+        stream = get_client(backend).chat.completions.create(stream=True, **kwargs)
+        for chunk in stream:
+            if cancel is not None and cancel.is_set():
+                stream.close()  # drops the connection, so the server stops generating
+                raise HedgeCancelled()
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            for choice in chunk.choices:
+                delta = choice.delta
+                text = getattr(delta, "content", None)
+                refused = getattr(delta, "refusal", None)
+                if ttft is None and (text or refused):
+                    ttft = time.perf_counter() - t0
+                if text:
+                    content.setdefault(choice.index, []).append(text)
+                if refused:
+                    refusal.append(refused)
+                if getattr(choice, "finish_reason", None):
+                    finished[choice.index] = choice.finish_reason
+    count = max([*content, *finished], default=0) + 1
+    choices = ["".join(content.get(i, [])) for i in range(count)]
+    finish_reasons = [finished.get(i) for i in range(count)]
+    return {"choices": choices, "refusal": "".join(refusal), "finish_reasons": finish_reasons, "usage": usage, "ttft": ttft}
+
+
+# ---------- RECORD / REPLAY CASSETTES ----------
+
+# --record captures every call_llm request/response pair to a JSONL cassette;
+# --replay serves them back by request hash, without touching the API.
+CASSETTE = {"mode": None, "path": None, "latency": "zero"}
+_cassette_entries: dict[str, list[dict]] = {}
+_cassette_lock = threading.Lock()
+
+
+def _request_key(request: dict) -> str:
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def configure_cassette(mode: str | None, path: str | None, latency: str = "zero") -> None:
+    """
+    mode: None, "record" (truncate and write path) or "replay" (load path).
+    latency: on replay, "original" sleeps for the recorded latency, "zero" doesn't.
+    """
+    CASSETTE.update({"mode": mode, "path": path, "latency": latency})
+    _cassette_entries.clear()
+    if mode == "record":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        open(path, "w", encoding="utf-8").close()
+    elif mode == "replay":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    _cassette_entries.setdefault(entry["key"], []).append(entry)
+
+
+def _usage_to_dict(usage) -> dict:
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+
+
+def cassette_call(request: dict, live) -> dict:
+    """
+    Return the _stream_completion() result for request: from the cassette when
+    replaying, otherwise from live() (and appended to the cassette when recording).
+    Identical requests are served in recorded order; the last one repeats.
+    """
+    mode = CASSETTE["mode"]
+    key = _request_key(request)
+
+    if mode == "replay":
+        with _cassette_lock:
+            entries = _cassette_entries.get(key)
+            if not entries:
+                raise RuntimeError(
+                    f"Cassette {CASSETTE['path']} has no response for this {request['model']} request "
+                    f"(key {key[:12]}). Re-record it with --record."
+                )
+            entry = entries.pop(0) if len(entries) > 1 else entries[0]
+        if CASSETTE["latency"] == "original":
+            time.sleep(entry["latency"])
+        response = entry["response"]
+        usage = response["usage"]
+        return {
+            "choices": response["choices"],
+            "refusal": response["refusal"],
+            "finish_reasons": response.get("finish_reasons", []),  # absent in older cassettes
+            "ttft": response["ttft"],
+            "usage": SimpleNamespace(
+                prompt_tokens=usage["prompt_tokens"],
+                completion_tokens=usage["completion_tokens"],
+                prompt_tokens_details=SimpleNamespace(cached_tokens=usage["cached_tokens"]),
+            ),
+        }
+
+    start = time.perf_counter()
+    result = live()
+    if mode == "record":
+        entry = {
+            "key": key,
+            "request": request,
+            "latency": time.perf_counter() - start,
+            "response": {
+                "choices": result["choices"],
+                "refusal": result["refusal"],
+                "finish_reasons": result["finish_reasons"],
+                "ttft": result["ttft"],
+                "usage": _usage_to_dict(result["usage"]),
+            },
+        }
+        with _cassette_lock:
+            with open(CASSETTE["path"], "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return result
+
+
+# ---------- REQUEST HEDGING ----------
+
+# Off unless --hedge is passed. When on, a call still running after the observed
+# p90 latency for the current command gets a duplicate request; whichever
+# finishes first wins. budget caps hedges at that fraction of calls (extra spend).
+HEDGE = {"enabled": False, "budget": 0.15, "command": "default"}
+HEDGE_PERCENTILE = 90
+HEDGE_MIN_SAMPLES = 8       # latencies needed for a command before hedging starts
+HEDGE_HISTORY = 200         # latencies kept per command in LATENCY_FILE
+LATENCY_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Projects", ".llm_latency.json")
+
+_latencies: dict[str, list[float]] | None = None   # per command, loaded lazily
+_hedge_lock = threading.Lock()
+_hedge_stats = {
+    "calls": 0,
+    "hedged": 0,
+    "hedge_wins": 0,
+    "observed": [],     # latency the caller actually waited
+    "primary": [],      # latency of the original request alone (unhedged baseline)
+    "inflight": {},     # primaries still running after a hedge won: id -> start time
+}
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _load_latencies() -> dict[str, list[float]]:
+    global _latencies
+    if _latencies is None:
+        try:
+            with open(LATENCY_FILE, "r", encoding="utf-8") as f:
+                _latencies = {k: [float(x) for x in v] for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            _latencies = {}
+    return _latencies
+
+
+def save_latencies() -> None:
+    """Persist per-command latency history so the next run starts with a p90."""
+    if _latencies is None or not _hedge_stats["calls"]:
+        return
+    try:
+        os.makedirs(os.path.dirname(LATENCY_FILE), exist_ok=True)
+        with _hedge_lock:
+            data = {k: v[-HEDGE_HISTORY:] for k, v in _latencies.items()}
+        with open(LATENCY_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError as e:
+        print(f"[WARN] Could not save latency history: {e}")
+
+
+def configure_hedging(command: str, enabled: bool, budget: float = 0.15) -> None:
+    """Set hedging for one command and reset the per-command hedge report."""
+    HEDGE.update({"enabled": enabled, "budget": max(0.0, budget), "command": command})
+    with _hedge_lock:
+        _hedge_stats.update({"calls": 0, "hedged": 0, "hedge_wins": 0, "observed": [], "primary": [], "inflight": {}})
+
+
+def _hedge_delay() -> float | None:
+    """p90 latency for the current command, or None if hedging is off / not warmed up."""
+    if not HEDGE["enabled"]:
+        return None
+    with _hedge_lock:
+        history = list(_load_latencies().get(HEDGE["command"], []))
+    if len(history) < HEDGE_MIN_SAMPLES:
+        return None
+    return _percentile(history[-HEDGE_HISTORY:], HEDGE_PERCENTILE)
+
+
+class HedgeCancelled(Exception):
+    """Raised inside the losing request of a hedged pair once the other one is done."""
+
+
+def _hedged(request):
+    """
+    Run request(cancel) (one API call). If it is still running after the p90 delay
+    and the budget allows, start a duplicate and return whichever succeeds first;
+    the other is cancelled through the cancel event. Without hedging this is a
+    plain call that records its latency.
+    """
+    delay = _hedge_delay()
+    command = HEDGE["command"]
+    results: queue.Queue = queue.Queue()
+    start = time.perf_counter()
+    call_id = object()
+    cancel = threading.Event()
+
+    def run(tag: str) -> None:
+        t0 = time.perf_counter()
+        try:
+            outcome = ("ok", request(cancel))
+        except Exception as e:
+            outcome = ("error", e)
+        elapsed = time.perf_counter() - t0
+        if tag == "primary":
+            # A cancelled primary ran past the hedge delay (the p90) and would have
+            # taken at least this long, so it still counts as a slow sample
+            with _hedge_lock:
+                _load_latencies().setdefault(command, []).append(elapsed)
+                _hedge_stats["primary"].append(elapsed)
+                _hedge_stats["inflight"].pop(call_id, None)
+        results.put((tag, outcome))
+
+    with _hedge_lock:
+        _hedge_stats["calls"] += 1
+
+    if delay is None:
+        run("primary")
+        tag, (status, value) = results.get()
+    else:
+        # Daemon threads: a losing request never holds up the rest of the run or exit
+        threading.Thread(target=run, args=("primary",), daemon=True).start()
+        launched = 1
+        launched_hedge = False
+        try:
+            first = results.get(timeout=delay)
+        except queue.Empty:
+            first = None
+            with _hedge_lock:
+                allowed = _hedge_stats["hedged"] + 1 <= HEDGE["budget"] * _hedge_stats["calls"]
+                if allowed:
+                    _hedge_stats["hedged"] += 1
+                    _hedge_stats["inflight"][call_id] = start
+            if allowed:
+                threading.Thread(target=run, args=("hedge",), daemon=True).start()
+                launched = 2
+                launched_hedge = True
+
+        pending = [first] if first else []
+        errors = []
+        try:
+            while True:
+                tag, (status, value) = pending.pop() if pending else results.get()
+                launched -= 1
+                if status == "ok" or launched == 0:
+                    break
+                errors.append(value)
+        finally:
+            # Stop the loser (if any) however we leave: result, error or Ctrl-C
+            cancel.set()
+        if status != "ok" and errors:
+            value = errors[0]
+        if status == "ok" and tag == "hedge":
+            with _hedge_lock:
+                _hedge_stats["hedge_wins"] += 1
+        if status == "ok" and isinstance(value, dict):
+            value["hedged"] = launched_hedge
+
+    with _hedge_lock:
+        _hedge_stats["observed"].append(time.perf_counter() - start)
+    if status != "ok":
+        raise value
+    return value
+
+
+def report_hedging() -> None:
+    """Print how often hedges fired and the p99 with vs without them."""
+    with _hedge_lock:
+        stats = dict(_hedge_stats)
+        now = time.perf_counter()
+        # A primary still running when a hedge won took at least this long
+        baseline = stats["primary"] + [now - t for t in stats["inflight"].values()]
+    calls = stats["calls"]
+    if not calls:
+        return
+    rate = stats["hedged"] / calls * 100
+    print(
+        f"\n[HEDGE] {HEDGE['command']}: {calls} call(s), {stats['hedged']} hedge(s) fired ({rate:.1f}%), "
+        f"{stats['hedge_wins']} won by the duplicate (budget {HEDGE['budget']:.0%})"
+    )
+    if stats["observed"] and baseline:
+        before = _percentile(baseline, 99)
+        after = _percentile(stats["observed"], 99)
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"[HEDGE] p99 latency: {before:.2f}s unhedged → {after:.2f}s hedged ({change:+.1f}%)")
+
+
+# ---------- CALL LEDGER ----------
+
+# Every LLM call (and every polish-cache hit) is appended to this SQLite ledger;
+# `stats` summarizes it.
+LEDGER_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Projects", ".llm_ledger.sqlite")
+
+# What the current call belongs to. main() sets command/project; loops set beat;
+# call_llm_json sets retry. Held in a ContextVar so each thread (daemon request,
+# parallel chunk, pack section) has its own beat and retry; work handed to a pool
+# or thread runs in a copy of the submitter's context (see _submit).
+LEDGER_DEFAULTS = {"command": None, "project": None, "beat": None, "retry": 0}
+_ledger_context: contextvars.ContextVar[dict] = contextvars.ContextVar("ledger_context", default=LEDGER_DEFAULTS)
+
+
+def ledger_context() -> dict:
+    return _ledger_context.get()
+
+
+def set_ledger_context(**fields) -> contextvars.Token:
+    """Update the current context's ledger fields; reset with _ledger_context.reset(token)."""
+    return _ledger_context.set({**_ledger_context.get(), **fields})
+
+
+def _submit(pool: ThreadPoolExecutor, fn, *args, **kwargs) -> Future:
+    """pool.submit() that runs fn in a copy of the caller's context (ledger beat/retry)."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+# USD per 1M tokens: (input, cached input, output). Unknown models cost 0.
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+}
+
+_ledger_conn: sqlite3.Connection | None = None
+_ledger_lock = threading.Lock()
+
+
+def _open_ledger() -> sqlite3.Connection:
+    global _ledger_conn
+    if _ledger_conn is None:
+        os.makedirs(os.path.dirname(LEDGER_FILE), exist_ok=True)
+        _ledger_conn = sqlite3.connect(LEDGER_FILE, check_same_thread=False)
+        _ledger_conn.execute(
+            "CREATE TABLE IF NOT EXISTS calls ("
+            "ts TEXT NOT NULL, day TEXT NOT NULL, command TEXT, project TEXT, beat INTEGER, "
+            "model TEXT, prompt_tokens INTEGER, completion_tokens INTEGER, cached_tokens INTEGER, "
+            "latency REAL, ttft REAL, retries INTEGER, refusal INTEGER, cache_hit INTEGER, "
+            "hedged INTEGER, error TEXT)"
+        )
+    return _ledger_conn
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int) -> float:
+    price_in, price_cached, price_out = MODEL_PRICES.get(model, (0.0, 0.0, 0.0))
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * price_in + cached_tokens * price_cached + completion_tokens * price_out) / 1_000_000
+
+
+def record_llm_call(
+    *,
+    model: str,
+    latency: float,
+    ttft: float | None = None,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    cached_tokens: int = 0,
+    refusal: bool = False,
+    cache_hit: bool = False,
+    hedged: bool = False,
+    error: str | None = None,
+) -> None:
+    """Append one row to the ledger. Telemetry never breaks a run."""
+    if CASSETTE["mode"] == "replay":
+        return  # replayed calls cost nothing and would skew stats
+    now = datetime.now()
+    context = ledger_context()
+    row = (
+        now.strftime("%Y-%m-%d %H:%M:%S"), now.strftime("%Y-%m-%d"),
+        context["command"], context["project"], context["beat"],
+        model, prompt_tokens, completion_tokens, cached_tokens,
+        latency, ttft, context["retry"], int(refusal), int(cache_hit), int(hedged), error,
+    )
+    try:
+        with _ledger_lock:
+            conn = _open_ledger()
+            conn.execute("INSERT INTO calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"[WARN] Could not write call ledger: {e}")
+
+
+def summarize_ledger(group_by: str, since: str | None = None, project: str | None = None) -> list[dict]:
+    """
+    Group ledger rows by command, project, day or model and compute call counts,
+    p50/p95/p99 latency, median TTFT, token totals and estimated cost.
+    """
+    if group_by not in ("command", "project", "day", "model"):
+        raise ValueError(f"Unknown grouping: {group_by}")
+    if not os.path.exists(LEDGER_FILE):
+        return []
+
+    where, params = [], []
+    if since:
+        where.append("day >= ?")
+        params.append(since)
+    if project:
+        where.append("project = ?")
+        params.append(project)
+    sql = (
+        f"SELECT {group_by}, model, prompt_tokens, completion_tokens, cached_tokens, "
+        "latency, ttft, refusal, cache_hit, hedged, retries, error FROM calls"
+    )
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+
+    with _ledger_lock:
+        rows = _open_ledger().execute(sql, params).fetchall()
+
+    groups: dict[str, dict] = {}
+    for key, model, p_tok, c_tok, cached, latency, ttft, refusal, cache_hit, hedged, retries, error in rows:
+        g = groups.setdefault(str(key or "-"), {
+            "key": str(key or "-"), "calls": 0, "latencies": [], "ttfts": [],
+            "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+            "refusals": 0, "cache_hits": 0, "hedged": 0, "retries": 0, "errors": 0, "cost": 0.0,
+        })
+        g["calls"] += 1
+        g["prompt_tokens"] += p_tok or 0
+        g["completion_tokens"] += c_tok or 0
+        g["cached_tokens"] += cached or 0
+        g["refusals"] += refusal or 0
+        g["cache_hits"] += cache_hit or 0
+        g["hedged"] += hedged or 0
+        g["retries"] += 1 if retries else 0
+        g["errors"] += 1 if error else 0
+        g["cost"] += estimate_cost(model, p_tok or 0, c_tok or 0, cached or 0)
+        if not cache_hit:
+            g["latencies"].append(latency)
+            if ttft is not None:
+                g["ttfts"].append(ttft)
+
+    summary = []
+    for g in sorted(groups.values(), key=lambda g: g["key"]):
+        lat = g.pop("latencies")
+        ttfts = g.pop("ttfts")
+        g["p50"] = _percentile(lat, 50) if lat else None
+        g["p95"] = _percentile(lat, 95) if lat else None
+        g["p99"] = _percentile(lat, 99) if lat else None
+        g["ttft_p50"] = _percentile(ttfts, 50) if ttfts else None
+        summary.append(g)
+    return summary
+
+
+def run_stats(args: argparse.Namespace) -> None:
+    groupings = [args.by] if args.by else ["command", "project", "day"]
+    fmt = lambda v: "-" if v is None else f"{v:.2f}s"
+
+    for group_by in groupings:
+        summary = summarize_ledger(group_by, since=args.since, project=args.project)
+        if not summary:
+            print("No LLM calls recorded yet." if not os.path.exists(LEDGER_FILE) else f"No calls match (by {group_by}).")
+            return
+
+        print(f"\n=== By {group_by} ===")
+        print(
+            f"{group_by:<24} {'calls':>6} {'p50':>7} {'p95':>7} {'p99':>7} {'ttft50':>7} "
+            f"{'in tok':>9} {'out tok':>9} {'cached':>8} {'refuse':>6} {'c.hit':>6} {'cost $':>9}"
+        )
+        for g in summary:
+            print(
+                f"{g['key'][:24]:<24} {g['calls']:>6} {fmt(g['p50']):>7} {fmt(g['p95']):>7} {fmt(g['p99']):>7} "
+                f"{fmt(g['ttft_p50']):>7} {g['prompt_tokens']:>9} {g['completion_tokens']:>9} "
+                f"{g['cached_tokens']:>8} {g['refusals']:>6} {g['cache_hits']:>6} {g['cost']:>9.4f}"
+            )
+        total_cost = sum(g["cost"] for g in summary)
+        total_calls = sum(g["calls"] for g in summary)
+        print(f"Total: {total_calls} call(s), est. ${total_cost:.4f}")
+
+
+# ---------- PROFILING & TRACING ----------
+
+# Chrome trace-event spans (open the --trace JSON in chrome://tracing or Perfetto).
+# Empty and free unless main() turns tracing on.
+TRACE = {"enabled": False, "events": []}
+_trace_origin = time.perf_counter()
+
+
+@contextlib.contextmanager
+def trace_span(name: str, category: str = "stage", **span_args):
+    """Record a nested 'complete' (ph=X) span around the with-block."""
+    if not TRACE["enabled"]:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        TRACE["events"].append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - _trace_origin) * 1_000_000,
+            "dur": (end - start) * 1_000_000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {k: str(v) for k, v in span_args.items()},
+        })
+
+
+def write_trace(path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": TRACE["events"], "displayTimeUnit": "ms"}, f)
+    print(f"[TRACE] {len(TRACE['events'])} span(s) written to {path}")
+
+
+def write_profile(profiler: cProfile.Profile, path: str, top: int = 15) -> None:
+    profiler.dump_stats(path)
+    print(f"\n[PROFILE] pstats written to {path} (top {top} by cumulative time):")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+
+
+# ---------- PROJECT FILE CACHE ----------
+
+# Project files and their parsed forms, keyed by absolute path and invalidated by
+# (mtime_ns, size). A one-shot CLI run gains nothing from this; in daemon mode
+# repeat commands on the same project skip the read and the regex parsing.
+_PROJECT_CACHE: dict[str, dict] = {}
+_project_cache_lock = threading.Lock()
+
+
+def _project_entry(path) -> dict:
+    full = os.path.abspath(path)
+    st = os.stat(full)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _project_cache_lock:
+        entry = _PROJECT_CACHE.get(full)
+        if entry is None or entry["stamp"] != stamp:
+            with open(full, "r", encoding="utf-8") as f:
+                entry = {"stamp": stamp, "text": f.read(), "parsed": {}}
+            _PROJECT_CACHE[full] = entry
+    return entry
+
+
+def read_project_file(path) -> str:
+    """Text of a project file, served from memory while it is unchanged on disk."""
+    return _project_entry(path)["text"]
+
+
+def parse_project_file(path, key: str, parser):
+    """
+    parser(text) for a project file, memoized per (file version, key).
+    Lists come back as copies so callers can edit them freely.
+    """
+    entry = _project_entry(path)
+    parsed = entry["parsed"]
+    if key not in parsed:
+        parsed[key] = parser(entry["text"])
+    value = parsed[key]
+    return list(value) if isinstance(value, list) else value
+
+
+# ---------- STRUCTURED (JSON) OUTPUT ----------
+
+def _str_list(description: str) -> dict:
+    return {"type": "array", "items": {"type": "string"}, "description": description}
+
+
+def _object(properties: dict) -> dict:
+    """Strict JSON-schema object: every property required, no extras."""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties.keys()),
+        "additionalProperties": False,
+    }
+
+
+def _validate_json(value, schema: dict, path: str = "$") -> list[str]:
+    """
+    Check a parsed JSON value against the small subset of JSON Schema used in this file
+    (object/array/string/integer, required, items). Returns a list of problems.
+    """
+    expected = schema.get("type")
+    if expected == "object":
+        if not isinstance(value, dict):
+            return [f"{path}: expected object"]
+        problems = []
+        for key in schema.get("required", []):
+            if key not in value:
+                problems.append(f"{path}.{key}: missing")
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                problems.extend(_validate_json(value[key], sub, f"{path}.{key}"))
+        return problems
+    if expected == "array":
+        if not isinstance(value, list):
+            return [f"{path}: expected array"]
+        problems = []
+        for i, item in enumerate(value):
+            problems.extend(_validate_json(item, schema.get("items", {}), f"{path}[{i}]"))
+        return problems
+    if expected == "string":
+        return [] if isinstance(value, str) else [f"{path}: expected string"]
+    if expected == "integer":
+        return [] if isinstance(value, int) and not isinstance(value, bool) else [f"{path}: expected integer"]
+    return []
+
+
+def call_llm_json(
+    *,
+    system: str,
+    user: str,
+    schema: dict,
+    schema_name: str,
+    model: str = "gpt-4o-mini",
+    max_tokens: int = 3500,
+    temperature: float = 0.4,
+    retries: int = 1,
+    coalesce: bool = True,
+) -> dict:
+    """
+    Request schema-constrained JSON (OpenAI structured outputs), parse it and
+    validate it locally. A malformed or truncated reply is retried up to
+    `retries` times before raising ValueError, so callers never silently get
+    zero items back.
+    """
+    return call_llm_json_choices(
+        system=system,
+        user=user,
+        schema=schema,
+        schema_name=schema_name,
+        model=model,
         max_tokens=max_tokens,
         temperature=temperature,
-    )
-    return (resp.choices[0].message.content or "").strip()
+        retries=retries,
+        coalesce=coalesce,
+    )[0]
+
+
+# Ceiling for the larger budget a truncated structured reply is retried with
+JSON_MAX_TOKENS = 8000
+
+
+def call_llm_json_choices(
+    *,
+    system: str,
+    user: str,
+    schema: dict,
+    schema_name: str,
+    model: str = "gpt-4o-mini",
+    max_tokens: int = 3500,
+    temperature: float = 0.4,
+    retries: int = 1,
+    n: int = 1,
+    coalesce: bool = True,
+) -> list[dict]:
+    """
+    call_llm_json() with n choices from one request. Returns every choice that
+    parses and validates; retries (all n) only if none do.
+
+    A reply cut off at max_tokens is not a validation failure: it is asked again
+    with double the budget (up to JSON_MAX_TOKENS) without using up a retry.
+    """
+    response_format = {
+        "type": "json_schema",
+        "json_schema": {"name": schema_name, "strict": True, "schema": schema},
+    }
+
+    problems: list[str] = []
+    attempt = 0
+    while attempt <= retries:
+        token = set_ledger_context(retry=attempt)
+        try:
+            raws = call_llm_choices(
+                system=system,
+                user=user,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                response_format=response_format,
+                n=n,
+                coalesce=coalesce,
+            )
+        except LLMTruncated as e:
+            if max_tokens >= JSON_MAX_TOKENS:
+                raise LLMTruncated(f"{schema_name}: {e}") from e
+            max_tokens = min(max_tokens * 2, JSON_MAX_TOKENS)
+            print(f"[WARN] {schema_name}: {e}; retrying with max_tokens={max_tokens}")
+            continue
+        finally:
+            _ledger_context.reset(token)
+        attempt += 1
+        valid = []
+        for raw in raws:
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError as e:
+                problems = [f"invalid JSON: {e}"]
+                continue
+            choice_problems = _validate_json(data, schema)
+            if choice_problems:
+                problems = choice_problems
+            else:
+                valid.append(data)
+        if valid:
+            return valid
+
+    raise ValueError(f"{schema_name}: model output failed validation: " + "; ".join(problems[:5]))
 
 
 from project_generator import slugify_name  # add near top, where other imports from project_generator are
@@ -164,21 +1124,243 @@ REQUIREMENTS:
 Begin now.
 """
 
-    response = client.chat.completions.create(
+    outline = call_llm(
+        system=system_tone,
+        user=prompt,
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_tone},
-            {"role": "user", "content": prompt},
-        ],
         max_tokens=1400,
         temperature=0.7,
     )
+    return repair_outline(outline, beats=beats, system=system_tone, tone_block=tone_block)
+
+
+# ---------- OUTLINE VALIDATION ----------
+
+# Outlines are checked locally after generation. Beats that are missing, share a
+# number, or fall outside OUTLINE_BEAT_SENTENCES are regenerated together in one
+# small request (with the good beats as context) and spliced in, instead of
+# paying for the whole 1400-token outline again.
+OUTLINE_BEAT_SENTENCES = (2, 5)
+OUTLINE_REPAIR_ROUNDS = 2
+OUTLINE_TOKENS_PER_BEAT = 180
+
+OUTLINE_BEATS_SCHEMA = _object({
+    "beats": {
+        "type": "array",
+        "items": _object({
+            "number": {"type": "integer"},
+            "text": {"type": "string"},
+        }),
+    },
+})
+
+_BOLD_HEADING_RE = re.compile(r"^\s*\*\*[^*]+\*\*:?\s*$")
+
+
+def _count_beat_sentences(text: str) -> int:
+    """Sentences in a beat; a bold title line ('**The Archive**') doesn't count."""
+    lines = [line for line in text.splitlines() if line.strip() and not _BOLD_HEADING_RE.match(line)]
+    return sum(len(_split_sentences(line)) for line in lines)
+
+
+def _beat_problem(text: str) -> str | None:
+    lo, hi = OUTLINE_BEAT_SENTENCES
+    sentences = _count_beat_sentences(text)
+    if not lo <= sentences <= hi:
+        return f"{sentences} sentence(s), expected {lo}–{hi}"
+    return None
+
+
+def validate_outline_beats(parsed: list[tuple[int, str]], beats: int) -> dict[int, str]:
+    """
+    Check parsed (number, text) beats against the outline rules.
+    Returns {beat_number: problem} for every beat 1..beats that needs regenerating.
+    """
+    counts = Counter(num for num, _ in parsed)
+    problems: dict[int, str] = {}
+    for num, text in parsed:
+        if not 1 <= num <= beats or num in problems:
+            continue
+        if counts[num] > 1:
+            problems[num] = f"number used {counts[num]} times"
+        elif _beat_problem(text):
+            problems[num] = _beat_problem(text)
+    for num in range(1, beats + 1):
+        if counts[num] == 0:
+            problems[num] = "missing"
+    return dict(sorted(problems.items()))
+
+
+def _regenerate_outline_beats(
+    good: dict[int, str],
+    bad: dict[int, str],
+    *,
+    beats: int,
+    system: str,
+    tone_block: str,
+) -> dict[int, str]:
+    """Ask for just the bad beat numbers, showing every good beat around them."""
+    lo, hi = OUTLINE_BEAT_SENTENCES
+    current = "\n\n".join(
+        f"{num}. {good[num]}" if num in good else f"{num}. [TO WRITE — {bad[num]}]"
+        for num in range(1, beats + 1)
+    )
+    wanted = ", ".join(str(num) for num in bad)
+    prompt = f"""
+{tone_block}
+
+TASK:
+This {beats}-beat outline is complete except for the beats marked [TO WRITE]. Write ONLY beats {wanted}.
+
+Requirements:
+- Each beat must be {lo}–{hi} sentences and follow the numbering exactly.
+- Each beat must connect the beat before it to the beat after it; keep names, places and facts consistent.
+- Do not rewrite or repeat the other beats.
+
+CURRENT OUTLINE:
+{current}
+
+Return JSON with one entry per requested beat: its number and its text (no number prefix).
+"""
+    data = call_llm_json(
+        system=system,
+        user=prompt,
+        schema=OUTLINE_BEATS_SCHEMA,
+        schema_name="outline_beats",
+        model="gpt-4o-mini",
+        max_tokens=OUTLINE_TOKENS_PER_BEAT * len(bad) + 100,
+        temperature=0.7,
+    )
+    texts: dict[int, str] = {}
+    for beat in data["beats"]:
+        text = re.sub(r"^\s*\d+\.\s*", "", beat["text"]).strip()
+        if beat["number"] in bad and text and beat["number"] not in texts:
+            texts[beat["number"]] = text
+    return texts
+
+
+def repair_outline(outline: str, *, beats: int, system: str, tone_block: str) -> str:
+    """
+    Validate a generated outline and regenerate only its missing or malformed beats
+    (up to OUTLINE_REPAIR_ROUNDS requests). Returns the outline rebuilt as beats
+    1..beats; any intro text before beat 1 is kept, and so are beats numbered above
+    `beats` (after the others, with a warning). Beats still invalid after the last
+    round are kept as they are, with a warning.
+
+    Raises ValueError if a beat is still missing after the last round.
+    """
+    parsed = _parse_numbered_beats(outline)
+    if not parsed:
+        print("[WARN] Outline has no numbered beats; leaving it as generated.")
+        return outline
+
+    problems = validate_outline_beats(parsed, beats)
+    if not problems:
+        return outline
+
+    good = {num: text for num, text in parsed if 1 <= num <= beats and num not in problems}
+    # Fallback for beats that can't be repaired: the first version the model gave
+    fallback: dict[int, str] = {}
+    for num, text in parsed:
+        fallback.setdefault(num, text)
+
+    for round_no in range(1, OUTLINE_REPAIR_ROUNDS + 1):
+        listing = "; ".join(f"beat {num}: {why}" for num, why in problems.items())
+        print(f"[Creator Assistant] Outline check: {listing}. Regenerating {len(problems)} beat(s)...")
+        try:
+            fresh = _regenerate_outline_beats(good, problems, beats=beats, system=system, tone_block=tone_block)
+        except (ValueError, APIError) as e:
+            print(f"[WARN] Beat regeneration failed ({e}).")
+            break
+        for num, text in fresh.items():
+            fallback.setdefault(num, text)
+            if _beat_problem(text) is None:
+                good[num] = text
+        problems = {
+            num: (f"regenerated beat has {_beat_problem(fresh[num])}" if num in fresh else why)
+            for num, why in problems.items()
+            if num not in good
+        }
+        if not problems:
+            break
 
-    return response.choices[0].message.content
+    missing = [num for num in range(1, beats + 1) if not (good.get(num) or fallback.get(num))]
+    if missing:
+        raise ValueError(
+            f"Outline is still missing beat(s) {', '.join(str(num) for num in missing)} "
+            f"after {OUTLINE_REPAIR_ROUNDS} repair round(s)."
+        )
+    if problems:
+        print(f"[WARN] Outline beats still failing checks: {', '.join(str(num) for num in problems)}.")
+    extra = sorted(num for num in fallback if num > beats)
+    if extra:
+        print(f"[WARN] Outline has beat(s) beyond {beats}: {', '.join(str(num) for num in extra)}; kept at the end.")
+
+    intro = re.split(r"^\s*\d+\.\s+", outline, maxsplit=1, flags=re.M)[0].strip()
+    body = "\n\n".join(
+        f"{num}. {good.get(num) or fallback[num]}" for num in [*range(1, beats + 1), *extra]
+    )
+    return f"{intro}\n\n{body}" if intro else body
 
 
 # ---------- ALTERNATIVES TOOL ----------
 
+IMAGE_IDEAS_SCHEMA = _object({
+    "ideas": {
+        "type": "array",
+        "items": _object({
+            "subject": {"type": "string"},
+            "caption": {"type": "string"},
+            "visual_notes": {"type": "string"},
+        }),
+    },
+})
+
+TREATMENTS_SCHEMA = _object({
+    "treatments": {
+        "type": "array",
+        "items": _object({
+            "title": {"type": "string"},
+            "premise": {"type": "string"},
+            "central_anomaly": {"type": "string"},
+            "evidence": _str_list("Primary evidence items that would appear on screen."),
+            "escalation": _str_list("Exactly 3 short escalation points."),
+            "present_day_status": {"type": "string"},
+        }),
+    },
+})
+
+
+def render_image_ideas_markdown(ideas: list[dict]) -> str:
+    """Render image ideas in the 'N) IMAGE SUBJECT:' layout _extract_ab_image_ideas reads."""
+    blocks = []
+    for i, idea in enumerate(ideas, start=1):
+        blocks.append(
+            f"{i}) IMAGE SUBJECT: {idea['subject'].strip()}\n"
+            f"   CAPTION: {idea['caption'].strip()}\n"
+            f"   VISUAL NOTES: {idea['visual_notes'].strip()}"
+        )
+    return "\n\n".join(blocks)
+
+
+def render_treatments_markdown(treatments: list[dict]) -> str:
+    """Render story treatments in the numbered TITLE/PREMISE/... layout."""
+    blocks = []
+    for i, t in enumerate(treatments, start=1):
+        lines = [
+            f"{i}) TITLE: {t['title'].strip()}",
+            f"   PREMISE: {t['premise'].strip()}",
+            f"   CENTRAL ANOMALY: {t['central_anomaly'].strip()}",
+            "   EVIDENCE:",
+        ]
+        lines += [f"   - {e.strip()}" for e in t["evidence"]]
+        lines.append("   ESCALATION:")
+        lines += [f"   - {e.strip()}" for e in t["escalation"]]
+        lines.append(f"   PRESENT DAY STATUS: {t['present_day_status'].strip()}")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
 def generate_ideas_from_assistant(
     seed_idea: str,
     count: int = 5,
@@ -224,11 +1406,11 @@ SEED CONCEPT:
 TASK:
 Generate {count} distinct IMAGE IDEAS. Each idea should feel like one compelling image in the collection.
 
-For each numbered item, output EXACTLY this format:
+For each idea, fill in these JSON fields:
 
-N) IMAGE SUBJECT: <8–14 words>
-   CAPTION: <1 short sentence, curator/recovered-archive tone>
-   VISUAL NOTES: <comma-separated visual tags / details, ~12–25 words>
+- subject: 8–14 words
+- caption: 1 short sentence, curator/recovered-archive tone
+- visual_notes: comma-separated visual tags / details, ~12–25 words
 
 RULES:
 - Keep each item compact (no paragraphs).
@@ -267,43 +1449,35 @@ RULES:
     5. ESCALATION: 3 short bullet points that show how the situation worsens over time.
     6. PRESENT DAY STATUS: 1–2 sentences about what the world looks like after the events (cover-up? quiet integration? unexplained disappearances?).
 
-    FORMAT IT LIKE THIS:
-
-    1) TITLE: ...
-       PREMISE: ...
-       CENTRAL ANOMALY: ...
-       EVIDENCE:
-       - ...
-       - ...
-       ESCALATION:
-       - ...
-       - ...
-       - ...
-       PRESENT DAY STATUS: ...
+    Return the treatments as JSON, one entry per treatment, using the fields
+    title, premise, central_anomaly, evidence, escalation and present_day_status.
+    """
 
-    2) TITLE: ...
-       ...
+    system = (
+        "You generate structured horror story treatments with concrete investigative details. "
+        "You do not describe internal emotions directly; you show events, documents, and observable behavior."
+    )
 
-    Make sure each treatment is clearly separated and numbered.
-    """
+    if channel == "aperture":
+        data = call_llm_json(
+            system=system,
+            user=prompt,
+            schema=IMAGE_IDEAS_SCHEMA,
+            schema_name="image_ideas",
+            max_tokens=2000,
+            temperature=0.9,
+        )
+        return render_image_ideas_markdown(data["ideas"][:count])
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You generate structured horror story treatments with concrete investigative details. "
-                    "You do not describe internal emotions directly; you show events, documents, and observable behavior."
-                ),
-            },
-            {"role": "user", "content": prompt},
-        ],
+    data = call_llm_json(
+        system=system,
+        user=prompt,
+        schema=TREATMENTS_SCHEMA,
+        schema_name="story_treatments",
         max_tokens=2000,
         temperature=0.9,
     )
-
-    return response.choices[0].message.content
+    return render_treatments_markdown(data["treatments"][:count])
 
 # ---------- IDEA LOCKER TOOL ----------
 
@@ -553,24 +1727,17 @@ def generate_metadata(seed_idea: str, channel: str = "shrouded") -> str:
 
     prompt = build_metadata_prompt(seed_idea, channel)
 
-    response = client.chat.completions.create(
+    return call_llm(
+        system=(
+            "You are an expert YouTube metadata strategist for horror channels. "
+            "You balance SEO with atmospheric, emotionally resonant language."
+        ),
+        user=prompt,
         model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are an expert YouTube metadata strategist for horror channels. "
-                    "You balance SEO with atmospheric, emotionally resonant language."
-                ),
-            },
-            {"role": "user", "content": prompt},
-        ],
         max_tokens=900,
         temperature=0.7,
     )
 
-    return response.choices[0].message.content
-
 
 # ---------- SCRIPT EXPANDER WRAPPER ----------
 
@@ -578,7 +1745,7 @@ def expand_from_assistant(beat_text: str, channel: str = "shrouded", broll: bool
     """
     Expand a single outline beat into a full narrated script segment.
 
-    Uses script_expander.py under the hood.
+    Uses script_expander.py's prompt under the hood.
 
     Parameters:
         beat_text: One outline beat or descriptive sentence.
@@ -589,36 +1756,317 @@ def expand_from_assistant(beat_text: str, channel: str = "shrouded", broll: bool
         Expanded narration text as a string.
     """
 
-    from script_expander import expand_script  # local import
-    return expand_script(beat_text, channel=channel, broll=broll)
+    from script_expander import build_prompt  # local import
+
+    # Same request as script_expander.expand_script, but through call_llm so it is hedged
+    with trace_span("build prompt"):
+        prompt = build_prompt(beat_text, channel, include_broll=broll)
+    return call_llm(
+        system="You are an expert documentary narrator and scriptwriter for atmospheric horror channels.",
+        user=prompt,
+        model="gpt-4o-mini",
+        max_tokens=1500,
+        temperature=0.75,
+    )
 
 # ---------- TEMP. CONTENT CHECK ----------
 
-def _looks_like_refusal(text: str) -> bool:
-    t = (text or "").strip().lower()
-    needles = [
-        "i'm sorry", "i am sorry",
-        "can't assist", "cannot assist",
-        "can't help with that", "cannot help with that",
-        "can't comply", "cannot comply",
-        "can't complete", "cannot complete",
-        "unable to help", "not able to help",
-        "policy",
-    ]
-    return any(n in t for n in needles)
+# A refusal opens the reply ("I'm sorry, but I can't help with that."); the same
+# words further into a polished script are just the story.
+_REFUSAL_RE = re.compile(
+    r"^(?:"
+    r"(?:i['’]m|i am) sorry\b[^.!?\n]*\b(?:can(?:no|['’])?t|unable|not able|won['’]t)\b"
+    r"|i(?: can(?:no|['’])?t| won['’]t|(?: am|['’]m) unable to|(?: am|['’]m) not able to)"
+    r" (?:help|assist|comply|complete|continue|fulfil|fulfill|provide|do that|rewrite|polish)"
+    r")",
+    re.IGNORECASE,
+)
 
 
-def debug_find_refusal_chunk(script_text: str, mode: str = "tighten", chunk_chars: int = 6000) -> None:
-    chunks = [script_text[i:i+chunk_chars] for i in range(0, len(script_text), chunk_chars)]
-    for idx, ch in enumerate(chunks, start=1):
-        out = polish_script_text(ch, mode=mode)
-        if _looks_like_refusal(out):
-            print(f"[REFUSAL] chunk {idx}/{len(chunks)} triggered refusal.")
-            print(ch[:500])
-            return
+def _looks_like_refusal(text: str) -> bool:
+    return bool(_REFUSAL_RE.match((text or "").strip()))
+
+
+# ---------- MODEL FALLBACK CASCADE ----------
+
+# Tiers tried after the primary model (--model) when a call refuses or fails.
+# A tier is either a model name, or "mode:<polish mode>" to retry the primary
+# model in that polish mode. Override per run with --cascade.
+COMMAND_FALLBACKS = {
+    "script-polish": ["gpt-4o", "mode:neutral-tighten"],
+    "publish-pack": ["gpt-4o"],
+}
+
+
+def build_cascade(model: str, fallbacks: list[str]) -> list[dict]:
+    """
+    Turn the primary model plus fallback tier specs into a list of
+    {"label", "model", "mode"} dicts (mode None = keep the requested mode).
+    """
+    tiers = [{"label": f"primary ({model})", "model": model, "mode": None}]
+    for spec in fallbacks:
+        spec = spec.strip()
+        if not spec:
+            continue
+        if spec.startswith("mode:"):
+            fallback_mode = spec.split(":", 1)[1].strip().lower()
+            if fallback_mode not in SCRIPT_POLISH_MODES:
+                valid = ", ".join(sorted(SCRIPT_POLISH_MODES.keys()))
+                raise ValueError(f"Unknown cascade mode: {fallback_mode}. Valid: {valid}")
+            tiers.append({"label": f"{fallback_mode} ({model})", "model": model, "mode": fallback_mode})
+        elif spec != model:
+            tiers.append({"label": f"fallback ({spec})", "model": spec, "mode": None})
+    return tiers
+
+
+def cascade_for(command: str, model: str, override: str | None = None) -> list[dict]:
+    """
+    Cascade for a CLI command: --cascade (comma-separated tiers, or 'none')
+    wins over COMMAND_FALLBACKS.
+    """
+    if override is not None:
+        specs = [] if override.strip().lower() == "none" else override.split(",")
+    else:
+        specs = COMMAND_FALLBACKS.get(command, [])
+    return build_cascade(model, specs)
+
+
+def run_cascade(tiers: list[dict], attempt, is_refusal=None):
+    """
+    Call attempt(tier) for each tier in order until one returns a usable result.
+    A tier fails if it raises ValueError/APIError (invalid structured output,
+    LLMRefusal, API errors). Pass is_refusal (e.g. _looks_like_refusal) only
+    when attempt returns free-form prose from a call that does not detect
+    refusals itself; rendered structured output is never text-matched.
+
+    Returns (result, tier), or (None, None) if every tier failed.
+    """
+    for tier in tiers:
+        try:
+            result = attempt(tier)
+        except (ValueError, APIError) as e:
+            print(f"[WARN] {tier['label']} failed: {e}")
+            continue
+        if is_refusal is not None and isinstance(result, str) and is_refusal(result):
+            print(f"[WARN] {tier['label']} refused")
+            continue
+        return result, tier
+    return None, None
+
+
+# Polished outputs keyed by (model, mode, prompt hash, text hash), shared across
+# chunks and bisection halves within one command. Least recently used entries are
+# evicted past POLISH_CACHE_SIZE; main() empties it, so a daemon never serves one
+# command's polish to the next.
+POLISH_CACHE_SIZE = 512
+_POLISH_CACHE: OrderedDict[tuple[str, str, str, str], str] = OrderedDict()
+_polish_cache_lock = threading.Lock()
+
+
+def _cached_polish(text: str, mode: str, model: str, context: str = "") -> str:
+    system, instructions = _polish_prompt(mode, context)
+    key = (
+        model,
+        mode,
+        hashlib.sha1((system + "\0" + instructions).encode("utf-8")).hexdigest(),
+        hashlib.sha1(text.encode("utf-8")).hexdigest(),
+    )
+    with _polish_cache_lock:
+        cached = _POLISH_CACHE.get(key)
+        if cached is not None:
+            _POLISH_CACHE.move_to_end(key)
+    if cached is not None:
+        record_llm_call(model=model, latency=0.0, cache_hit=True)
+        return cached
+
+    polished = polish_script_text(text, mode=mode, model=model, context=context)
+    with _polish_cache_lock:
+        _POLISH_CACHE[key] = polished
+        _POLISH_CACHE.move_to_end(key)
+        while len(_POLISH_CACHE) > POLISH_CACHE_SIZE:
+            _POLISH_CACHE.popitem(last=False)
+    return polished
+
+
+def _split_paragraphs(text: str) -> list[str]:
+    return [p.strip() for p in re.split(r"\n\s*\n", text.strip()) if p.strip()]
+
+
+def _split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in re.split(r"(?<=[.!?])[\"”’)]*\s+", text.strip()) if s.strip()]
+
+
+def isolate_refusals(
+    text: str,
+    *,
+    mode: str,
+    model: str,
+    fallback_tiers: list[dict] | None = None,
+) -> tuple[str, list[dict]]:
+    """
+    Polish text that refused as a whole by bisecting it on paragraph boundaries
+    (then sentence boundaries inside a single paragraph) until the refused
+    span is found. Halves that polish cleanly keep their output, so the rest
+    of the pass proceeds; each refused span costs O(log n) calls, and every
+    result is cached.
+
+    Only the refused spans are retried, through fallback_tiers (see
+    build_cascade). A span that still refuses is kept as original text.
+
+    Returns (stitched_output, spans) where each span is
+    {"text": ..., "resolved_by": <tier label> | "original"}.
+    """
+    spans: list[dict] = []
+
+    def retry_span(span: str) -> str:
+        out, tier = run_cascade(
+            fallback_tiers or [],
+            lambda t: _cached_polish(span, t["mode"] or mode, t["model"]),
+        )
+        if tier is None:
+            spans.append({"text": span, "resolved_by": "original"})
+            return span
+        spans.append({"text": span, "resolved_by": tier["label"]})
+        return out
+
+    def bisect(units: list[str], joiner: str) -> str:
+        segment = joiner.join(units)
+        try:
+            return _cached_polish(segment, mode, model)
+        except LLMRefusal:
+            pass
+        except APIError as e:
+            # The primary errored (not refused): hand the whole segment to the fallbacks
+            print(f"[WARN] primary ({model}) failed: {e}")
+            return retry_span(segment)
+
+        if len(units) == 1:
+            sentences = _split_sentences(segment) if joiner != " " else []
+            if len(sentences) > 1:
+                return bisect(sentences, " ")
+            return retry_span(segment)
+
+        mid = len(units) // 2
+        return bisect(units[:mid], joiner) + joiner + bisect(units[mid:], joiner)
+
+    paragraphs = _split_paragraphs(text)
+    if not paragraphs:
+        return text, spans
+    return bisect(paragraphs, "\n\n"), spans
+
+
+def debug_find_refusal_chunk(script_text: str, mode: str = "tighten", model: str = "gpt-4o-mini") -> None:
+    """
+    Print the spans of script_text that trigger a refusal, found by bisection
+    (see isolate_refusals) instead of re-polishing fixed-size slices.
+    """
+    _, spans = isolate_refusals(script_text, mode=mode, model=model)
+    if not spans:
+        print("[OK] No span refused (full script refusal may be length/interaction effect).")
+        return
+    for span in spans:
+        print(f"[REFUSAL] {len(span['text'])} chars:")
+        print(span["text"][:500])
+
+
+# ---------- TOKEN-BUDGETED CHUNKER ----------
+
+# Polish input budget per chunk. Output is roughly the same length as input,
+# so this keeps each call well inside polish_script_text's 3500-token limit.
+CHUNK_TOKENS = 1200
+CHUNK_OVERLAP_TOKENS = 0
+CHUNK_WORKERS = 4
+CHARS_PER_TOKEN = 4   # rough average for English prose
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, without a tokenizer dependency."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _hard_split(text: str, max_tokens: int) -> list[str]:
+    """Split one over-long sentence on word boundaries."""
+    pieces, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and estimate_tokens(candidate) > max_tokens:
+            pieces.append(current)
+            candidate = word
+        current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _overlap_tail(text: str, overlap_tokens: int) -> str:
+    """The last whole sentences of text that fit in overlap_tokens."""
+    tail: list[str] = []
+    for sentence in reversed(_split_sentences(text)):
+        if tail and estimate_tokens(" ".join([sentence] + tail)) > overlap_tokens:
+            break
+        tail.insert(0, sentence)
+    tail_text = " ".join(tail)
+    return tail_text if estimate_tokens(tail_text) <= overlap_tokens else tail_text[-overlap_tokens * CHARS_PER_TOKEN:]
+
+
+def chunk_text(
+    text: str,
+    target_tokens: int = CHUNK_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> list[dict]:
+    """
+    Split text into chunks of at most ~target_tokens, breaking at paragraph
+    boundaries, then sentence boundaries for over-long paragraphs, then word
+    boundaries for over-long sentences.
+
+    Each chunk is {"text", "joiner", "context"}: joiner is the separator that
+    goes before it when stitching ("" for the first chunk), and context is the
+    tail of the previous chunk (up to overlap_tokens) to show the model as
+    read-only continuity. The overlap never appears in "text", so stitched
+    output has no duplicated text.
+    """
+    units: list[tuple[str, str]] = []   # (unit text, separator before it)
+    for paragraph in _split_paragraphs(text):
+        if estimate_tokens(paragraph) <= target_tokens:
+            units.append((paragraph, "\n\n"))
+            continue
+        first = True
+        for sentence in _split_sentences(paragraph):
+            pieces = [sentence] if estimate_tokens(sentence) <= target_tokens else _hard_split(sentence, target_tokens)
+            for piece in pieces:
+                units.append((piece, "\n\n" if first else " "))
+                first = False
+
+    groups: list[list[tuple[str, str]]] = []
+    size = 0   # characters in the current group, separators included
+    for unit, joiner in units:
+        if groups and (size + len(joiner) + len(unit)) // CHARS_PER_TOKEN <= target_tokens:
+            groups[-1].append((unit, joiner))
+            size += len(joiner) + len(unit)
         else:
-            print(f"[OK] chunk {idx}/{len(chunks)} polished.")
-    print("[OK] No chunk refused (full script refusal may be length/interaction effect).")
+            groups.append([(unit, joiner)])
+            size = len(unit)
+
+    chunks: list[dict] = []
+    for i, group in enumerate(groups):
+        chunk = group[0][0] + "".join(joiner + unit for unit, joiner in group[1:])
+        context = _overlap_tail(chunks[-1]["text"], overlap_tokens) if chunks and overlap_tokens > 0 else ""
+        chunks.append({"text": chunk, "joiner": group[0][1] if i else "", "context": context})
+    return chunks
+
+
+def process_chunks(chunks: list[dict], worker, workers: int = CHUNK_WORKERS) -> list:
+    """Run worker(chunk) for every chunk in parallel; results keep chunk order."""
+    if len(chunks) <= 1 or workers <= 1:
+        return [worker(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        futures = [_submit(pool, worker, chunk) for chunk in chunks]
+        return [future.result() for future in futures]
+
+
+def stitch_chunks(chunks: list[dict], outputs: list[str]) -> str:
+    """Join per-chunk outputs back together with each chunk's original separator."""
+    return "".join(chunk["joiner"] + out.strip() for chunk, out in zip(chunks, outputs))
 
 
 # ---------- SCRIPT POLISHER ----------
@@ -643,7 +2091,8 @@ SCRIPT_POLISH_MODES = {
     },
 }
 
-def polish_script_text(script_text: str, mode: str = "tighten", model: str = "gpt-4o-mini") -> str:
+def _polish_prompt(mode: str, context: str = "") -> tuple[str, str]:
+    """(system, instructions) for a polish call; the script text is appended to instructions."""
     mode = (mode or "tighten").strip().lower()
     if mode not in SCRIPT_POLISH_MODES:
         valid = ", ".join(sorted(SCRIPT_POLISH_MODES.keys()))
@@ -691,29 +2140,83 @@ MODE GOAL:
 {mode_notes}
 
 HARD CONSTRAINTS:
-- """ + "\n- ".join(constraints) + """
+- """ + "\n- ".join(constraints) + f"""
 
 OUTPUT RULES:
 - Return ONLY the polished script text.
 - Do not include headings, analysis, bullet points, or commentary.
 - Keep paragraph breaks logical and consistent with the original.
+""" + (f"""
+PRECEDING CONTEXT (already polished elsewhere; for continuity only, do NOT rewrite or repeat it):
+{context}
+""" if context else "")
+    return system, user
+
 
+def polish_script_text(
+    script_text: str,
+    mode: str = "tighten",
+    model: str = "gpt-4o-mini",
+    context: str = "",
+) -> str:
+    system, instructions = _polish_prompt(mode, context)
+    user = instructions + f"""
 DRAFT 0 SCRIPT:
 {script_text}
 """.strip()
 
-
     polished = call_llm(
     system=system,
     user=user,
-    model="gpt-4o-mini",
+    model=model,
     max_tokens=3500,
     temperature=0.4,
+    detect_refusal=True,  # raises LLMRefusal instead of returning the refusal as "polished" text
 )
 
     return polished.strip()
 
-def polish_script_notes(script_text: str, mode: str = "tighten", model: str = "gpt-4o-mini") -> str:
+POLISH_NOTES_SCHEMA = _object({
+    "issues": _str_list("Issues to fix."),
+    "specificity_upgrades": {
+        "type": "array",
+        "items": _object({"vague": {"type": "string"}, "specific": {"type": "string"}}),
+    },
+    "emotion_labeling_removals": _str_list("Emotion-labeling phrases to remove; empty if none."),
+    "sentence_swaps": {
+        "type": "array",
+        "items": _object({"original": {"type": "string"}, "replacement": {"type": "string"}}),
+    },
+})
+
+
+def render_polish_notes_markdown(notes: dict) -> str:
+    """
+    Render polish notes in the markdown layout that extract_sentence_swaps parses.
+    """
+    def bullets(items: list[str]) -> list[str]:
+        return [f"- {item.strip()}" for item in items] or ["- None"]
+
+    lines = ["## Issues to fix"]
+    lines += bullets(notes["issues"])
+    lines += ["", "## Specificity upgrades"]
+    lines += bullets([f"{u['vague'].strip()} -> {u['specific'].strip()}" for u in notes["specificity_upgrades"]])
+    lines += ["", "## Emotion-labeling removals"]
+    lines += bullets(notes["emotion_labeling_removals"])
+    lines += ["", "## Optional sentence swaps"]
+    for swap in notes["sentence_swaps"]:
+        lines.append(f'- Original: "{swap["original"].strip()}"')
+        lines.append(f'- Replacement: "{swap["replacement"].strip()}"')
+        lines.append("")
+    return "\n".join(lines).strip()
+
+
+def polish_script_notes(
+    script_text: str,
+    mode: str = "tighten",
+    model: str = "gpt-4o-mini",
+    context: str = "",
+) -> str:
     system = (
         "You are a professional copy editor. The user is writing FICTIONAL narration.\n"
         "Do NOT rewrite the entire passage.\n"
@@ -729,21 +2232,29 @@ MODE: {mode.upper()}
 
 RULES:
 - Do NOT produce a full rewritten passage.
-- Output in this exact structure:
-
-## Issues to fix (bullet list)
-## Specificity upgrades (bullet list: vague phrase -> more specific alternative)
-## Emotion-labeling removals (bullet list; if none say 'None')
-## Optional sentence swaps (3–6 items)
-Each swap should include:
-- Original: "..."
-- Replacement: "..."
-
+- Fill in every JSON field:
+  - issues: issues to fix
+  - specificity_upgrades: vague phrase -> more specific alternative
+  - emotion_labeling_removals: phrases that label emotions (empty list if none)
+  - sentence_swaps: 3–6 items; "original" must be copied EXACTLY from the text
+""" + (f"""
+PRECEDING CONTEXT (for continuity only; do NOT write notes about it):
+{context}
+""" if context else "") + f"""
 TEXT:
 {script_text}
 """.strip()
 
-    return call_llm(system=system, user=user, model=model, max_tokens=1200, temperature=0.2).strip()
+    notes = call_llm_json(
+        system=system,
+        user=user,
+        schema=POLISH_NOTES_SCHEMA,
+        schema_name="polish_notes",
+        model=model,
+        max_tokens=1200,
+        temperature=0.2,
+    )
+    return render_polish_notes_markdown(notes)
 
 
 
@@ -782,6 +2293,10 @@ def run_script_polish(
     output_format: str = "rewrite",   # "rewrite" or "notes"
     narration_only: bool = True,      # <<< NEW: only polish narration sections
     debug: bool = False,              # <<< OPTIONAL: print chunk previews
+    cascade: list[dict] | None = None,
+    chunk_tokens: int = CHUNK_TOKENS,
+    chunk_overlap: int = CHUNK_OVERLAP_TOKENS,
+    workers: int = CHUNK_WORKERS,
 ) -> Path:
     """
     Reads script.md, generates either:
@@ -792,7 +2307,20 @@ def run_script_polish(
     narration_only=True:
       - Extracts only the ### NARRATION: section (or ### 1) NARRATION:) from each beat.
       - Leaves Source beat / B-roll / TODO scaffolding untouched.
+
+    cascade (see build_cascade) is the primary model followed by fallback tiers;
+    it defaults to COMMAND_FALLBACKS["script-polish"]. In rewrite mode a refused
+    section is narrowed down with isolate_refusals() and only the refused span
+    goes through the fallback tiers; in notes mode the whole section does.
+    The tier that produced each section is reported in script_polish_refusals.txt.
+
+    Sections longer than chunk_tokens are split with chunk_text() (optionally
+    giving each chunk chunk_overlap tokens of the previous one as context),
+    polished on `workers` threads and stitched back together.
     """
+    if cascade is None:
+        cascade = cascade_for("script-polish", model)
+    model = cascade[0]["model"]
 
     def extract_narration_only(text: str) -> str | None:
         """
@@ -816,19 +2344,24 @@ def run_script_polish(
     if not script_path.exists():
         raise FileNotFoundError(f"Missing script.md at: {script_path}")
 
-    draft0 = script_path.read_text(encoding="utf-8").strip()
+    with trace_span("read file", path=script_path):
+        draft0 = read_project_file(script_path).strip()
     if not draft0:
         raise ValueError(f"script.md is empty: {script_path}")
 
-    chunks = _split_script_into_beats(draft0)
+    with trace_span("parse beats"):
+        chunks = parse_project_file(script_path, "beats", lambda text: _split_script_into_beats(text.strip()))
 
     polished_parts: list[str] = []
     refusal_hits: list[str] = []
+    section_tiers: list[tuple[str, str]] = []
 
-    for heading, body in chunks:
+    for chunk_index, (heading, body) in enumerate(chunks):
         original_chunk = (heading + "\n\n" + body).strip() if heading else body.strip()
         if not original_chunk:
             continue
+        beat_match = re.search(r"\d+", heading)
+        set_ledger_context(beat=int(beat_match.group()) if beat_match else chunk_index)
 
         if debug:
             print("=" * 60)
@@ -848,20 +2381,68 @@ def run_script_polish(
                 continue
             target_text = narration_text
 
-        # Choose output behavior
-        if output_format == "notes":
-            out = polish_script_notes(target_text, mode=mode, model=model)
-        else:
-            out = polish_script_text(target_text, mode=mode, model=model)
+        label = heading or "[PREAMBLE/NO BEAT HEADING]"
+
+        # Long sections (e.g. drafts without ## Beat headings) are split to the
+        # token budget and the chunks are polished in parallel.
+        pieces = chunk_text(target_text, target_tokens=chunk_tokens, overlap_tokens=chunk_overlap)
+        if len(pieces) > 1:
+            print(f"[INFO] {label}: ~{estimate_tokens(target_text)} tokens → {len(pieces)} chunks")
 
-        # Refusal handling (keep original content, log which section refused)
-        if _looks_like_refusal(out):
-            label = heading or "[PREAMBLE/NO BEAT HEADING]"
-            refusal_hits.append(label)
+        def polish_piece(numbered: tuple[int, dict]) -> tuple[str | None, list[str], tuple[str, str]]:
+            """Returns (output or None to keep the original, refusal hits, (label, tier))."""
+            index, piece = numbered
+            text, context = piece["text"], piece["context"]
+            part = label if len(pieces) == 1 else f"{label} [chunk {index}/{len(pieces)}]"
 
-            # In narration_only mode, we keep the whole original chunk untouched
+            if output_format == "notes":
+                out, tier = run_cascade(
+                    cascade,
+                    lambda t: polish_script_notes(text, mode=t["mode"] or mode, model=t["model"], context=context),
+                )
+                if tier is None:
+                    # Every tier refused or returned invalid notes
+                    return None, [f"{part} → original"], (part, "original (all tiers refused)")
+                hits = [] if tier is cascade[0] else [f"{part} → {tier['label']}"]
+                return out, hits, (part, tier["label"])
+
+            try:
+                out = _cached_polish(text, mode, model, context)
+                return out, [], (part, cascade[0]["label"])
+            except LLMRefusal:
+                pass
+            except APIError as e:
+                # Errored rather than refused: retry the whole chunk down the cascade
+                print(f"[WARN] {cascade[0]['label']} failed on {part}: {e}")
+                out, tier = run_cascade(
+                    cascade[1:],
+                    lambda t: _cached_polish(text, t["mode"] or mode, t["model"], context),
+                )
+                if tier is None:
+                    return None, [f"{part} → original ({e})"], (part, "original (all tiers failed)")
+                return out, [f"{part} → {tier['label']}"], (part, tier["label"])
+
+            out, spans = isolate_refusals(text, mode=mode, model=model, fallback_tiers=cascade[1:])
+            hits = []
+            for span in spans:
+                preview = span["text"].replace("\n", " ")[:120]
+                hits.append(f"{part}: \"{preview}\" → {span['resolved_by']}")
+            resolved = sorted({span["resolved_by"] for span in spans})
+            return out, hits, (part, f"{cascade[0]['label']} + {len(spans)} span(s) via {', '.join(resolved)}")
+
+        results = process_chunks(list(enumerate(pieces, start=1)), polish_piece, workers=workers)
+        for _, hits, tier_entry in results:
+            refusal_hits.extend(hits)
+            section_tiers.append(tier_entry)
+
+        if all(out is None for out, _, _ in results):
             polished_parts.append(original_chunk)
             continue
+        if output_format == "notes":
+            out = "\n\n".join(out.strip() for out, _, _ in results if out)
+        else:
+            # A chunk that could not be polished keeps its original text
+            out = stitch_chunks(pieces, [out if out is not None else piece["text"] for (out, _, _), piece in zip(results, pieces)])
 
         # Stitch output back into the chunk (narration-only handling)
         if narration_only:
@@ -889,6 +2470,7 @@ def run_script_polish(
             # Not narration_only: output replaces the whole chunk
             polished_parts.append(out.strip())
 
+    set_ledger_context(beat=None)
     polished = "\n\n".join(polished_parts).strip()
 
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -899,19 +2481,27 @@ def run_script_polish(
         f"- Format: {output_format}\n"
         f"- Narration-only: {narration_only}\n"
         f"- Model: {model}\n"
+        f"- Cascade: {' → '.join(t['label'] for t in cascade)}\n"
         f"- Generated: {timestamp}\n"
         f"---\n\n"
     )
 
-    # If anything refused, write a debug file next to the output
-    if refusal_hits:
-        debug_path = project_dir / "script_polish_refusals.txt"
-        debug_path.write_text(
-            "Refusal detected in these sections:\n"
+    # Always write the tier report next to the output (replacing any earlier run's),
+    # so a clean pass still records which model produced each section
+    debug_path = project_dir / "script_polish_refusals.txt"
+    debug_path.write_text(
+        (
+            "Refusal detected in these sections (isolated span → how it was resolved):\n"
             + "\n".join(f"- {h}" for h in refusal_hits)
-            + "\n",
-            encoding="utf-8",
+            if refusal_hits
+            else "No refusals."
         )
+        + "\n\nTier that produced each section:\n"
+        + "\n".join(f"- {label}: {tier_label}" for label, tier_label in section_tiers)
+        + "\n",
+        encoding="utf-8",
+    )
+    if refusal_hits:
         print(f"[WARN] Refusals detected. See: {debug_path}")
 
     # Choose default output filename by format
@@ -923,7 +2513,8 @@ def run_script_polish(
 
     out_name = output.strip() if output else default_out
     out_path = project_dir / out_name
-    out_path.write_text(header.strip() + "\n\n" + polished + "\n", encoding="utf-8")
+    with trace_span("write file", path=out_path):
+        out_path.write_text(header.strip() + "\n\n" + polished + "\n", encoding="utf-8")
     return out_path
 
 
@@ -1040,6 +2631,30 @@ def run_narration_finalize(project_dir: Path, apply: str, dry_run: bool = False)
 
 # ---------- THUMBNAIL GENERATOR WRAPPER ----------
 
+THUMBNAIL_CONCEPTS_SCHEMA = _object({
+    "concepts": {
+        "type": "array",
+        "items": _object({
+            "title": {"type": "string"},
+            "composition": {"type": "string"},
+            "leonardo_prompt": {"type": "string"},
+        }),
+    },
+})
+
+
+def render_thumbnail_concepts_markdown(concepts: list[dict]) -> str:
+    """Render thumbnail concepts as numbered CONCEPT TITLE / COMPOSITION / LEONARDO PROMPT blocks."""
+    blocks = []
+    for i, c in enumerate(concepts, start=1):
+        blocks.append(
+            f"{i}) CONCEPT TITLE: {c['title'].strip()}\n"
+            f"   COMPOSITION: {c['composition'].strip()}\n"
+            f"   LEONARDO PROMPT: {c['leonardo_prompt'].strip()}"
+        )
+    return "\n\n".join(blocks)
+
+
 def generate_thumbnails_from_assistant(seed_text: str, channel: str = "shrouded") -> str:
     """
     Generate thumbnail concept ideas and image prompts.
@@ -1089,32 +2704,508 @@ SEED IDEA:
 \"\"\"{seed_text}\"\"\"
 
 FORMAT:
-- Number each concept.
-- For each, clearly label:
-  - CONCEPT TITLE
-  - COMPOSITION
-  - LEONARDO PROMPT
+- Return JSON with one entry per concept, using the fields title, composition and leonardo_prompt.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": "You generate horror thumbnail concepts and concrete image prompts.",
-            },
-            {"role": "user", "content": prompt},
-        ],
+    # Pool concepts from several choices of one request, then keep the best few
+    choices = call_llm_json_choices(
+        system="You generate horror thumbnail concepts and concrete image prompts.",
+        user=prompt,
+        schema=THUMBNAIL_CONCEPTS_SCHEMA,
+        schema_name="thumbnail_concepts",
         max_tokens=900,
         temperature=0.8,
+        n=THUMBNAIL_CHOICES,
     )
+    pool = [concept for data in choices for concept in data["concepts"]]
+    concepts = rank_candidates(
+        pool,
+        seed_text,
+        limit=THUMBNAIL_KEEP,
+        text_of=lambda c: f"{c['title']} {c['composition']}",
+        key_of=lambda c: c["title"],
+    )
+    return render_thumbnail_concepts_markdown(concepts)
+
+# ---------- CANDIDATE POOLING & RANKING ----------
+
+# Choices (n) requested per call when pooling variants locally.
+TITLE_POOL_CHOICES = 3
+THUMBNAIL_CHOICES = 2
+THUMBNAIL_KEEP = 5
+
+_STOPWORDS = {
+    "the", "and", "that", "this", "with", "from", "they", "their", "there", "were", "what",
+    "when", "where", "which", "while", "into", "onto", "over", "under", "about", "have",
+    "has", "had", "been", "being", "will", "would", "could", "should", "then", "than",
+    "them", "your", "yours", "just", "only", "some", "every", "each", "after", "before",
+    "because", "still", "through", "again", "ever", "never", "nothing", "something",
+}
+
+
+def _content_words(text: str) -> list[str]:
+    return [w for w in re.findall(r"[a-z0-9']+", text.lower()) if len(w) > 3 and w not in _STOPWORDS]
+
+
+def _similar(a: set[str], b: set[str], threshold: float = 0.7) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= threshold
+
+
+def rank_candidates(
+    candidates: list,
+    source_text: str,
+    *,
+    limit: int,
+    text_of=lambda c: c,
+    key_of=lambda c: c,
+    length_of=None,
+) -> list:
+    """
+    Pool candidates from several choices, fold near-duplicates together and rank:
+      - consensus: +1 for every other choice that proposed a near-duplicate
+      - relevance: overlap with the source's most frequent content words (max 3)
+      - length_of(candidate) -> bonus/penalty, if given (e.g. title truncation)
+    Ties keep first-seen order. Returns at most `limit` candidates.
+    """
+    keywords = {w for w, _ in Counter(_content_words(source_text)).most_common(25)}
+    groups: list[dict] = []
+    for candidate in candidates:
+        words = set(_content_words(key_of(candidate))) or {key_of(candidate).strip().lower()}
+        for group in groups:
+            if _similar(words, group["words"]):
+                group["votes"] += 1
+                break
+        else:
+            groups.append({"candidate": candidate, "words": words, "votes": 0})
+
+    def score(group: dict) -> float:
+        candidate = group["candidate"]
+        relevance = min(3, len(set(_content_words(text_of(candidate))) & keywords))
+        bonus = length_of(candidate) if length_of else 0.0
+        return group["votes"] + relevance + bonus
+
+    ranked = sorted(enumerate(groups), key=lambda pair: (-score(pair[1]), pair[0]))
+    return [group["candidate"] for _, group in ranked[:limit]]
+
+
+def _title_length_score(title: str) -> float:
+    """YouTube cuts titles around 70 characters; very short ones under-describe."""
+    length = len(title.strip())
+    if length > 70:
+        return -2.0
+    if 30 <= length <= 65:
+        return 1.0
+    return 0.0
+
+
+TITLE_POOL_SCHEMA = _object({"titles": _str_list("Distinct YouTube title options.")})
+
+
+def generate_title_pool(
+    source_text: str,
+    *,
+    channel: str = "shrouded",
+    model: str = "gpt-4o-mini",
+    count: int = 10,
+) -> list[str]:
+    """
+    Extra title variants from one request with TITLE_POOL_CHOICES choices,
+    for pooling with a publish pack's own titles.
+    """
+    voice = "The Shrouded Ledger (investigative documentary horror)" if channel == "shrouded" else "Aperture Black (liminal, image-driven horror)"
+    user = f"""
+Write {count} distinct YouTube title options for a {voice} video.
+
+RULES:
+- Under 70 characters each; no clickbait ALL CAPS; no emoji.
+- Use concrete nouns, places, artifacts or events from the source.
+- Vary the angle: mystery, document/evidence, place, consequence.
+
+SOURCE:
+{source_text[:12000]}
+""".strip()
+    choices = call_llm_json_choices(
+        system="You write precise, curiosity-driven YouTube titles for horror channels.",
+        user=user,
+        schema=TITLE_POOL_SCHEMA,
+        schema_name="title_pool",
+        model=model,
+        max_tokens=500,
+        temperature=0.9,
+        n=TITLE_POOL_CHOICES,
+    )
+    return [title for data in choices for title in data["titles"]]
+
+
+def pool_titles(pack_titles: list[str], source_text: str, *, channel: str, model: str, count: int) -> list[str]:
+    """Pack titles plus a pooled variant request, ranked locally down to `count`."""
+    try:
+        extra = generate_title_pool(source_text, channel=channel, model=model, count=count)
+    except (ValueError, APIError) as e:
+        print(f"[WARN] Title pool failed ({e}); keeping the pack's own titles.")
+        extra = []
+    return rank_titles(pack_titles + extra, source_text, count)
+
+
+def rank_titles(titles: list[str], source_text: str, count: int) -> list[str]:
+    cleaned = [t.strip().strip('"') for t in titles if t.strip()]
+    return rank_candidates(cleaned, source_text, limit=count, length_of=_title_length_score)
 
-    return response.choices[0].message.content
 
 # ---------- PUBLISH PACK GENERATOR ----------
 
 # ---------- PUBLISH PACK TOOL ----------
 
+# Token budget per section when a pack is generated with parallel_sections=True.
+PACK_SECTION_BUDGETS = {
+    "titles": 400,
+    "descriptions": 1500,
+    "tags": 300,
+    "hashtags": 200,
+    "thumbnail_concepts": 900,
+}
+PACK_SECTION_RETRIES = 2
+
+def _publish_pack_schema(include_thumbnails: bool = True) -> dict:
+    properties = {
+        "titles": _str_list("Title options."),
+        "descriptions": _str_list("Full description texts."),
+        "tags": _str_list("Individual tags, without '#'."),
+        "hashtags": _str_list("Hashtags, each starting with '#'."),
+    }
+    if include_thumbnails:
+        properties["thumbnail_concepts"] = {
+            "type": "array",
+            "items": _object({
+                "concept": {"type": "string"},
+                "overlay_text": {"type": "string"},
+                "visual_notes": {"type": "string"},
+            }),
+        }
+    return _object(properties)
+
+
+def generate_pack_sections(
+    *,
+    system: str,
+    user: str,
+    schema: dict,
+    schema_name: str,
+    model: str,
+    temperature: float,
+    budgets: dict[str, int] = PACK_SECTION_BUDGETS,
+) -> dict:
+    """
+    Generate each top-level field of a publish-pack schema as its own concurrent
+    request with its own token budget, and assemble them into one pack dict.
+
+    All requests share the same prompt prefix (so it can be prompt-cached) and
+    only the closing section instruction differs. A section that fails is retried
+    alone, up to PACK_SECTION_RETRIES times. Titles come from TITLE_POOL_CHOICES
+    choices of one request and are returned pooled, ready for rank_titles().
+    """
+    def request(section: str) -> list:
+        return request_pack_section(
+            system=system,
+            user=user,
+            schema=schema,
+            schema_name=schema_name,
+            section=section,
+            model=model,
+            temperature=temperature,
+            max_tokens=budgets.get(section, 800),
+            n=TITLE_POOL_CHOICES if section == "titles" else 1,
+        )
+
+    pack: dict = {}
+    failures: dict[str, Exception] = {}
+    pending = list(schema["properties"])
+    for attempt in range(PACK_SECTION_RETRIES + 1):
+        with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+            futures = {section: _submit(pool, request, section) for section in pending}
+        for section, future in futures.items():
+            try:
+                pack[section] = future.result()
+            except (ValueError, APIError) as e:
+                failures[section] = e
+        pending = [section for section in pending if section not in pack]
+        if not pending:
+            return pack
+        if attempt < PACK_SECTION_RETRIES:
+            print(f"[WARN] Retrying failed section(s) alone: {', '.join(pending)}")
+
+    raise ValueError(
+        f"{schema_name}: section(s) failed after retries: "
+        + "; ".join(f"{section}: {failures[section]}" for section in pending)
+    )
+
+
+def request_pack_section(
+    *,
+    system: str,
+    user: str,
+    schema: dict,
+    schema_name: str,
+    section: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    n: int = 1,
+    note: str = "",
+) -> list:
+    """
+    One publish-pack section (one top-level schema field) as its own structured
+    request on the full pack prompt. `note` is appended, e.g. why a previous
+    version was rejected.
+    """
+    section_user = (
+        user
+        + f"\n\nSECTION REQUEST:\nReturn ONLY the \"{section}\" field of the JSON described above; "
+        "the other sections are generated separately."
+    )
+    if note:
+        section_user += "\n" + note
+    with trace_span(f"section {section}"):
+        choices = call_llm_json_choices(
+            system=system,
+            user=section_user,
+            schema=_object({section: schema["properties"][section]}),
+            schema_name=f"{schema_name}_{section}",
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            n=n,
+        )
+    return [item for data in choices for item in data[section]]
+
+
+# ---------- PUBLISH PACK VALIDATION ----------
+
+# Every template constraint is checked locally before publish_pack.md is written.
+# Over-long sections are trimmed deterministically (extra titles, tags past the
+# 500-character limit, duplicate hashtags...); sections that come up short or
+# break a rule the model must fix are regenerated alone, concurrently, once.
+PACK_TAGS_MAX_CHARS = 500
+PACK_TITLE_MAX_CHARS = 100   # YouTube's hard limit
+PACK_HASHTAG_RANGE = (10, 15)
+
+
+def pack_rules(
+    *,
+    channel: str,
+    title_count: int,
+    description_count: int,
+    thumbnail_range: tuple[int, int] | None,
+) -> dict:
+    """
+    Constraints from the channel's pack prompt. thumbnail_range=None skips the
+    thumbnail checks (Aperture packs that reuse thumbnail_concepts.md).
+    """
+    shrouded = channel == "shrouded"
+    return {
+        "titles": title_count,
+        "descriptions": description_count,
+        # Aperture styles A and C are deliberately short
+        "description_words": (150, 220) if shrouded else (15, 220),
+        "hashtags": PACK_HASHTAG_RANGE,
+        "thumbnail_concepts": thumbnail_range,
+        "overlay_words": (2, 5) if shrouded else (1, 4),
+    }
+
+
+def _dedupe(items: list[str], key=lambda item: item.lower()) -> list[str]:
+    seen: set[str] = set()
+    out = []
+    for item in items:
+        if item and key(item) not in seen:
+            seen.add(key(item))
+            out.append(item)
+    return out
+
+
+def trim_pack(pack: dict, rules: dict) -> list[str]:
+    """Fix what can be fixed without the model, in place. Returns a note per change."""
+    notes = []
+
+    titles = _dedupe([t.strip().strip('"') for t in pack["titles"]])
+    titles = [t for t in titles if len(t) <= PACK_TITLE_MAX_CHARS]
+    if len(titles) > rules["titles"]:
+        notes.append(f"titles: kept the first {rules['titles']} of {len(titles)}")
+        titles = titles[:rules["titles"]]
+    pack["titles"] = titles
+
+    descriptions = [d.strip() for d in pack["descriptions"] if d.strip()]
+    if len(descriptions) > rules["descriptions"]:
+        notes.append(f"descriptions: kept the first {rules['descriptions']} of {len(descriptions)}")
+        descriptions = descriptions[:rules["descriptions"]]
+    pack["descriptions"] = descriptions
+
+    tags = _dedupe([re.sub(r"\s+", " ", t.strip().lstrip("#")) for t in pack["tags"]])
+    dropped = 0
+    while tags and len(", ".join(tags)) > PACK_TAGS_MAX_CHARS:
+        tags.pop()
+        dropped += 1
+    if dropped:
+        notes.append(f"tags: dropped the last {dropped} tag(s) to fit {PACK_TAGS_MAX_CHARS} characters")
+    pack["tags"] = tags
+
+    hashtags = _dedupe([_normalize_hashtag(h) for h in pack["hashtags"] if h.strip("# ")])
+    if len(hashtags) > rules["hashtags"][1]:
+        notes.append(f"hashtags: kept the first {rules['hashtags'][1]} of {len(hashtags)}")
+        hashtags = hashtags[:rules["hashtags"][1]]
+    pack["hashtags"] = hashtags
+
+    if rules["thumbnail_concepts"] and "thumbnail_concepts" in pack:
+        most = rules["thumbnail_concepts"][1]
+        if len(pack["thumbnail_concepts"]) > most:
+            notes.append(f"thumbnail_concepts: kept the first {most} of {len(pack['thumbnail_concepts'])}")
+            pack["thumbnail_concepts"] = pack["thumbnail_concepts"][:most]
+    return notes
+
+
+def check_pack(pack: dict, rules: dict) -> dict[str, str]:
+    """Template violations left after trim_pack, as {section: problem}."""
+    problems: dict[str, str] = {}
+
+    if len(pack["titles"]) < rules["titles"]:
+        problems["titles"] = f"{len(pack['titles'])} usable title(s), need {rules['titles']}"
+
+    lo, hi = rules["description_words"]
+    if len(pack["descriptions"]) < rules["descriptions"]:
+        problems["descriptions"] = f"{len(pack['descriptions'])} description(s), need {rules['descriptions']}"
+    else:
+        for i, d in enumerate(pack["descriptions"], start=1):
+            words = len(d.split())
+            if not lo <= words <= hi:
+                problems["descriptions"] = f"description {i} has {words} words, need {lo}–{hi}"
+                break
+
+    if not pack["tags"]:
+        problems["tags"] = "no tags"
+
+    if len(pack["hashtags"]) < rules["hashtags"][0]:
+        problems["hashtags"] = f"{len(pack['hashtags'])} hashtag(s), need {rules['hashtags'][0]}–{rules['hashtags'][1]}"
+
+    if rules["thumbnail_concepts"]:
+        concepts = pack.get("thumbnail_concepts", [])
+        least, most = rules["thumbnail_concepts"]
+        span = str(least) if least == most else f"{least}–{most}"
+        lo, hi = rules["overlay_words"]
+        if len(concepts) < least:
+            problems["thumbnail_concepts"] = f"{len(concepts)} concept(s), need {span}"
+        else:
+            for i, c in enumerate(concepts, start=1):
+                words = len(c["overlay_text"].split())
+                if not lo <= words <= hi:
+                    problems["thumbnail_concepts"] = f"concept {i} overlay text has {words} words, need {lo}–{hi}"
+                    break
+    return problems
+
+
+def repair_pack(pack: dict, rules: dict, regenerate) -> dict:
+    """
+    Trim, check, and regenerate only the failing sections (concurrently, once)
+    via regenerate(section, problem, current) -> new section list. Sections that
+    still fail are kept with a warning rather than rerunning the whole pack.
+    """
+    pack = dict(pack)
+    for note in trim_pack(pack, rules):
+        print(f"[Creator Assistant] Pack fix (local): {note}")
+
+    problems = check_pack(pack, rules)
+    if problems:
+        for section, problem in problems.items():
+            print(f"[Creator Assistant] Pack check: {section}: {problem}. Regenerating that section...")
+        with ThreadPoolExecutor(max_workers=len(problems)) as pool:
+            futures = {
+                section: _submit(pool, regenerate, section, problem, pack[section])
+                for section, problem in problems.items()
+            }
+        for section, future in futures.items():
+            try:
+                pack[section] = future.result()
+            except (ValueError, APIError) as e:
+                print(f"[WARN] Regenerating {section} failed ({e}).")
+        for note in trim_pack(pack, rules):
+            print(f"[Creator Assistant] Pack fix (local): {note}")
+        for section, problem in check_pack(pack, rules).items():
+            print(f"[WARN] Publish pack {section} still off-template: {problem}")
+    return pack
+
+
+def _pack_section_regenerator(
+    *,
+    system: str,
+    user: str,
+    schema: dict,
+    schema_name: str,
+    model: str,
+    temperature: float,
+    channel: str,
+    source_text: str,
+    title_count: int,
+):
+    """regenerate() callback for repair_pack, bound to one pack's prompt."""
+    def regenerate(section: str, problem: str, current: list) -> list:
+        if section == "titles":
+            # Top up from a pooled title request instead of discarding the good ones
+            extra = generate_title_pool(source_text, channel=channel, model=model, count=title_count)
+            return rank_titles(current + extra, source_text, title_count)
+        return request_pack_section(
+            system=system,
+            user=user,
+            schema=schema,
+            schema_name=schema_name,
+            section=section,
+            model=model,
+            temperature=temperature,
+            max_tokens=PACK_SECTION_BUDGETS.get(section, 800),
+            note=f"A previous version of this section was rejected ({problem}). Follow its rules exactly.",
+        )
+    return regenerate
+
+
+def _render_thumbnail_pack_concepts(concepts: list[dict]) -> list[str]:
+    lines = []
+    for i, c in enumerate(concepts, start=1):
+        lines += [
+            f"### Concept {i}",
+            f"- Concept: {c['concept'].strip()}",
+            f"- Overlay Text: {c['overlay_text'].strip()}",
+            f"- Visual Notes: {c['visual_notes'].strip()}",
+            "",
+        ]
+    return lines
+
+
+def _normalize_hashtag(tag: str) -> str:
+    tag = re.sub(r"\s+", "", tag.strip())
+    return tag if tag.startswith("#") else "#" + tag
+
+
+def render_publish_pack_markdown(pack: dict) -> str:
+    """
+    Render a validated publish pack dict into the publish_pack.md layout.
+    """
+    titles = pack["titles"]
+    descriptions = pack["descriptions"]
+    concepts = pack.get("thumbnail_concepts", [])
+
+    lines = ["# Publish Pack", "", f"## Titles ({len(titles)})"]
+    lines += [f"{i}. {t.strip()}" for i, t in enumerate(titles, start=1)]
+    lines += ["", f"## Descriptions ({len(descriptions)})"]
+    for i, d in enumerate(descriptions, start=1):
+        lines += [f"### Description {i}", d.strip(), ""]
+    lines += ["## Tags (comma-separated, <= 500 characters)", ", ".join(t.strip() for t in pack["tags"]), ""]
+    lines += [f"## Hashtags ({len(pack['hashtags'])})"]
+    lines += [_normalize_hashtag(h) for h in pack["hashtags"]]
+    lines += ["", f"## Thumbnail Concepts ({len(concepts)})"]
+    lines += _render_thumbnail_pack_concepts(concepts)
+    return "\n".join(lines).strip()
+
+
 def build_publish_pack_prompt(
     narration_text: str,
     *,
@@ -1145,39 +3236,18 @@ HARD RULES
 - Do NOT invent plot points, locations, organizations, dates, or claims that are not clearly supported by the narration.
 - You MAY generalize into SEO-friendly phrasing (e.g., "classified", "leaked", "archival"), but keep it plausible.
 - No spoilers that reveal the ending if the narration is structured as a reveal; keep descriptions hook-forward.
-- Output must be in markdown and follow the exact template below.
-
-OUTPUT TEMPLATE (markdown)
-# Publish Pack
-
-## Titles ({title_count})
-1. ...
-2. ...
-...
-
-## Descriptions ({description_count})
-### Description 1
-<150–220 words. Hook in first 2 lines. 1 short paragraph break. End with a single-line call-to-action. No bullet lists.>
-
-### Description 2
-...
-
-### Description 3
-...
-
-## Tags (comma-separated, <= 500 characters)
-tag1, tag2, tag3, ...
-
-## Hashtags (10–15)
-#tag
-#tag
-...
-
-## Thumbnail Concepts ({thumbnail_count})
-For each concept, provide:
-- Concept: <1 sentence>
-- Overlay Text: <2–5 words>
-- Visual Notes: <short notes on composition, focal point, contrast, mood>
+- Output is JSON matching the schema; fill every field as described below.
+
+OUTPUT FIELDS
+- titles: exactly {title_count} title options.
+- descriptions: exactly {description_count} descriptions. Each 150–220 words. Hook in first 2 lines.
+  1 short paragraph break. End with a single-line call-to-action. No bullet lists.
+- tags: individual tags; all tags joined with ", " must be <= 500 characters.
+- hashtags: 10–15 hashtags, each starting with '#'.
+- thumbnail_concepts: exactly {thumbnail_count} concepts, each with:
+  - concept: 1 sentence
+  - overlay_text: 2–5 words
+  - visual_notes: short notes on composition, focal point, contrast, mood
 
 NARRATION (source)
 """ + narration_text + """"""
@@ -1191,27 +3261,73 @@ def generate_publish_pack_from_narration(
     title_count: int = 10,
     description_count: int = 3,
     thumbnail_count: int = 8,
+    parallel_sections: bool = False,
+    title_pool: bool = False,
 ) -> str:
-    """Generate a full publish pack from finalized narration text."""
+    """
+    Generate a full publish pack from finalized narration text, either as one
+    structured completion or (parallel_sections) one concurrent request per section.
+    title_pool adds a pooled title request and ranks both sets together.
+    """
     system = (
         "You are an expert YouTube packaging strategist. "
         "You create titles, descriptions, tags, hashtags, and thumbnail concepts "
         "that match the source narration and improve click-through and search discovery."
     )
-    user = build_publish_pack_prompt(
-        narration_text,
-        channel=channel,
-        title_count=title_count,
-        description_count=description_count,
-        thumbnail_count=thumbnail_count,
-    )
-    return call_llm(
-        system=system,
-        user=user,
-        model=model,
-        max_tokens=1600,
-        temperature=0.6,
-    )
+    with trace_span("build prompt"):
+        user = build_publish_pack_prompt(
+            narration_text,
+            channel=channel,
+            title_count=title_count,
+            description_count=description_count,
+            thumbnail_count=thumbnail_count,
+        )
+    if parallel_sections:
+        pack = generate_pack_sections(
+            system=system,
+            user=user,
+            schema=_publish_pack_schema(),
+            schema_name="publish_pack",
+            model=model,
+            temperature=0.6,
+        )
+    else:
+        pack = call_llm_json(
+            system=system,
+            user=user,
+            schema=_publish_pack_schema(),
+            schema_name="publish_pack",
+            model=model,
+            max_tokens=3500,
+            temperature=0.6,
+        )
+    if title_pool:
+        pack["titles"] = pool_titles(pack["titles"], narration_text, channel=channel, model=model, count=title_count)
+    else:
+        pack["titles"] = rank_titles(pack["titles"], narration_text, title_count)
+    with trace_span("validate pack"):
+        pack = repair_pack(
+            pack,
+            pack_rules(
+                channel=channel,
+                title_count=title_count,
+                description_count=description_count,
+                thumbnail_range=(thumbnail_count, thumbnail_count),
+            ),
+            _pack_section_regenerator(
+                system=system,
+                user=user,
+                schema=_publish_pack_schema(),
+                schema_name="publish_pack",
+                model=model,
+                temperature=0.6,
+                channel=channel,
+                source_text=narration_text,
+                title_count=title_count,
+            ),
+        )
+    with trace_span("render markdown"):
+        return render_publish_pack_markdown(pack)
 
 
 def run_publish_pack(
@@ -1224,8 +3340,15 @@ def run_publish_pack(
     title_count: int = 10,
     description_count: int = 3,
     thumbnail_count: int = 8,
+    cascade: list[dict] | None = None,
+    parallel_sections: bool = False,
+    title_pool: bool = False,
 ) -> Path:
-    """Read finalized narration and write publish_pack.md to the project folder."""
+    """
+    Read finalized narration and write publish_pack.md to the project folder.
+    Generation walks the cascade (default COMMAND_FALLBACKS["publish-pack"])
+    until a tier returns a valid pack.
+    """
     in_path = project_dir / script_filename
     if not in_path.exists():
         raise FileNotFoundError(
@@ -1233,24 +3356,37 @@ def run_publish_pack(
             "Run 'narration-finalize' first (or pass --script to point at a different file)."
         )
 
-    narration_text = in_path.read_text(encoding="utf-8")
+    with trace_span("read file", path=in_path):
+        narration_text = read_project_file(in_path)
 
-    pack_md = generate_publish_pack_from_narration(
-        narration_text,
-        channel=channel,
-        model=model,
-        title_count=title_count,
-        description_count=description_count,
-        thumbnail_count=thumbnail_count,
+    if cascade is None:
+        cascade = cascade_for("publish-pack", model)
+
+    pack_md, tier = run_cascade(
+        cascade,
+        lambda t: generate_publish_pack_from_narration(
+            narration_text,
+            channel=channel,
+            model=t["model"],
+            title_count=title_count,
+            description_count=description_count,
+            thumbnail_count=thumbnail_count,
+            parallel_sections=parallel_sections,
+            title_pool=title_pool,
+        ),
     )
+    if tier is None:
+        raise RuntimeError("Every cascade tier refused or failed; no publish pack written.")
+    print(f"[Creator Assistant] Produced by: {tier['label']}")
 
     out_path = project_dir / output_filename
-    out_path.write_text(pack_md.strip() + "\n", encoding="utf-8")
+    with trace_span("write file", path=out_path):
+        out_path.write_text(pack_md.strip() + "\n", encoding="utf-8")
     return out_path
 
 def _read_text_if_exists(path: Path) -> str:
     try:
-        return path.read_text(encoding="utf-8")
+        return read_project_file(path)
     except FileNotFoundError:
         return ""
     except Exception:
@@ -1303,7 +3439,7 @@ def _extract_ab_image_ideas(image_ideas_text: str, max_items: int = 25) -> list[
     items = []
     for part in parts[1:]:
         # part begins with subject line, then the rest
-        lines = [ln.rstrip() for ln in part.strip().splitlines() if ln.strip()]
+        lines = [ln.strip() for ln in part.strip().splitlines() if ln.strip()]
         if not lines:
             continue
 
@@ -1345,7 +3481,8 @@ def build_publish_pack_prompt_aperture(
     Aperture Black publish pack builder:
     - Minimal text, no narration.
     - Uses outline beats as the final gallery sequence anchors.
-    - Optionally embeds thumbnail concepts verbatim if present.
+    - Only asks for thumbnail concepts when thumbnail_concepts.md does not exist;
+      an existing file is embedded verbatim by render_publish_pack_aperture_markdown.
     """
     # Summarize some image ideas as anchors (avoid giant prompt)
     idea_lines = []
@@ -1362,13 +3499,12 @@ def build_publish_pack_prompt_aperture(
 
     beats_text = "\n\n".join(beat_blocks)
 
-    thumb_note = ""
     if thumbnail_concepts_text.strip():
-        thumb_note = (
-            "\n\nTHUMBNAIL_CONCEPTS_FILE_EXISTS:\n"
-            "Below are existing thumbnail concepts. In the publish pack, include them verbatim "
-            "under the 'Thumbnail Concepts' section (you may include the first 8–12 concepts if very long).\n\n"
-            f"{thumbnail_concepts_text.strip()}"
+        thumb_rule = "- thumbnail_concepts: return an empty list (existing concepts will be used)."
+    else:
+        thumb_rule = (
+            "- thumbnail_concepts: 8–12 concepts, each with overlay_text (1–4 words) "
+            "and brief visual_notes."
         )
 
     prompt = f"""
@@ -1384,37 +3520,164 @@ FINAL GALLERY OUTLINE (use as anchors; do not rewrite into a story, keep it imag
 
 OPTIONAL IMAGE IDEA POOL (use for title inspiration + tags + descriptive texture):
 {chr(10).join(idea_lines) if idea_lines else "(none provided)"}
-{thumb_note}
 
-OUTPUT RULES:
+OUTPUT RULES (JSON fields):
 - Do NOT write a script. Do NOT add narration.
-- Provide exactly {title_count} titles.
-- Provide exactly {description_count} descriptions, each in a distinct style:
+- titles: exactly {title_count} titles.
+- descriptions: exactly {description_count} descriptions, each in a distinct style:
   A) Minimal recovered-archive tone (short)
   B) Documentary/cover-up tone (medium)
   C) Punchy curiosity hook (short)
-- Provide one comma-separated tag line under 500 characters.
-- Provide {hashtag_count} hashtags (10–15 is acceptable; target {hashtag_count}).
-- Provide thumbnail concepts:
-  - If thumbnail concepts file exists above: include it verbatim (or first 8–12 concepts).
-  - If not: generate 8–12 concepts with overlay text (1–4 words) + brief visual notes.
-- Include a 'Final Gallery Order' section listing the last 15 beats (as provided) for production reference.
-
-FORMAT EXACTLY IN THIS ORDER USING MARKDOWN HEADERS:
-# Publish Pack — Aperture Black
-## Titles
-## Descriptions
-## Tags
-## Hashtags
-## Thumbnail Concepts
-## Final Gallery Order
+- tags: individual tags; all tags joined with ", " must stay under 500 characters.
+- hashtags: {hashtag_count} hashtags (10–15 is acceptable; target {hashtag_count}).
+{thumb_rule}
 """
     return prompt.strip()
 
 
+APERTURE_DESCRIPTION_STYLES = (
+    "A) Minimal recovered-archive",
+    "B) Documentary/cover-up",
+    "C) Punchy curiosity hook",
+)
+
+
+def render_publish_pack_aperture_markdown(
+    pack: dict,
+    *,
+    beat_blocks: list[str],
+    thumbnail_concepts_text: str = "",
+) -> str:
+    """
+    Render an Aperture Black publish pack. Thumbnail concepts come verbatim from
+    thumbnail_concepts.md when it exists, and the Final Gallery Order is built
+    locally from the outline beats, so neither costs output tokens.
+    """
+    lines = ["# Publish Pack — Aperture Black", "", "## Titles"]
+    lines += [f"{i}. {t.strip()}" for i, t in enumerate(pack["titles"], start=1)]
+    lines += ["", "## Descriptions"]
+    for i, d in enumerate(pack["descriptions"]):
+        label = APERTURE_DESCRIPTION_STYLES[i] if i < len(APERTURE_DESCRIPTION_STYLES) else f"Description {i + 1}"
+        lines += [f"### {label}", d.strip(), ""]
+    lines += ["## Tags", ", ".join(t.strip() for t in pack["tags"]), ""]
+    lines += ["## Hashtags", " ".join(_normalize_hashtag(h) for h in pack["hashtags"]), ""]
+    lines += ["## Thumbnail Concepts"]
+    if thumbnail_concepts_text.strip():
+        lines += [thumbnail_concepts_text.strip(), ""]
+    else:
+        lines += _render_thumbnail_pack_concepts(pack.get("thumbnail_concepts", []))
+    lines += ["## Final Gallery Order"]
+    for i, block in enumerate(beat_blocks, start=1):
+        lines.append(f"{i}. {block.splitlines()[0].strip('* ')}")
+    return "\n".join(lines).strip()
+
+
+def generate_publish_pack_aperture(
+    *,
+    seed_idea: str,
+    beat_blocks: list[str],
+    image_ideas: list[dict],
+    thumbnail_concepts_text: str,
+    model: str = "gpt-4o-mini",
+    title_count: int = 10,
+    description_count: int = 3,
+    hashtag_count: int = 12,
+    parallel_sections: bool = False,
+    title_pool: bool = False,
+) -> str:
+    """
+    Generate an Aperture Black publish pack as structured JSON and render it to markdown.
+    parallel_sections requests each section concurrently (see generate_pack_sections);
+    title_pool adds a pooled title request (see pool_titles).
+    """
+    with trace_span("build prompt"):
+        prompt = build_publish_pack_prompt_aperture(
+            seed_idea=seed_idea,
+            beat_blocks=beat_blocks,
+            image_ideas=image_ideas,
+            thumbnail_concepts_text=thumbnail_concepts_text,
+            title_count=title_count,
+            description_count=description_count,
+            hashtag_count=hashtag_count,
+        )
+    system = "You are Creator Assistant. Produce precise, structured output only."
+    source_text = seed_idea + "\n\n" + "\n\n".join(beat_blocks)
+    if parallel_sections:
+        pack = generate_pack_sections(
+            system=system,
+            user=prompt,
+            schema=_publish_pack_schema(),
+            schema_name="publish_pack_aperture",
+            model=model,
+            temperature=0.5,
+        )
+    else:
+        pack = call_llm_json(
+            system=system,
+            user=prompt,
+            schema=_publish_pack_schema(),
+            schema_name="publish_pack_aperture",
+            model=model,
+            max_tokens=3500,
+            temperature=0.5,
+        )
+    if title_pool:
+        pack["titles"] = pool_titles(pack["titles"], source_text, channel="aperture", model=model, count=title_count)
+    else:
+        pack["titles"] = rank_titles(pack["titles"], source_text, title_count)
+    with trace_span("validate pack"):
+        pack = repair_pack(
+            pack,
+            pack_rules(
+                channel="aperture",
+                title_count=title_count,
+                description_count=description_count,
+                thumbnail_range=None if thumbnail_concepts_text.strip() else (8, 12),
+            ),
+            _pack_section_regenerator(
+                system=system,
+                user=prompt,
+                schema=_publish_pack_schema(),
+                schema_name="publish_pack_aperture",
+                model=model,
+                temperature=0.5,
+                channel="aperture",
+                source_text=source_text,
+                title_count=title_count,
+            ),
+        )
+    with trace_span("render markdown"):
+        return render_publish_pack_aperture_markdown(
+            pack,
+            beat_blocks=beat_blocks,
+            thumbnail_concepts_text=thumbnail_concepts_text,
+        )
+
+
  
  # ------------- OUTLINE FILLER ----------
     
+def _append_file_atomically(path: str, text: str) -> None:
+    """
+    Append text to path by writing old + new content to a temp file and renaming
+    it over path. A run that dies part-way leaves the file untouched, so a retry
+    (e.g. a queued job's next attempt) never appends a second partial copy.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            existing = f.read()
+    except FileNotFoundError:
+        existing = ""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".md")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(existing + text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 def fill_project_outline_from_assistant(
     project_name: str,
     seed_idea: str,
@@ -1455,8 +3718,7 @@ def fill_project_outline_from_assistant(
     header = f"\n\n---\n\n# AUTO-GENERATED OUTLINE ({channel}, {beats} beats)\n\n"
     content_to_write = header + outline_text.strip() + "\n"
 
-    with open(outline_path, "a", encoding="utf-8") as f:
-        f.write(content_to_write)
+    _append_file_atomically(outline_path, content_to_write)
 
     return outline_path
 
@@ -1512,8 +3774,7 @@ def append_expanded_beat_to_script(
 
     content_to_write = header + expanded.strip() + "\n"
 
-    with open(script_path, "a", encoding="utf-8") as f:
-        f.write(content_to_write)
+    _append_file_atomically(script_path, content_to_write)
 
     return script_path
 
@@ -1525,7 +3786,8 @@ def run_script_draft_builder(args: argparse.Namespace) -> None:
 
     - Reads numbered beats from beats_final.md (or custom beats file)
     - Expands each beat using expand_from_assistant()
-    - Appends a Draft 0 section to script.md in order
+    - Appends a Draft 0 section to script.md in order, in one atomic write once
+      every beat is expanded (a failed run leaves script.md as it was)
     """
     project_name = args.project
     channel = args.channel
@@ -1546,10 +3808,11 @@ def run_script_draft_builder(args: argparse.Namespace) -> None:
             "Run beat-manager first to create a final beat list."
         )
 
-    with open(beats_path, "r", encoding="utf-8") as f:
-        beats_text = f.read()
+    with trace_span("read file", path=beats_path):
+        read_project_file(beats_path)
 
-    beats = _parse_numbered_beats(beats_text)
+    with trace_span("parse beats"):
+        beats = parse_project_file(beats_path, "numbered beats", _parse_numbered_beats)
 
     if not beats:
         raise SystemExit(
@@ -1571,18 +3834,19 @@ def run_script_draft_builder(args: argparse.Namespace) -> None:
 
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # Open script.md in append mode and write one Draft 0 section header
-    with open(script_path, "a", encoding="utf-8") as f:
-        f.write("\n\n---\n\n")
-        f.write(
-            f"# AUTO-GENERATED DRAFT 0 ({channel}, {mode_label})\n\n"
-            f"_Project:_ **{project_name}**\n"
-            f"_Generated:_ {timestamp}\n"
-            f"_Source beats file:_ `{os.path.basename(beats_path)}`\n\n"
-        )
+    # One Draft 0 section, built in memory and appended to script.md at the end
+    section = [
+        "\n\n---\n\n",
+        f"# AUTO-GENERATED DRAFT 0 ({channel}, {mode_label})\n\n"
+        f"_Project:_ **{project_name}**\n"
+        f"_Generated:_ {timestamp}\n"
+        f"_Source beats file:_ `{os.path.basename(beats_path)}`\n\n",
+    ]
 
-        for idx, (num, beat_text) in enumerate(beats, start=1):
-            print(f"[Creator Assistant] Expanding beat {idx}/{total} (original #{num})...")
+    for idx, (num, beat_text) in enumerate(beats, start=1):
+        print(f"[Creator Assistant] Expanding beat {idx}/{total} (original #{num})...")
+        set_ledger_context(beat=idx)
+        with trace_span(f"beat {idx}"):
             expanded = expand_from_assistant(
                 beat_text,
                 channel=channel,
@@ -1594,11 +3858,11 @@ def run_script_draft_builder(args: argparse.Namespace) -> None:
             if len(short_beat) > 160:
                 short_beat = short_beat[:157] + "..."
 
-            f.write(f"## Beat {idx}\n\n")
-            f.write(f"**Source beat:** {short_beat}\n\n")
-            f.write(expanded.strip())
-            f.write("\n\n")
+            section.append(f"## Beat {idx}\n\n**Source beat:** {short_beat}\n\n{expanded.strip()}\n\n")
 
+    set_ledger_context(beat=None)
+    with trace_span("write file", path=script_path):
+        _append_file_atomically(script_path, "".join(section))
     print(f"\n[Creator Assistant] Draft 0 complete.")
     print(f"Expanded {total} beats into: {script_path}")
 
@@ -1680,6 +3944,90 @@ def _parse_numbered_beats(section_text: str) -> list[tuple[int, str]]:
 
     return beats
 
+# Replacement beats generated ahead of time: the current beat plus this many upcoming ones.
+BEAT_PREFETCH_LOOKAHEAD = 2
+
+# Replacement options offered per rejected beat (all from one request, using n).
+REPLACEMENT_OPTIONS = 3
+
+
+class ReplacementPrefetcher:
+    """
+    Generates replacement options in background threads while the user reads,
+    so rejecting a beat shows its replacements without waiting on the API.
+
+    Work is bounded to a sliding window (current beat + lookahead). Threads are
+    daemons and cancel() drops their results, so quitting never waits on them.
+    """
+
+    def __init__(
+        self,
+        beats: list[str],
+        channel: str,
+        lookahead: int = BEAT_PREFETCH_LOOKAHEAD,
+        options: int = REPLACEMENT_OPTIONS,
+    ):
+        self.beats = beats
+        self.channel = channel
+        self.lookahead = lookahead
+        self.options = options
+        self._started: set[int] = set()
+        self._results: dict[int, tuple[str, object]] = {}
+        self._cond = threading.Condition()
+        self._cancelled = False
+
+    def _generate(self, index: int) -> None:
+        try:
+            outcome = ("ok", self._request(index))
+        except Exception as e:
+            outcome = ("error", e)
+        with self._cond:
+            if not self._cancelled:
+                self._results[index] = outcome
+            self._cond.notify_all()
+
+    def _request(self, index: int) -> list[str]:
+        return generate_replacement_beats(self.beats[index], channel=self.channel, n=self.options)
+
+    def _prefetch(self, index: int) -> None:
+        # Speculative work yields to the user's own calls and to batch jobs
+        with llm_priority("prefetch"):
+            self._generate(index)
+
+    def look_ahead(self, index: int) -> None:
+        """Start generating replacements for beat `index` and the next `lookahead` beats."""
+        if self.lookahead <= 0 or self._cancelled:
+            return
+        for i in range(index, min(len(self.beats), index + self.lookahead + 1)):
+            if i not in self._started:
+                self._started.add(i)
+                context = contextvars.copy_context()
+                threading.Thread(target=context.run, args=(self._prefetch, i), daemon=True).start()
+
+    def ready(self, index: int) -> bool:
+        with self._cond:
+            return index in self._results
+
+    def take(self, index: int) -> list[str]:
+        """Replacement options for beat `index`: prefetched if possible, else generated now."""
+        if index in self._started and not self._cancelled:
+            with self._cond:
+                while index not in self._results:
+                    self._cond.wait()
+                status, value = self._results.pop(index)
+            if status == "ok":
+                return value
+            print(f"[WARN] Prefetch failed ({value}); retrying now...")
+        return self._request(index)
+
+    def cancel(self) -> None:
+        """Drop pending results; in-flight daemon threads are abandoned."""
+        with self._cond:
+            self._cancelled = True
+            self._results.clear()
+            self._cond.notify_all()
+
+
 def run_beat_manager(args: argparse.Namespace) -> None:
     """
     Interactively curate beats from a project's outline.md into beats_final.md.
@@ -1699,188 +4047,1097 @@ def run_beat_manager(args: argparse.Namespace) -> None:
     outline_path = os.path.join(project_dir, "outline.md")
     beats_path = os.path.join(project_dir, output_filename)
 
-    # If user only wants to list current beats_final, do that and exit
-    if args.list:
-        if not os.path.exists(beats_path):
-            print(f"No {output_filename} found for project '{project_name}'.")
-            return
-        with open(beats_path, "r", encoding="utf-8") as f:
-            print(f.read())
+    # If user only wants to list current beats_final, do that and exit
+    if args.list:
+        if not os.path.exists(beats_path):
+            print(f"No {output_filename} found for project '{project_name}'.")
+            return
+        with open(beats_path, "r", encoding="utf-8") as f:
+            print(f.read())
+        return
+
+    if not os.path.exists(outline_path):
+        raise SystemExit(f"outline.md not found for project: {project_dir}")
+
+    beats = parse_project_file(
+        outline_path,
+        "latest numbered beats",
+        lambda text: _parse_numbered_beats(_extract_latest_outline_section(text)),
+    )
+
+    if not beats:
+        raise SystemExit(
+            "No numbered beats found in the latest outline section.\n"
+            "Make sure your outline has lines like '1. First beat...'"
+        )
+
+    print(
+        f"\n[Creator Assistant] Beat Manager for project '{project_name}'\n"
+        f"Source: {outline_path}\n"
+        f"Output: {beats_path}\n"
+    )
+    print("You will now review each beat.")
+    print("Commands: [a]ccept (default), [r]eject, [e]dit, [q]uit\n")
+
+    curated_beats: list[str] = []
+    prefetcher = ReplacementPrefetcher(
+        [text for _, text in beats],
+        channel=args.channel,
+        lookahead=args.prefetch,
+        options=max(1, args.options),
+    )
+
+    try:
+        for idx, (num, text) in enumerate(beats, start=1):
+            prefetcher.look_ahead(idx - 1)
+            print("──────────────────────────────────────────")
+            print(f"Beat {num} (#{idx} in this session):\n")
+            print(text)
+            print("\n[a]ccept / [r]eject / [e]dit / [q]uit > ", end="", flush=True)
+
+            choice = input().strip().lower() or "a"
+
+            if choice == "q":
+                print("\nStopping early. Saving accepted beats so far...\n")
+                break
+
+            elif choice == "r":
+                # Replace the rejected beat (usually already prefetched in the background)
+                if not prefetcher.ready(idx - 1):
+                    print("\n→ Generating replacement beat via OpenAI...\n")
+                else:
+                    print()
+                options = prefetcher.take(idx - 1)
+
+                if len(options) == 1:
+                    print("Replacement proposal:\n")
+                    print(options[0])
+                    print("\n[a]ccept / [e]dit / [s]kip > ", end="", flush=True)
+                else:
+                    print("Replacement options:\n")
+                    for i, option in enumerate(options, start=1):
+                        print(f"[{i}] {option}\n")
+                    print(f"[1-{len(options)}] accept option (default 1) / [e]dit / [s]kip > ", end="", flush=True)
+
+                sub_choice = input().strip().lower() or "a"
+                if sub_choice == "a":
+                    sub_choice = "1"
+
+                if sub_choice.isdigit() and 1 <= int(sub_choice) <= len(options):
+                    curated_beats.append(options[int(sub_choice) - 1].strip())
+                    print("→ Replacement accepted.\n")
+                elif sub_choice == "e":
+                    print("\nEnter new text for this replacement beat.")
+                    print("Finish by entering a blank line on its own.\n")
+                    new_lines: list[str] = []
+                    while True:
+                        line = input()
+                        if line == "":
+                            break
+                        new_lines.append(line)
+                    new_text = "\n".join(new_lines).strip()
+                    if not new_text:
+                        print("No new text entered; replacement skipped.\n")
+                    else:
+                        curated_beats.append(new_text)
+                        print("→ Replacement edited and accepted.\n")
+                else:
+                    print("→ Replacement skipped; original beat rejected with no substitute.\n")
+
+                continue  # move on to the next original beat
+
+            elif choice == "e":
+                print("\nEnter new text for this beat.")
+                print("Finish by entering a blank line on its own.\n")
+                new_lines: list[str] = []
+                while True:
+                    line = input()
+                    if line == "":
+                        break
+                    new_lines.append(line)
+                new_text = "\n".join(new_lines).strip()
+                if not new_text:
+                    print("No new text entered; skipping this beat.\n")
+                    continue
+                curated_beats.append(new_text)
+                print("→ Edited and accepted.\n")
+
+            else:  # default accept
+                curated_beats.append(text)
+                print("→ Accepted.\n")
+
+    finally:
+        # Quitting, Ctrl-C or a failed call: stop speculative work either way
+        prefetcher.cancel()
+
+    if not curated_beats:
+        print("No beats were accepted. Nothing written.")
+        return
+
+    # Write beats_final.md
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with open(beats_path, "w", encoding="utf-8") as f:
+        f.write("# Final Beat List\n\n")
+        f.write(f"_Project:_ **{project_name}**\n")
+        f.write(f"_Generated:_ {timestamp}\n\n")
+        f.write("---\n\n")
+        for i, beat_text in enumerate(curated_beats, start=1):
+            # Keep simple numbered format for Script Draft Builder
+            f.write(f"{i}. {beat_text}\n\n")
+
+    print(f"Curated {len(curated_beats)} beats.")
+    print(f"Final beat list written to: {beats_path}")
+
+
+
+# ----------BEAT REPLACEMENT TOOL ----------
+
+def generate_replacement_beat(original_beat: str, channel: str = "shrouded") -> str:
+    """
+    Use the OpenAI API to generate an alternative beat that could replace the original one.
+
+    - Keeps the same general story role/context.
+    - Changes the specific event, evidence, or imagery.
+    - Returns 2–5 sentences, no numbering.
+    """
+    return generate_replacement_beats(original_beat, channel=channel, n=1)[0]
+
+
+def generate_replacement_beats(
+    original_beat: str,
+    channel: str = "shrouded",
+    n: int = REPLACEMENT_OPTIONS,
+) -> list[str]:
+    """
+    Like generate_replacement_beat(), but returns up to n distinct alternatives
+    from a single request (n choices), so a user can pick instead of re-rolling.
+    """
+    if channel == "shrouded":
+        system_msg = (
+            "You are an expert documentary-horror story crafter for The Shrouded Ledger. "
+            "You revise outline beats so they stay structurally consistent but use different "
+            "events, evidence, or imagery. You do not describe emotions directly; you show "
+            "observable behavior, documents, and anomalies."
+        )
+    else:  # aperture
+        system_msg = (
+            "You are an expert in image-driven liminal horror outlines for Aperture Black. "
+            "You revise outline beats so they stay structurally consistent but use different "
+            "visual environments and unsettling details."
+        )
+
+    user_prompt = f"""
+You are revising ONE outline beat for a {channel}-style horror project.
+
+ORIGINAL BEAT:
+\"\"\"{original_beat}\"\"\"
+
+TASK:
+Write a different beat that could replace it in the same outline.
+
+Requirements:
+- Keep roughly the same structural role (scope, focus, where it comes in the story).
+- Change the specifics of the event, evidence, or visual imagery.
+- Write 2–5 sentences total.
+- Do NOT number the beat or add labels; return only the beat text.
+"""
+
+    choices = call_llm_choices(
+        system=system_msg,
+        user=user_prompt,
+        model="gpt-4o-mini",
+        max_tokens=400,
+        temperature=0.8 if n == 1 else 0.95,
+        n=n,
+    )
+
+    options: list[str] = []
+    seen: set[str] = set()
+    for text in choices:
+        key = " ".join(re.findall(r"[a-z0-9']+", text.lower()))
+        if text and key not in seen:
+            seen.add(key)
+            options.append(text)
+    return options or choices[:1]
+
+
+# ---------- PROJECT SEARCH TOOL ----------
+
+# Project files that get indexed for full-text search.
+SEARCH_FILES = ("outline.md", "script.md", "broll_notes.md", "publish_pack.md", "concepts.md")
+SEARCH_INDEX_NAME = ".search_index.sqlite"
+SEARCH_KINDS = ("beat", "narration", "broll", "title", "concept", "section")
+
+
+def _split_markdown_sections(text: str, level: int = 2) -> list[tuple[str, str]]:
+    """
+    Split markdown into (heading, body) pairs on headings of exactly `level` hashes.
+    Text before the first heading is returned with an empty heading.
+    """
+    pattern = re.compile(r"^(#{%d}\s+.+?)\s*$" % level, re.MULTILINE)
+    parts = pattern.split(text)
+
+    sections: list[tuple[str, str]] = []
+    if parts[0].strip():
+        sections.append(("", parts[0].strip()))
+    for i in range(1, len(parts), 2):
+        heading = parts[i].lstrip("#").strip()
+        body = parts[i + 1].strip()
+        if body:
+            sections.append((heading, body))
+    return sections
+
+
+def _extract_broll_sections(script_text: str) -> list[tuple[str, str]]:
+    """
+    Returns a list of (beat_heading, broll_text) for every B-roll block in script.md.
+    Matches headers like '### CINEMATIC B-ROLL:' or '### 2) CINEMATIC B-ROLL (Shrouded Ledger):'.
+    """
+    broll_pat = re.compile(
+        r"###\s*(?:\d+\)\s*)?(?:CINEMATIC\s+)?B-ROLL[^\n]*\n(.*?)(?=\n###|\n## |\Z)",
+        re.IGNORECASE | re.DOTALL,
+    )
+    results = []
+    for heading, body in _split_script_into_beats(script_text):
+        for m in broll_pat.finditer(body):
+            broll = m.group(1).strip()
+            if broll:
+                results.append((heading or "PREAMBLE", broll))
+    return results
+
+
+def _extract_publish_pack_titles(pack_text: str) -> list[str]:
+    """
+    Return the numbered title lines under the '## Titles' heading of a publish pack.
+    """
+    for heading, body in _split_markdown_sections(pack_text):
+        if heading.lower().startswith("titles"):
+            return [text for _, text in _parse_numbered_beats(body)]
+    return []
+
+
+def _search_sections_for_file(filename: str, text: str) -> list[tuple[str, str, str]]:
+    """
+    Break one project file into (kind, heading, body) rows using the same
+    parsers the pipeline commands use. Unrecognized content falls back to
+    plain '## ' sections so nothing is left out of the index.
+    """
+    rows: list[tuple[str, str, str]] = []
+
+    if filename == "outline.md":
+        for num, beat in _parse_numbered_beats(text):
+            rows.append(("beat", f"Beat {num}", beat))
+        for block in _extract_last_ab_beats(text, beats=10_000):
+            first_line, _, rest = block.partition("\n")
+            rows.append(("beat", first_line.strip("* "), rest.strip() or first_line))
+
+    elif filename == "script.md":
+        for heading, narration in extract_all_narration(text):
+            rows.append(("narration", heading, narration))
+        for heading, broll in _extract_broll_sections(text):
+            rows.append(("broll", heading, broll))
+
+    elif filename == "broll_notes.md":
+        for heading, body in _split_markdown_sections(text):
+            rows.append(("broll", heading, body))
+        return rows
+
+    elif filename == "publish_pack.md":
+        for title in _extract_publish_pack_titles(text):
+            rows.append(("title", "Titles", title))
+        for heading, body in _split_markdown_sections(text):
+            if not heading.lower().startswith("titles"):
+                rows.append(("section", heading, body))
+        return rows
+
+    elif filename == "concepts.md":
+        for heading, body in _split_markdown_sections(text, level=3):
+            if heading:
+                rows.append(("concept", heading, body))
+        return rows
+
+    if not rows:
+        for heading, body in _split_markdown_sections(text):
+            rows.append(("section", heading, body))
+    return rows
+
+
+def _open_search_index(projects_root: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(os.path.join(projects_root, SEARCH_INDEX_NAME))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS files ("
+        "path TEXT PRIMARY KEY, mtime REAL NOT NULL, size INTEGER NOT NULL, sha1 TEXT NOT NULL)"
+    )
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5("
+        "project UNINDEXED, file UNINDEXED, kind UNINDEXED, heading, body, "
+        "tokenize='porter unicode61')"
+    )
+    return conn
+
+
+def update_search_index(projects_root: str, rebuild: bool = False) -> dict:
+    """
+    Incrementally (re)index every SEARCH_FILES file under the Projects root.
+
+    A file is skipped when its mtime and size are unchanged; if they changed but the
+    content hash did not (e.g. a touch or a save without edits), only the stored
+    mtime is refreshed. Files that disappeared are dropped from the index.
+
+    Returns counts: {"indexed": n, "unchanged": n, "removed": n}.
+    """
+    conn = _open_search_index(projects_root)
+    stats = {"indexed": 0, "unchanged": 0, "removed": 0}
+
+    with conn:
+        if rebuild:
+            conn.execute("DELETE FROM files")
+            conn.execute("DELETE FROM sections")
+
+        known = {
+            path: (mtime, size, sha1)
+            for path, mtime, size, sha1 in conn.execute("SELECT path, mtime, size, sha1 FROM files")
+        }
+        seen: set[str] = set()
+
+        with os.scandir(projects_root) as it:
+            project_entries = [e for e in it if e.is_dir() and not e.name.startswith(".")]
+
+        for project_entry in project_entries:
+            for filename in SEARCH_FILES:
+                path = os.path.join(project_entry.path, filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                seen.add(path)
+
+                previous = known.get(path)
+                if previous and previous[0] == st.st_mtime and previous[1] == st.st_size:
+                    stats["unchanged"] += 1
+                    continue
+
+                with open(path, "rb") as f:
+                    raw = f.read()
+                sha1 = hashlib.sha1(raw).hexdigest()
+
+                if previous and previous[2] == sha1:
+                    conn.execute(
+                        "UPDATE files SET mtime = ?, size = ? WHERE path = ?",
+                        (st.st_mtime, st.st_size, path),
+                    )
+                    stats["unchanged"] += 1
+                    continue
+
+                text = raw.decode("utf-8", errors="ignore")
+                conn.execute("DELETE FROM sections WHERE file = ?", (path,))
+                conn.executemany(
+                    "INSERT INTO sections (project, file, kind, heading, body) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (project_entry.name, path, kind, heading, body)
+                        for kind, heading, body in _search_sections_for_file(filename, text)
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, mtime, size, sha1) VALUES (?, ?, ?, ?)",
+                    (path, st.st_mtime, st.st_size, sha1),
+                )
+                stats["indexed"] += 1
+
+        for path in set(known) - seen:
+            conn.execute("DELETE FROM sections WHERE file = ?", (path,))
+            conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            stats["removed"] += 1
+
+    conn.close()
+    return stats
+
+
+def _to_fts_query(query: str, phrase: bool = False) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression (quoted terms, implicit AND).
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        raise ValueError("Search query has no searchable words.")
+    if phrase:
+        return '"' + " ".join(words) + '"'
+    return " ".join(f'"{w}"' for w in words)
+
+
+def search_projects(
+    projects_root: str,
+    query: str,
+    *,
+    kind: str | None = None,
+    project: str | None = None,
+    limit: int = 10,
+    raw: bool = False,
+    phrase: bool = False,
+) -> list[dict]:
+    """
+    Run a ranked (bm25) full-text search over the project index.
+
+    Returns a list of dicts with project, file, kind, heading, snippet and rank.
+    Headings are weighted above body text.
+    """
+    match = query if raw else _to_fts_query(query, phrase=phrase)
+
+    sql = (
+        "SELECT project, file, kind, heading, "
+        "snippet(sections, 4, '[', ']', ' … ', 16), bm25(sections, 0, 0, 0, 4.0, 1.0) AS rank "
+        "FROM sections WHERE sections MATCH ?"
+    )
+    params: list = [match]
+    if kind:
+        sql += " AND kind = ?"
+        params.append(kind)
+    if project:
+        sql += " AND project = ?"
+        params.append(slugify_name(project))
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+
+    conn = _open_search_index(projects_root)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {
+            "project": r[0],
+            "file": os.path.basename(r[1]),
+            "kind": r[2],
+            "heading": r[3],
+            "snippet": r[4].replace("\n", " "),
+            "rank": r[5],
+        }
+        for r in rows
+    ]
+
+
+def run_search(args: argparse.Namespace) -> None:
+    """
+    Search every project's markdown (beats, narration, B-roll, titles, concepts).
+
+    The index lives in Projects/.search_index.sqlite and is refreshed
+    incrementally before each query unless --no-update is passed.
+    """
+    base_dir = os.path.dirname(os.path.dirname(__file__))  # ai_tools -> tools
+    projects_root = os.path.join(base_dir, "Projects")
+    if not os.path.isdir(projects_root):
+        raise SystemExit(f"Projects folder not found: {projects_root}")
+
+    if not args.no_update or args.reindex:
+        t0 = time.perf_counter()
+        stats = update_search_index(projects_root, rebuild=args.reindex)
+        index_ms = (time.perf_counter() - t0) * 1000
+        if stats["indexed"] or stats["removed"]:
+            print(
+                f"[Search] Indexed {stats['indexed']} file(s), removed {stats['removed']}, "
+                f"{stats['unchanged']} unchanged ({index_ms:.1f} ms)"
+            )
+
+    query = " ".join(args.query)
+    t0 = time.perf_counter()
+    try:
+        results = search_projects(
+            projects_root,
+            query,
+            kind=args.kind,
+            project=args.project,
+            limit=args.limit,
+            raw=args.raw,
+            phrase=args.phrase,
+        )
+    except (ValueError, sqlite3.OperationalError) as e:
+        raise SystemExit(f"Search error: {e}")
+    query_ms = (time.perf_counter() - t0) * 1000
+
+    if not results:
+        print(f"No matches for: {query} ({query_ms:.1f} ms)")
         return
 
-    if not os.path.exists(outline_path):
-        raise SystemExit(f"outline.md not found for project: {project_dir}")
+    print(f"{len(results)} match(es) for: {query} ({query_ms:.1f} ms)\n")
+    for i, r in enumerate(results, start=1):
+        heading = f" – {r['heading']}" if r["heading"] else ""
+        print(f"{i}. {r['project']}/{r['file']} [{r['kind']}]{heading}")
+        print(f"   {r['snippet']}\n")
 
-    with open(outline_path, "r", encoding="utf-8") as f:
-        outline_text = f.read()
 
-    latest_section = _extract_latest_outline_section(outline_text)
-    beats = _parse_numbered_beats(latest_section)
+# ---------- CLI WIRES ----------
 
-    if not beats:
-        raise SystemExit(
-            "No numbered beats found in the latest outline section.\n"
-            "Make sure your outline has lines like '1. First beat...'"
-        )
+# ---------- DAEMON MODE ----------
 
-    print(
-        f"\n[Creator Assistant] Beat Manager for project '{project_name}'\n"
-        f"Source: {outline_path}\n"
-        f"Output: {beats_path}\n"
-    )
-    print("You will now review each beat.")
-    print("Commands: [a]ccept (default), [r]eject, [e]dit, [q]uit\n")
+# `daemon` keeps this process alive on a Unix socket: the OpenAI client (and its
+# pooled keep-alive HTTPS connection), latency history, the ledger connection and
+# _PROJECT_CACHE stay warm across commands (_POLISH_CACHE is per command). creator_client.py
+# forwards argv + cwd and streams stdout/stderr back. Commands run one at a time.
+DAEMON_SOCKET = os.environ.get("CREATOR_ASSISTANT_SOCKET") or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+    f"creator_assistant-{USER_TAG}.sock",
+)
 
-    curated_beats: list[str] = []
+_IN_DAEMON = False
 
-    for idx, (num, text) in enumerate(beats, start=1):
-        print("──────────────────────────────────────────")
-        print(f"Beat {num} (#{idx} in this session):\n")
-        print(text)
-        print("\n[a]ccept / [r]eject / [e]dit / [q]uit > ", end="", flush=True)
 
-        choice = input().strip().lower() or "a"
+class _SocketStream(io.TextIOBase):
+    """stdout/stderr replacement that forwards writes to the client as JSON lines."""
 
-        if choice == "q":
-            print("\nStopping early. Saving accepted beats so far...\n")
-            break
+    def __init__(self, wfile, name: str, lock: threading.Lock):
+        self._wfile = wfile
+        self._name = name
+        self._lock = lock
 
-        elif choice == "r":
-            # Generate a replacement beat in place of the rejected one
-            print("\n→ Generating replacement beat via OpenAI...\n")
-            replacement_text = generate_replacement_beat(text, channel=args.channel)
+    def writable(self) -> bool:
+        return True
 
-            print("Replacement proposal:\n")
-            print(replacement_text)
-            print("\n[a]ccept / [e]dit / [s]kip > ", end="", flush=True)
+    def write(self, text: str) -> int:
+        if text:
+            _daemon_send(self._wfile, self._lock, {"stream": self._name, "data": text})
+        return len(text)
 
-            sub_choice = input().strip().lower() or "a"
 
-            if sub_choice == "a":
-                curated_beats.append(replacement_text.strip())
-                print("→ Replacement accepted.\n")
-            elif sub_choice == "e":
-                print("\nEnter new text for this replacement beat.")
-                print("Finish by entering a blank line on its own.\n")
-                new_lines: list[str] = []
-                while True:
-                    line = input()
-                    if line == "":
-                        break
-                    new_lines.append(line)
-                new_text = "\n".join(new_lines).strip()
-                if not new_text:
-                    print("No new text entered; replacement skipped.\n")
-                else:
-                    curated_beats.append(new_text)
-                    print("→ Replacement edited and accepted.\n")
-            else:
-                print("→ Replacement skipped; original beat rejected with no substitute.\n")
+def _daemon_send(wfile, lock: threading.Lock, message: dict) -> None:
+    try:
+        with lock:
+            wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+            wfile.flush()
+    except OSError:
+        pass  # client went away; finish the command anyway
 
-            continue  # move on to the next original beat
 
-        elif choice == "e":
-            print("\nEnter new text for this beat.")
-            print("Finish by entering a blank line on its own.\n")
-            new_lines: list[str] = []
-            while True:
-                line = input()
-                if line == "":
-                    break
-                new_lines.append(line)
-            new_text = "\n".join(new_lines).strip()
-            if not new_text:
-                print("No new text entered; skipping this beat.\n")
-                continue
-            curated_beats.append(new_text)
-            print("→ Edited and accepted.\n")
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        lock = threading.Lock()
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            _daemon_send(self.wfile, lock, {"stream": "err", "data": "Bad request.\n"})
+            _daemon_send(self.wfile, lock, {"exit": 2})
+            return
 
-        else:  # default accept
-            curated_beats.append(text)
-            print("→ Accepted.\n")
+        op = request.get("op", "run")
+        if op == "ping":
+            _daemon_send(self.wfile, lock, {"exit": 0, "pid": os.getpid()})
+            return
+        if op == "stop":
+            _daemon_send(self.wfile, lock, {"exit": 0})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
 
+        code = 0
+        previous_cwd = os.getcwd()
+        out = _SocketStream(self.wfile, "out", lock)
+        err = _SocketStream(self.wfile, "err", lock)
+        try:
+            os.chdir(request.get("cwd") or previous_cwd)
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                try:
+                    main(list(request.get("argv", [])))
+                except SystemExit as e:
+                    if isinstance(e.code, int):
+                        code = e.code
+                    elif e.code is not None:
+                        print(e.code, file=sys.stderr)
+                        code = 1
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+        finally:
+            os.chdir(previous_cwd)
+        _daemon_send(self.wfile, lock, {"exit": code})
+
+
+def run_daemon(args: argparse.Namespace) -> None:
+    global _IN_DAEMON
+    path = args.socket
+
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            raise SystemExit(f"ERROR: A daemon is already listening on {path}")
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)  # stale socket from a crashed daemon
+        finally:
+            probe.close()
+
+    server = socketserver.UnixStreamServer(path, _DaemonHandler)
+    os.chmod(path, 0o600)
+    get_client(resolve_backend("daemon"))  # fail now, not on the first forwarded command, if there is no API key
+    _IN_DAEMON = True
+    print(f"[DAEMON] Listening on {path} (pid {os.getpid()}). Stop with Ctrl+C or creator_client.py --stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _IN_DAEMON = False
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        print("[DAEMON] Stopped.")
+
+
+# ---------- JOB QUEUE ----------
+
+# `submit` puts a pipeline command on a durable SQLite queue; `workers` drains it.
+# Each job runs as its own child process (a crash or hang can't take the worker
+# down, and each attempt's output goes to .jobs/<id>.log). Running jobs heartbeat;
+# a job whose heartbeat goes stale (worker killed, machine rebooted) is requeued
+# by the next worker to look. Failures retry with exponential backoff. A project
+# can have only one queued/running job per stage, enforced by a partial unique index.
+QUEUE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Projects", ".job_queue.sqlite")
+JOB_LOG_DIR = os.path.join(os.path.dirname(QUEUE_FILE), ".jobs")
+QUEUE_COMMANDS = ("fill-outline", "fill-script", "script-draft", "script-polish", "publish-pack")
+JOB_MAX_ATTEMPTS = 3
+JOB_BACKOFF_SECONDS = 30        # first retry delay; doubles per attempt
+JOB_BACKOFF_MAX_SECONDS = 1800
+JOB_HEARTBEAT_SECONDS = 2       # how often a worker checks in (and checks for cancel)
+JOB_STALE_SECONDS = 60          # heartbeat older than this = worker is gone
+JOB_ACTIVE_STATES = ("queued", "running", "cancelling")
+
+
+def _open_queue() -> sqlite3.Connection:
+    """New autocommit connection (one per thread); claims use BEGIN IMMEDIATE."""
+    os.makedirs(os.path.dirname(QUEUE_FILE), exist_ok=True)
+    conn = sqlite3.connect(QUEUE_FILE, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, command TEXT NOT NULL, project TEXT NOT NULL, "
+        "argv TEXT NOT NULL, cwd TEXT NOT NULL, state TEXT NOT NULL, "
+        "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, "
+        "created REAL NOT NULL, not_before REAL NOT NULL, started REAL, finished REAL, "
+        "worker TEXT, heartbeat REAL, exit_code INTEGER, error TEXT, pid INTEGER)"
+    )
+    if "pid" not in {col["name"] for col in conn.execute("PRAGMA table_info(jobs)")}:
+        conn.execute("ALTER TABLE jobs ADD COLUMN pid INTEGER")  # queues created before pid was tracked
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_stage ON jobs(lower(project), command) "
+        "WHERE state IN ('queued', 'running', 'cancelling')"
+    )
+    return conn
 
-    if not curated_beats:
-        print("No beats were accepted. Nothing written.")
-        return
 
-    # Write beats_final.md
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def _job_backoff(attempts: int) -> float:
+    return min(JOB_BACKOFF_MAX_SECONDS, JOB_BACKOFF_SECONDS * 2 ** max(0, attempts - 1))
 
-    with open(beats_path, "w", encoding="utf-8") as f:
-        f.write("# Final Beat List\n\n")
-        f.write(f"_Project:_ **{project_name}**\n")
-        f.write(f"_Generated:_ {timestamp}\n\n")
-        f.write("---\n\n")
-        for i, beat_text in enumerate(curated_beats, start=1):
-            # Keep simple numbered format for Script Draft Builder
-            f.write(f"{i}. {beat_text}\n\n")
 
-    print(f"Curated {len(curated_beats)} beats.")
-    print(f"Final beat list written to: {beats_path}")
+def submit_job(argv: list[str], max_attempts: int = JOB_MAX_ATTEMPTS) -> tuple[int, bool]:
+    """
+    Validate a command line and queue it. Returns (job id, created); created is
+    False when the same stage is already queued or running for that project.
+    """
+    job_args = build_parser().parse_args(argv)  # bad arguments fail now, not in a worker
+    if job_args.command not in QUEUE_COMMANDS:
+        raise SystemExit(f"ERROR: Only these commands can be queued: {', '.join(QUEUE_COMMANDS)}")
+    project = job_args.project
+    project = slugify_name(" ".join(project) if isinstance(project, list) else project)
+
+    now = time.time()
+    conn = _open_queue()
+    try:
+        try:
+            cur = conn.execute(
+                "INSERT INTO jobs (command, project, argv, cwd, state, max_attempts, created, not_before) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_args.command, project, json.dumps(argv), os.getcwd(), max(1, max_attempts), now, now),
+            )
+            return cur.lastrowid, True
+        except sqlite3.IntegrityError:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE lower(project) = lower(?) AND command = ? "
+                "AND state IN ('queued', 'running', 'cancelling')",
+                (project, job_args.command),
+            ).fetchone()
+            return row["id"], False
+    finally:
+        conn.close()
+
+
+def _job_process_alive(pid: int | None) -> bool:
+    """True if pid is still a running creator_assistant.py job process."""
+    if not pid or os.name != "posix":
+        return False  # no portable, side-effect free check (os.kill terminates on Windows)
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            # Empty for a zombie; another program if the pid was reused after a reboot
+            return os.path.basename(__file__).encode() in f.read()
+    except FileNotFoundError:
+        return False
+    except OSError:
+        pass  # no /proc (macOS): fall back to "does the pid exist"
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return False  # someone else's process: the pid was reused
+    return True
 
 
+def _stop_orphaned_job(pid: int) -> None:
+    """Kill the job process (its own session, see run_job) left behind by a lost worker."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
 
-# ----------BEAT REPLACEMENT TOOL ----------
 
-def generate_replacement_beat(original_beat: str, channel: str = "shrouded") -> str:
+def _recover_stale_jobs(conn: sqlite3.Connection, now: float) -> None:
     """
-    Use the OpenAI API to generate an alternative beat that could replace the original one.
-
-    - Keeps the same general story role/context.
-    - Changes the specific event, evidence, or imagery.
-    - Returns 2–5 sentences, no numbering.
+    Requeue (or give up on) jobs whose worker stopped heartbeating. Caller holds
+    the write lock. A lost worker's job process may still be running (and
+    writing): it is killed first, and the job is only released on a later pass,
+    once that process is gone.
     """
-    if channel == "shrouded":
-        system_msg = (
-            "You are an expert documentary-horror story crafter for The Shrouded Ledger. "
-            "You revise outline beats so they stay structurally consistent but use different "
-            "events, evidence, or imagery. You do not describe emotions directly; you show "
-            "observable behavior, documents, and anomalies."
+    cutoff = now - JOB_STALE_SECONDS
+    stale = conn.execute(
+        "SELECT id, state, attempts, max_attempts, pid FROM jobs "
+        "WHERE state IN ('running', 'cancelling') AND heartbeat < ?",
+        (cutoff,),
+    ).fetchall()
+    for row in stale:
+        if _job_process_alive(row["pid"]):
+            _stop_orphaned_job(row["pid"])
+            continue
+        if row["state"] == "cancelling":
+            conn.execute(
+                "UPDATE jobs SET state = 'cancelled', finished = ?, worker = NULL, pid = NULL, "
+                "error = 'worker lost while cancelling' WHERE id = ?",
+                (now, row["id"]),
+            )
+            continue
+        attempts = row["attempts"] + 1
+        if attempts >= row["max_attempts"]:
+            conn.execute(
+                "UPDATE jobs SET state = 'failed', attempts = ?, finished = ?, worker = NULL, pid = NULL, "
+                "error = 'worker lost (crash or reboot)' WHERE id = ?",
+                (attempts, now, row["id"]),
+            )
+        else:
+            conn.execute(
+                "UPDATE jobs SET state = 'queued', attempts = ?, not_before = ?, worker = NULL, pid = NULL, "
+                "error = 'worker lost (crash or reboot)' WHERE id = ?",
+                (attempts, now + _job_backoff(attempts), row["id"]),
+            )
+
+
+def claim_job(worker: str) -> sqlite3.Row | None:
+    """Atomically take the next due job (oldest first) and mark it running."""
+    now = time.time()
+    conn = _open_queue()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _recover_stale_jobs(conn, now)
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE state = 'queued' AND not_before <= ? ORDER BY not_before, id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET state = 'running', worker = ?, started = ?, heartbeat = ? WHERE id = ?",
+                    (worker, now, now, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+    finally:
+        conn.close()
+
+
+def _job_heartbeat(conn: sqlite3.Connection, job_id: int) -> str:
+    """Refresh the job's heartbeat and return its current state (e.g. 'cancelling')."""
+    conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+    return conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()["state"]
+
+
+def _log_tail(path: str, lines: int = 1) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            tail = [line.rstrip() for line in f if line.strip()]
+        return "\n".join(tail[-lines:])
+    except FileNotFoundError:
+        return ""
+
+
+def run_job(job: sqlite3.Row, worker: str, stop: threading.Event) -> str:
+    """Run one claimed job in a child process and record the outcome. Returns the new state."""
+    os.makedirs(JOB_LOG_DIR, exist_ok=True)
+    log_path = os.path.join(JOB_LOG_DIR, f"{job['id']}.log")
+    attempt = job["attempts"] + 1
+    conn = _open_queue()
+    try:
+        with open(log_path, "a", encoding="utf-8") as log:
+            log.write(f"\n=== attempt {attempt}/{job['max_attempts']} by {worker} at {datetime.now():%Y-%m-%d %H:%M:%S} ===\n")
+            log.flush()
+            proc = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), *json.loads(job["argv"])],
+                cwd=job["cwd"] if os.path.isdir(job["cwd"]) else None,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                # Own session (pgid = pid), so a recovering worker can kill it if we die
+                start_new_session=True,
+            )
+            conn.execute("UPDATE jobs SET pid = ? WHERE id = ?", (proc.pid, job["id"]))
+            cancelled = False
+            while True:
+                try:
+                    code = proc.wait(timeout=JOB_HEARTBEAT_SECONDS)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+                if _job_heartbeat(conn, job["id"]) == "cancelling":
+                    cancelled = True
+                if cancelled or stop.is_set():
+                    proc.terminate()
+                    try:
+                        code = proc.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+                        code = proc.wait()
+                    break
+
+        now = time.time()
+        if cancelled:
+            state, fields = "cancelled", {"error": "cancelled while running"}
+        elif stop.is_set() and code != 0:
+            # Shut down mid-run: put it back without spending an attempt
+            state, fields = "queued", {"not_before": now, "error": "worker stopped; requeued"}
+        elif code == 0:
+            state, fields = "done", {"attempts": attempt, "error": None}
+        else:
+            error = f"exit {code}: {_log_tail(log_path) or 'no output'}"
+            if attempt < job["max_attempts"]:
+                state, fields = "queued", {"attempts": attempt, "not_before": now + _job_backoff(attempt), "error": error}
+            else:
+                state, fields = "failed", {"attempts": attempt, "error": error}
+        if state != "queued":
+            fields["finished"] = now
+        fields.update(state=state, exit_code=code, worker=None, pid=None)
+        conn.execute(
+            f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+            (*fields.values(), job["id"]),
         )
-    else:  # aperture
-        system_msg = (
-            "You are an expert in image-driven liminal horror outlines for Aperture Black. "
-            "You revise outline beats so they stay structurally consistent but use different "
-            "visual environments and unsettling details."
+        return state
+    finally:
+        conn.close()
+
+
+def cancel_job(job_id: int) -> str | None:
+    """Cancel a queued job now, or ask the worker running it to stop. Returns the job's state."""
+    conn = _open_queue()
+    try:
+        conn.execute(
+            "UPDATE jobs SET state = 'cancelled', finished = ? WHERE id = ? AND state = 'queued'",
+            (time.time(), job_id),
         )
+        conn.execute("UPDATE jobs SET state = 'cancelling' WHERE id = ? AND state = 'running'", (job_id,))
+        row = conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["state"] if row else None
+    finally:
+        conn.close()
+
+
+def run_submit(args: argparse.Namespace) -> None:
+    if not args.job:
+        raise SystemExit("ERROR: Nothing to submit. Example: submit script-draft --project \"Whispering Pines\"")
+    job_id, created = submit_job(args.job, max_attempts=args.max_attempts)
+    if created:
+        print(f"[QUEUE] Job {job_id} queued: {' '.join(args.job)}")
+    else:
+        print(f"[QUEUE] Already queued or running as job {job_id}; not added again.")
 
-    user_prompt = f"""
-You are revising ONE outline beat for a {channel}-style horror project.
 
-ORIGINAL BEAT:
-\"\"\"{original_beat}\"\"\"
+def run_status(args: argparse.Namespace) -> None:
+    if not os.path.exists(QUEUE_FILE):
+        print("No jobs submitted yet.")
+        return
+    conn = _open_queue()
+    try:
+        if args.id is not None:
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (args.id,)).fetchone()
+            if job is None:
+                raise SystemExit(f"ERROR: No job {args.id}")
+            for key in job.keys():
+                value = job[key]
+                if key in ("created", "not_before", "started", "finished", "heartbeat") and value:
+                    value = datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S")
+                print(f"{key:<13} {value}")
+            tail = _log_tail(os.path.join(JOB_LOG_DIR, f"{args.id}.log"), lines=20)
+            if tail:
+                print(f"\n--- last lines of {os.path.join(JOB_LOG_DIR, f'{args.id}.log')} ---\n{tail}")
+            return
 
-TASK:
-Write a different beat that could replace it in the same outline.
+        sql = "SELECT * FROM jobs"
+        if not args.all:
+            sql += " WHERE state IN ('queued', 'running', 'cancelling', 'failed')"
+        rows = conn.execute(sql + " ORDER BY id").fetchall()
+        counts = dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+    finally:
+        conn.close()
+
+    now = time.time()
+    print(f"{'id':>5}  {'state':<10} {'tries':>5}  {'command':<14} {'project':<28} info")
+    for job in rows:
+        if job["state"] == "queued" and job["not_before"] > now:
+            info = f"retry in {job['not_before'] - now:.0f}s"
+        elif job["state"] in ("running", "cancelling"):
+            info = f"{job['worker']}, {now - (job['started'] or now):.0f}s"
+        else:
+            info = job["error"] or ""
+        print(
+            f"{job['id']:>5}  {job['state']:<10} {job['attempts']:>2}/{job['max_attempts']:<2}  "
+            f"{job['command']:<14} {job['project'][:28]:<28} {info[:60]}"
+        )
+    print("Totals: " + (", ".join(f"{state} {n}" for state, n in sorted(counts.items())) or "none"))
 
-Requirements:
-- Keep roughly the same structural role (scope, focus, where it comes in the story).
-- Change the specifics of the event, evidence, or visual imagery.
-- Write 2–5 sentences total.
-- Do NOT number the beat or add labels; return only the beat text.
-"""
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": user_prompt},
-        ],
-        max_tokens=400,
-        temperature=0.8,
-    )
+def run_cancel(args: argparse.Namespace) -> None:
+    for job_id in args.ids:
+        state = cancel_job(job_id)
+        if state is None:
+            print(f"[QUEUE] No job {job_id}")
+        elif state == "cancelling":
+            print(f"[QUEUE] Job {job_id} is running; its worker will stop it.")
+        else:
+            print(f"[QUEUE] Job {job_id}: {state}")
 
-    return response.choices[0].message.content.strip()
 
+def run_workers(args: argparse.Namespace) -> None:
+    """Drain the queue with args.count worker threads, each running one job process at a time."""
+    stop = threading.Event()
+    print_lock = threading.Lock()
 
-# ---------- CLI WIRES ----------
+    def say(message: str) -> None:
+        with print_lock:
+            print(f"[QUEUE {datetime.now():%H:%M:%S}] {message}", flush=True)
+
+    def pending() -> bool:
+        conn = _open_queue()
+        try:
+            return conn.execute(
+                "SELECT 1 FROM jobs WHERE state IN ('queued', 'running', 'cancelling') LIMIT 1"
+            ).fetchone() is not None
+        finally:
+            conn.close()
+
+    def loop(name: str) -> None:
+        while not stop.is_set():
+            job = claim_job(name)
+            if job is None:
+                if args.drain and not pending():
+                    return
+                stop.wait(args.poll)
+                continue
+            say(f"{name}: job {job['id']} {job['command']} ({job['project']}) started, attempt {job['attempts'] + 1}")
+            start = time.time()
+            try:
+                state = run_job(job, name, stop)
+            except Exception as e:
+                say(f"{name}: job {job['id']} could not run: {e}")
+                stop.wait(args.poll)
+                continue
+            say(f"{name}: job {job['id']} {state} after {time.time() - start:.0f}s")
 
-def main():
+    names = [f"worker-{os.getpid()}-{i + 1}" for i in range(max(1, args.count))]
+    threads = [threading.Thread(target=loop, args=(name,), daemon=True) for name in names]
+    say(f"{len(threads)} worker(s) on {QUEUE_FILE}" + (" (exit when drained)" if args.drain else "; Ctrl+C to stop"))
+    for t in threads:
+        t.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(timeout=0.5)
+    except KeyboardInterrupt:
+        say("Stopping: running jobs are terminated and requeued...")
+        stop.set()
+        for t in threads:
+            t.join()
+    say("Workers stopped.")
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Creator Assistant: multi-tool CLI for outlines, metadata, script expansion, and thumbnails."
     )
 
+    parser.add_argument(
+        "--backend",
+        default=None,
+        help=(
+            "LLM backend for this command: 'openai', 'local' (OpenAI-compatible server at "
+            "$LOCAL_LLM_BASE_URL) or one defined in tools/llm_backends.json. "
+            "Default: $CREATOR_LLM_BACKEND, then the file's command/channel routes, then openai."
+        ),
+    )
+    parser.add_argument(
+        "--priority",
+        choices=list(PRIORITIES),
+        default=None,
+        help=(
+            "Scheduling class for this command's LLM calls, sharing each backend's concurrency "
+            "across processes (default: batch for pipeline stages, interactive otherwise)."
+        ),
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Hedge slow LLM calls: after this command's p90 latency, fire a duplicate and take the first reply.",
+    )
+    parser.add_argument(
+        "--hedge-budget",
+        type=float,
+        default=0.15,
+        help="Max fraction of calls that may be hedged, capping the extra spend (default: 0.15).",
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record",
+        metavar="CASSETTE",
+        help="Record every LLM request/response pair to this JSONL cassette file.",
+    )
+    cassette_group.add_argument(
+        "--replay",
+        metavar="CASSETTE",
+        help="Serve LLM responses from a recorded cassette instead of the API (no API key needed).",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        choices=["zero", "original"],
+        default="zero",
+        help="On --replay, return instantly or sleep for each call's recorded latency (default: zero).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run the command under cProfile and write a pstats file.",
+    )
+    parser.add_argument(
+        "--profile-out",
+        default=None,
+        help="pstats output path for --profile (default: profile_<command>_<time>.pstats).",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Write per-stage spans (read, parse, prompt, LLM call, write) as Chrome trace-event JSON.",
+    )
+    parser.add_argument(
+        "--trace-out",
+        default=None,
+        help="Trace output path for --trace (default: trace_<command>_<time>.json).",
+    )
+
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Outline subcommand
@@ -2014,7 +5271,36 @@ def main():
     polish_p.add_argument(
     "--model",
     default="gpt-4o-mini",
-    help="Model to use for polishing (default: gpt-4o-mini). Try gpt-4o or gpt-4.1-mini if refusals persist."
+    help="Primary model for polishing (default: gpt-4o-mini). Refused or failed sections fall back through --cascade."
+)
+
+    polish_p.add_argument(
+    "--cascade",
+    default=None,
+    help=(
+        "Comma-separated fallback tiers tried after --model: a model name, or mode:<polish mode> "
+        "to retry the primary model in that mode. 'none' disables fallback "
+        f"(default: {','.join(COMMAND_FALLBACKS['script-polish'])})."
+    ),
+)
+
+    polish_p.add_argument(
+    "--chunk-tokens",
+    type=int,
+    default=CHUNK_TOKENS,
+    help=f"Split sections longer than this many tokens at paragraph/sentence boundaries (default: {CHUNK_TOKENS}).",
+)
+    polish_p.add_argument(
+    "--chunk-overlap",
+    type=int,
+    default=CHUNK_OVERLAP_TOKENS,
+    help="Tokens of the previous chunk shown to the model as read-only context (default: 0).",
+)
+    polish_p.add_argument(
+    "--workers",
+    type=int,
+    default=CHUNK_WORKERS,
+    help=f"Chunks polished in parallel (default: {CHUNK_WORKERS}).",
 )
 
     polish_p.add_argument(
@@ -2094,7 +5380,15 @@ def main():
     publish_p.add_argument(
         "--model",
         default="gpt-4o-mini",
-        help="Model to use (default: gpt-4o-mini).",
+        help="Primary model (default: gpt-4o-mini). Failed or refused packs fall back through --cascade.",
+    )
+    publish_p.add_argument(
+        "--cascade",
+        default=None,
+        help=(
+            "Comma-separated fallback models tried after --model; 'none' disables fallback "
+            f"(default: {','.join(COMMAND_FALLBACKS['publish-pack'])})."
+        ),
     )
     publish_p.add_argument(
         "--title-count",
@@ -2114,6 +5408,16 @@ def main():
         default=8,
         help="Number of thumbnail concept options (default: 8).",
     )
+    publish_p.add_argument(
+        "--parallel-sections",
+        action="store_true",
+        help="Generate titles, descriptions, tags, hashtags and thumbnails as concurrent per-section requests.",
+    )
+    publish_p.add_argument(
+        "--title-pool",
+        action="store_true",
+        help=f"Request {TITLE_POOL_CHOICES} extra title sets in one call and keep the best --title-count of all of them.",
+    )
     publish_p.add_argument(
     "--seed",
     nargs="+",
@@ -2221,6 +5525,21 @@ def main():
         default="shrouded",
         help="Tone preset used when generating replacement beats (default: shrouded).",
     )
+    beat_manager_parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=BEAT_PREFETCH_LOOKAHEAD,
+        help=(
+            "Generate replacements in the background for the current beat and this many upcoming "
+            f"beats, so [r]eject is instant (default: {BEAT_PREFETCH_LOOKAHEAD}; 0 disables)."
+        ),
+    )
+    beat_manager_parser.add_argument(
+        "--options",
+        type=int,
+        default=REPLACEMENT_OPTIONS,
+        help=f"Replacement options offered per rejected beat, from one request (default: {REPLACEMENT_OPTIONS}).",
+    )
 
     # Script draft builder subcommand
     script_draft_parser = subparsers.add_parser(
@@ -2248,16 +5567,188 @@ def main():
         help="Disable the CINEMATIC B-ROLL sections in the generated script.",
     )
 
+    # Search subcommand
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Full-text search across all projects (beats, narration, B-roll, titles, concepts).",
+    )
+    search_parser.add_argument(
+        "query",
+        nargs="+",
+        help="Words or phrase to search for.",
+    )
+    search_parser.add_argument(
+        "--kind",
+        choices=SEARCH_KINDS,
+        help="Only return one kind of section (e.g. broll, title, narration).",
+    )
+    search_parser.add_argument(
+        "--project",
+        help="Only search one project (same name as used with new-project).",
+    )
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Maximum number of results (default: 10).",
+    )
+    search_parser.add_argument(
+        "--phrase",
+        action="store_true",
+        help="Match the words as an exact phrase instead of all words anywhere.",
+    )
+    search_parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Pass the query straight to SQLite FTS5 (supports OR, NEAR, prefix*).",
+    )
+    search_parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Drop and rebuild the whole search index before searching.",
+    )
+    search_parser.add_argument(
+        "--no-update",
+        action="store_true",
+        help="Search the existing index without checking files for changes.",
+    )
+
+    # Stats subcommand
+    stats_parser = subparsers.add_parser(
+        "stats",
+        help="Latency (p50/p95/p99), tokens and estimated cost from the LLM call ledger.",
+    )
+    stats_parser.add_argument(
+        "--by",
+        choices=["command", "project", "day", "model"],
+        help="Only show one grouping (default: command, project and day).",
+    )
+    stats_parser.add_argument(
+        "--since",
+        help="Only include calls on or after this day (YYYY-MM-DD).",
+    )
+    stats_parser.add_argument(
+        "--project",
+        help="Only include calls for one project (same name as used with the other commands).",
+    )
+
+    # Daemon subcommand
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Serve commands over a Unix socket with a warm client and caches (use creator_client.py).",
+    )
+    daemon_parser.add_argument(
+        "--socket",
+        default=DAEMON_SOCKET,
+        help=f"Socket path (default: {DAEMON_SOCKET}).",
+    )
+
+    # Job queue subcommands
+    submit_parser = subparsers.add_parser(
+        "submit",
+        help=f"Queue a pipeline command ({', '.join(QUEUE_COMMANDS)}) for the workers.",
+    )
+    submit_parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=JOB_MAX_ATTEMPTS,
+        help=f"Attempts before the job is marked failed (default: {JOB_MAX_ATTEMPTS}).",
+    )
+    submit_parser.add_argument(
+        "job",
+        nargs=argparse.REMAINDER,
+        help='The command line to queue, e.g. script-draft --project "Whispering Pines".',
+    )
+
+    status_parser = subparsers.add_parser("status", help="Show queued, running and failed jobs.")
+    status_parser.add_argument("id", nargs="?", type=int, help="Show one job in detail, with its log tail.")
+    status_parser.add_argument("--all", action="store_true", help="Include done and cancelled jobs.")
+
+    cancel_parser = subparsers.add_parser("cancel", help="Cancel queued or running jobs.")
+    cancel_parser.add_argument("ids", nargs="+", type=int, help="Job id(s) to cancel.")
+
+    workers_parser = subparsers.add_parser("workers", help="Run workers that drain the job queue.")
+    workers_parser.add_argument(
+        "--count",
+        type=int,
+        default=2,
+        help="Jobs to run at once (default: 2). LLM calls still share each backend's concurrency budget.",
+    )
+    workers_parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="Exit once nothing is queued or running, instead of waiting for new jobs.",
+    )
+    workers_parser.add_argument(
+        "--poll",
+        type=float,
+        default=5.0,
+        help="Seconds between checks of an empty queue (default: 5).",
+    )
+
+    return parser
 
-    args = parser.parse_args()
 
+def main(argv: list[str] | None = None) -> None:
+    """
+    Run one command line. Per-command state (hedging, cassette, ledger context,
+    trace) is reset here, so daemon mode can call this repeatedly in-process.
+    """
+    args = build_parser().parse_args(argv)
+
+    configure_hedging(args.command, args.hedge, args.hedge_budget)
+    if args.record:
+        configure_cassette("record", args.record)
+    elif args.replay:
+        try:
+            configure_cassette("replay", args.replay, latency=args.replay_latency)
+        except FileNotFoundError:
+            raise SystemExit(f"ERROR: Cassette not found: {args.replay}")
+    else:
+        configure_cassette(None, None)
+    set_ledger_context(command=args.command, project=getattr(args, "project", None), beat=None, retry=0)
+    LLM_BACKEND["name"] = resolve_backend(args.command, getattr(args, "channel", None), args.backend)
+    LLM_PRIORITY["default"] = args.priority or COMMAND_PRIORITY.get(args.command, "interactive")
+    if LLM_BACKEND["name"] != "openai":
+        spec = get_backend(LLM_BACKEND["name"])
+        print(f"[Creator Assistant] LLM backend: {LLM_BACKEND['name']} ({spec['base_url']}, model={spec['model'] or 'per command'})")
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    TRACE["enabled"] = args.trace
+    TRACE["events"] = []
+    with _polish_cache_lock:
+        _POLISH_CACHE.clear()
+    profiler = cProfile.Profile() if args.profile else None
+
+    # Write profile/trace/latency history even when the command exits early (SystemExit, errors)
+    try:
+        if profiler:
+            profiler.enable()
+        with trace_span(args.command, category="command"):
+            run_command(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            write_profile(profiler, args.profile_out or f"profile_{args.command}_{stamp}.pstats")
+        if TRACE["enabled"]:
+            write_trace(args.trace_out or f"trace_{args.command}_{stamp}.json")
+        if args.hedge:
+            report_hedging()
+        save_latencies()
+
+
+def run_command(args: argparse.Namespace) -> None:
+    """Dispatch a parsed command line to its tool."""
     if args.command == "outline":
         seed_idea = " ".join(args.seed)
         beats = args.beats
         channel = args.channel
 
         print(f"\n[Creator Assistant] Generating OUTLINE ({beats} beats, channel='{channel}')...\n")
-        outline = generate_outline(seed_idea, beats=beats, channel=channel)
+        try:
+            outline = generate_outline(seed_idea, beats=beats, channel=channel)
+        except ValueError as e:
+            raise SystemExit(f"Error: {e}")
         print("=== OUTLINE ===\n")
         print(outline)
 
@@ -2317,7 +5808,11 @@ def main():
             output=args.output,
             append=args.append,
             model=args.model,
-            output_format=args.format
+            output_format=args.format,
+            cascade=cascade_for("script-polish", args.model, args.cascade),
+            chunk_tokens=args.chunk_tokens,
+            chunk_overlap=args.chunk_overlap,
+            workers=args.workers,
 )
 
         print(f"[OK] Script polish complete: {out_path}")
@@ -2345,6 +5840,7 @@ def main():
     elif args.command == "publish-pack":
         project_dir = Path(_get_project_dir(args.project))
         channel = args.channel  
+        cascade = cascade_for("publish-pack", args.model, args.cascade)
 
         print(
             f"\n[Creator Assistant] Generating PUBLISH PACK "
@@ -2357,17 +5853,22 @@ def main():
             if not outline_path.exists():
                 raise SystemExit("ERROR: outline.md not found. Run fill-outline first.")
 
-            outline_text = _read_text_if_exists(outline_path)
-            beat_blocks = _extract_last_ab_beats(outline_text, beats=15)
+            with trace_span("read file", path=outline_path):
+                outline_text = _read_text_if_exists(outline_path)
+            with trace_span("parse beats"):
+                beat_blocks = _extract_last_ab_beats(outline_text, beats=15)
             if not beat_blocks:
                 raise SystemExit(
                     "ERROR: Could not parse beats from outline.md (expected **Beat X: ...** format)."
                 )
 
-            image_ideas_text = _read_text_if_exists(project_dir / "image_ideas.md")
-            image_ideas = _extract_ab_image_ideas(image_ideas_text, max_items=25) if image_ideas_text else []
+            with trace_span("read file", path=project_dir / "image_ideas.md"):
+                image_ideas_text = _read_text_if_exists(project_dir / "image_ideas.md")
+            with trace_span("parse image ideas"):
+                image_ideas = _extract_ab_image_ideas(image_ideas_text, max_items=25) if image_ideas_text else []
 
-            thumbnail_text = _read_text_if_exists(project_dir / "thumbnail_concepts.md")
+            with trace_span("read file", path=project_dir / "thumbnail_concepts.md"):
+                thumbnail_text = _read_text_if_exists(project_dir / "thumbnail_concepts.md")
 
             seed_idea = getattr(args, "seed", None)
             if isinstance(seed_idea, list):
@@ -2375,27 +5876,28 @@ def main():
             if not seed_idea:
                 seed_idea = str(args.project)  # fallback
 
-            prompt = build_publish_pack_prompt_aperture(
-                seed_idea=seed_idea,
-                beat_blocks=beat_blocks,
-                image_ideas=image_ideas,
-                thumbnail_concepts_text=thumbnail_text,
-                title_count=args.title_count,
-                description_count=args.description_count,
-                hashtag_count=getattr(args, "hashtag_count", 12),
-            )
-
-            system = "You are Creator Assistant. Produce precise, formatted markdown output only."
-            output = call_llm(
-                system=system,
-                user=prompt,
-                model=args.model,
-                max_tokens=3500,
-                temperature=0.5,
+            output, tier = run_cascade(
+                cascade,
+                lambda t: generate_publish_pack_aperture(
+                    seed_idea=seed_idea,
+                    beat_blocks=beat_blocks,
+                    image_ideas=image_ideas,
+                    thumbnail_concepts_text=thumbnail_text,
+                    model=t["model"],
+                    title_count=args.title_count,
+                    description_count=args.description_count,
+                    hashtag_count=getattr(args, "hashtag_count", 12),
+                    parallel_sections=args.parallel_sections,
+                    title_pool=args.title_pool,
+                ),
             )
+            if tier is None:
+                raise SystemExit("ERROR: Every cascade tier refused or failed; no publish pack written.")
+            print(f"[Creator Assistant] Produced by: {tier['label']}")
 
             out_path = project_dir / args.output
-            out_path.write_text(output.strip() + "\n", encoding="utf-8")
+            with trace_span("write file", path=out_path):
+                out_path.write_text(output.strip() + "\n", encoding="utf-8")
             print(f"[Creator Assistant] Wrote: {out_path}")
             return
 
@@ -2409,6 +5911,9 @@ def main():
             title_count=args.title_count,
             description_count=args.description_count,
             thumbnail_count=args.thumbnail_count,
+            cascade=cascade,
+            parallel_sections=args.parallel_sections,
+            title_pool=args.title_pool,
         )
         print(f"[Creator Assistant] Wrote: {out_path}")
         return
@@ -2446,8 +5951,8 @@ def main():
                 channel=channel,
             )
             print(f"Outline appended to: {outline_path}")
-        except FileNotFoundError as e:
-            print(f"Error: {e}")
+        except (FileNotFoundError, ValueError) as e:
+            raise SystemExit(f"Error: {e}")
 
     elif args.command == "fill-script":
         project_name = " ".join(args.project)
@@ -2469,7 +5974,7 @@ def main():
             )
             print(f"Segment appended to: {script_path}")
         except FileNotFoundError as e:
-            print(f"Error: {e}")
+            raise SystemExit(f"Error: {e}")
 
     elif args.command == "beat-manager":
         run_beat_manager(args)
@@ -2477,5 +5982,28 @@ def main():
     elif args.command == "script-draft":
         run_script_draft_builder(args)
 
+    elif args.command == "search":
+        run_search(args)
+
+    elif args.command == "stats":
+        run_stats(args)
+
+    elif args.command == "submit":
+        run_submit(args)
+
+    elif args.command == "status":
+        run_status(args)
+
+    elif args.command == "cancel":
+        run_cancel(args)
+
+    elif args.command == "workers":
+        run_workers(args)
+
+    elif args.command == "daemon":
+        if _IN_DAEMON:
+            raise SystemExit("ERROR: Already running inside the daemon.")
+        run_daemon(args)
+
 if __name__ == "__main__":
     main()
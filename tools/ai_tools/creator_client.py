@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import socket
+import tempfile
+
+# Thin client for `creator_assistant.py daemon`. Deliberately imports nothing heavy
+# (no openai, no dotenv) so each call costs a bare interpreter start plus one
+# socket round trip. Falls back to running creator_assistant.py directly when no
+# daemon is listening.
+#
+#   python3 ai_tools/creator_client.py script-draft --project "Whispering Pines"
+#   python3 ai_tools/creator_client.py --ping
+#   python3 ai_tools/creator_client.py --stop
+
+ASSISTANT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "creator_assistant.py")
+
+# Must match DAEMON_SOCKET in creator_assistant.py (USER_TAG in llm_provider.py)
+USER_TAG = str(os.getuid()) if hasattr(os, "getuid") else (os.environ.get("USERNAME") or "user")
+SOCKET_PATH = os.environ.get("CREATOR_ASSISTANT_SOCKET") or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+    f"creator_assistant-{USER_TAG}.sock",
+)
+
+
+def _has_flag(argv: list[str], flag: str) -> bool:
+    return any(arg == flag or arg.startswith(flag + "=") for arg in argv)
+
+
+def _runs_locally(argv: list[str]) -> bool:
+    """
+    Commands that read from the keyboard or stdin, or run until stopped
+    (daemon, workers), stay local.
+    """
+    if "daemon" in argv or "workers" in argv:
+        return True
+    if "idea-locker" in argv:
+        # Without --source it reads piped text, which never reaches the daemon
+        return not (_has_flag(argv, "--source") or "--list" in argv)
+    return "beat-manager" in argv and "--list" not in argv
+
+
+def _run_local(argv: list[str]) -> None:
+    os.execv(sys.executable, [sys.executable, ASSISTANT, *argv])
+
+
+def _send(request: dict) -> int:
+    """Send one request and relay streamed output. Returns the command's exit code."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(SOCKET_PATH)
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        for line in sock.makefile("r", encoding="utf-8"):
+            message = json.loads(line)
+            if "exit" in message:
+                if request.get("op") == "ping":
+                    print(f"Daemon running (pid {message.get('pid')}) on {SOCKET_PATH}")
+                return message["exit"]
+            stream = sys.stderr if message.get("stream") == "err" else sys.stdout
+            stream.write(message.get("data", ""))
+            stream.flush()
+    print("ERROR: Daemon closed the connection before the command finished.", file=sys.stderr)
+    return 1
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+
+    if argv in (["--ping"], ["--stop"]):
+        try:
+            sys.exit(_send({"op": argv[0][2:]}))
+        except (FileNotFoundError, ConnectionRefusedError):
+            print(f"No daemon listening on {SOCKET_PATH}")
+            sys.exit(1)
+
+    if _runs_locally(argv):
+        _run_local(argv)
+
+    try:
+        code = _send({"op": "run", "argv": argv, "cwd": os.getcwd()})
+    except (FileNotFoundError, ConnectionRefusedError):
+        _run_local(argv)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import os
+import sys
+import json
+import tempfile
+import threading
+import contextlib
+
+import httpx
+from dotenv import load_dotenv
+from openai import OpenAI, DefaultHttpxClient
+
+# Load environment variables from .env (once, for every tool module)
+load_dotenv()
+
+# One OpenAI client per backend per process, shared by creator_assistant.py and every
+# generator module. A single client means a single httpx connection pool: parallel
+# beats, chunks, hedges and publish-pack sections reuse warm keep-alive connections
+# instead of each opening a fresh TLS session.
+MAX_CONNECTIONS = 32             # covers CHUNK_WORKERS x hedge duplicates with headroom
+MAX_KEEPALIVE_CONNECTIONS = 16   # idle connections kept open between calls
+KEEPALIVE_EXPIRY = 90.0          # seconds an idle connection stays in the pool
+CONNECT_TIMEOUT = 10.0
+REQUEST_TIMEOUT = 180.0          # long completions stream for minutes
+
+
+# ---------- BACKENDS ----------
+
+# A backend is any OpenAI-compatible endpoint. "local" targets a llama.cpp / vLLM
+# style server on this machine: no API key, no rate limits, works offline.
+#
+#   base_url        None = api.openai.com
+#   api_key_env     env var holding the key
+#   key_required    exit if that env var is unset (local servers ignore the key)
+#   model           replaces the caller's model (None = keep it, e.g. gpt-4o-mini)
+#   concurrency     max in-flight requests to this backend across all processes
+#                   on this machine (see PRIORITY SCHEDULER)
+#   context_tokens  prompt + completion limit; max_tokens is clamped to fit
+#   supports_n      server honours n > 1 (otherwise choices are fanned out)
+#   stream_usage    server accepts stream_options={"include_usage": true}
+DEFAULT_BACKENDS = {
+    "openai": {
+        "base_url": None,
+        "api_key_env": "OPENAI_API_KEY",
+        "key_required": True,
+        "model": None,
+        "concurrency": 16,
+        "context_tokens": 128000,
+        "supports_n": True,
+        "stream_usage": True,
+    },
+    "local": {
+        "base_url": os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8080/v1"),
+        "api_key_env": "LOCAL_LLM_API_KEY",
+        "key_required": False,
+        "model": os.getenv("LOCAL_LLM_MODEL", "local"),
+        "concurrency": 4,
+        "context_tokens": 8192,
+        "supports_n": False,
+        "stream_usage": True,
+    },
+}
+
+# A backend that only exists in BACKENDS_FILE starts from these settings and must
+# give its own base_url; it keeps the caller's model unless it names one.
+NEW_BACKEND = {
+    "base_url": None,
+    "api_key_env": None,
+    "key_required": False,
+    "model": None,
+    "concurrency": 4,
+    "context_tokens": 8192,
+    "supports_n": False,
+    "stream_usage": False,
+}
+
+# Optional tools/llm_backends.json adds or overrides backends and routes work to them:
+#   {"backends": {"local": {"model": "qwen2.5-14b-instruct", "concurrency": 8},
+#                 "lab": {"base_url": "http://10.0.0.5:8000/v1", "model": "llama-3.1-8b"}},
+#    "routes": {"command:beat-manager": "local", "channel:aperture": "openai"}}
+BACKENDS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "llm_backends.json")
+
+_backends: dict[str, dict] = {}
+_routes: dict[str, str] = {}
+_backends_stamp = None
+_clients: dict[str, OpenAI] = {}
+_client_lock = threading.Lock()
+
+
+def load_backends() -> tuple[dict, dict]:
+    """Backends and routes: DEFAULT_BACKENDS merged with BACKENDS_FILE (re-read when it changes)."""
+    global _backends, _routes, _backends_stamp
+    try:
+        st = os.stat(BACKENDS_FILE)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        stamp = None
+    with _client_lock:
+        if not _backends or stamp != _backends_stamp:
+            config = {}
+            if stamp is not None:
+                try:
+                    with open(BACKENDS_FILE, "r", encoding="utf-8") as f:
+                        config = json.load(f)
+                except ValueError as e:
+                    raise SystemExit(f"ERROR: Could not parse {BACKENDS_FILE}: {e}")
+            backends = {name: dict(spec) for name, spec in DEFAULT_BACKENDS.items()}
+            for name, spec in config.get("backends", {}).items():
+                if name not in backends and not spec.get("base_url"):
+                    raise SystemExit(f"ERROR: Backend '{name}' in {BACKENDS_FILE} needs a base_url")
+                backends[name] = {**backends.get(name, NEW_BACKEND), **spec}
+            # Close and drop clients whose settings changed; they are rebuilt on next use
+            for name in [name for name in _clients if backends.get(name) != _backends.get(name)]:
+                _clients.pop(name).close()
+            _backends, _routes, _backends_stamp = backends, dict(config.get("routes", {})), stamp
+        return _backends, _routes
+
+
+def default_backend() -> str:
+    return os.getenv("CREATOR_LLM_BACKEND") or "openai"
+
+
+def resolve_backend(command: str | None = None, channel: str | None = None, override: str | None = None) -> str:
+    """
+    Pick the backend for a command: --backend, then $CREATOR_LLM_BACKEND, then the
+    "command:<name>" route, then the "channel:<name>" route, then "openai".
+    """
+    backends, routes = load_backends()
+    name = (
+        override
+        or os.getenv("CREATOR_LLM_BACKEND")
+        or routes.get(f"command:{command}")
+        or routes.get(f"channel:{channel}")
+        or "openai"
+    )
+    if name not in backends:
+        raise SystemExit(f"ERROR: Unknown LLM backend '{name}' (known: {', '.join(sorted(backends))})")
+    return name
+
+
+def get_backend(name: str | None = None) -> dict:
+    backends, _ = load_backends()
+    name = name or default_backend()
+    if name not in backends:
+        raise SystemExit(f"ERROR: Unknown LLM backend '{name}' (known: {', '.join(sorted(backends))})")
+    return backends[name]
+
+
+def backend_model(model: str, backend: str | None = None) -> str:
+    """The model to request: the backend's own model if it pins one, else the caller's."""
+    return get_backend(backend)["model"] or model
+
+
+def fit_max_tokens(max_tokens: int, prompt_tokens: int, backend: str | None = None) -> int:
+    """Clamp max_tokens so prompt + completion stays inside the backend's context window."""
+    room = get_backend(backend)["context_tokens"] - prompt_tokens
+    if room < 64:
+        raise ValueError(
+            f"Prompt (~{prompt_tokens} tokens) does not fit backend '{backend or default_backend()}' "
+            f"context of {get_backend(backend)['context_tokens']} tokens."
+        )
+    return min(max_tokens, room)
+
+
+def get_client(backend: str | None = None) -> OpenAI:
+    """
+    Return the shared client for a backend (default: $CREATOR_LLM_BACKEND or "openai"),
+    creating it on first use so importing a tool module, or a --replay run, needs no
+    API key. Exits if the backend requires a key that is missing.
+    """
+    name = backend or default_backend()
+    spec = get_backend(name)
+    with _client_lock:
+        if name not in _clients:
+            api_key = os.getenv(spec["api_key_env"]) if spec.get("api_key_env") else None
+            if not api_key:
+                if spec["key_required"]:
+                    print(f"ERROR: {spec['api_key_env']} not found in .env")
+                    sys.exit(1)
+                api_key = "not-needed"  # local servers ignore it, the SDK insists on one
+            _clients[name] = OpenAI(
+                api_key=api_key,
+                base_url=spec["base_url"],
+                timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=max(MAX_CONNECTIONS, spec["concurrency"]),
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY,
+                    ),
+                ),
+            )
+        return _clients[name]
+
+
+# ---------- PRIORITY SCHEDULER ----------
+
+# A backend's `concurrency` is one budget shared by every process on the machine
+# (CLI runs, the daemon, queue workers): slot i is an flock on SLOT_DIR/<backend>-<i>.lock,
+# which the OS releases even if the holder crashes. Each priority class may only
+# take the first PRIORITY_SHARE of the slots, so a bulk script-draft can soak up
+# most of the budget while the rest stays free for interactive calls. Within one
+# process, a waiting request also yields to any waiting higher-priority request.
+# Without fcntl (Windows) slots are counted within the process only.
+PRIORITIES = ("interactive", "batch", "prefetch")   # highest first
+PRIORITY_SHARE = {"interactive": 1.0, "batch": 0.75, "prefetch": 0.5}
+SLOT_POLL = 0.05   # seconds between retries; other processes release without notifying us
+
+# Per-user part of runtime file names (slots, daemon socket); Windows has no getuid()
+USER_TAG = str(os.getuid()) if hasattr(os, "getuid") else (os.environ.get("USERNAME") or "user")
+
+SLOT_DIR = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+    f"creator_assistant-{USER_TAG}-slots",
+)
+
+_waiting = {name: 0 for name in PRIORITIES}
+_sched_cond = threading.Condition()
+_local_slots: dict[str, set[int]] = {}   # held slots when fcntl is unavailable
+
+
+def _slot_limit(concurrency: int, priority: str) -> int:
+    return max(1, int(concurrency * PRIORITY_SHARE[priority]))
+
+
+def _try_slot(backend: str, limit: int):
+    """Take the first free slot below limit; returns a release() callable or None."""
+    try:
+        import fcntl
+    except ImportError:
+        return _try_local_slot(backend, limit)
+
+    os.makedirs(SLOT_DIR, mode=0o700, exist_ok=True)
+    for i in range(limit):
+        fd = os.open(os.path.join(SLOT_DIR, f"{backend}-{i}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return lambda: os.close(fd)  # closing drops the flock
+        except BlockingIOError:
+            os.close(fd)
+    return None
+
+
+def _try_local_slot(backend: str, limit: int):
+    with _sched_cond:
+        held = _local_slots.setdefault(backend, set())
+        for i in range(limit):
+            if i not in held:
+                held.add(i)
+
+                def release(i: int = i) -> None:
+                    with _sched_cond:
+                        held.discard(i)
+
+                return release
+    return None
+
+
+@contextlib.contextmanager
+def backend_slot(backend: str | None = None, priority: str = "batch"):
+    """
+    Hold one of the backend's machine-wide concurrency slots for the duration of
+    a request, waiting in priority order (interactive > batch > prefetch).
+
+    The slot budget is machine-wide, but the priority queue is not: a request
+    only yields to higher-priority requests waiting in this process. Across
+    processes the only ordering is PRIORITY_SHARE (a batch process can never take
+    the slots reserved above its share); otherwise waiters in different processes
+    race for a freed slot every SLOT_POLL seconds, whatever their priority.
+    """
+    if priority not in PRIORITY_SHARE:
+        raise ValueError(f"Unknown priority '{priority}' (expected one of {', '.join(PRIORITIES)})")
+    name = backend or default_backend()
+    limit = _slot_limit(get_backend(name)["concurrency"], priority)
+    higher = PRIORITIES[:PRIORITIES.index(priority)]
+
+    release = None
+    with _sched_cond:
+        _waiting[priority] += 1
+    try:
+        while release is None:
+            with _sched_cond:
+                if any(_waiting[p] for p in higher):
+                    _sched_cond.wait(SLOT_POLL)
+                    continue
+            release = _try_slot(name, limit)
+            if release is None:
+                with _sched_cond:
+                    _sched_cond.wait(SLOT_POLL)
+    finally:
+        with _sched_cond:
+            _waiting[priority] -= 1
+            _sched_cond.notify_all()
+
+    try:
+        yield
+    finally:
+        release()
+        with _sched_cond:
+            _sched_cond.notify_all()
@@ -1,19 +1,7 @@
-import os
 import sys
 import argparse
 
-from dotenv import load_dotenv
-from openai import OpenAI
-
-# Load environment variables from .env (in Week 1 folder)
-load_dotenv()
-
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    print("ERROR: OPENAI_API_KEY not found in .env")
-    sys.exit(1)
-
-client = OpenAI(api_key=api_key)
+from llm_provider import get_client, backend_model
 
 
 def build_prompt(seed_idea: str, channel: str) -> str:
@@ -94,8 +82,8 @@ def generate_metadata(seed_idea: str, channel: str = "shrouded") -> str:
 
     prompt = build_prompt(seed_idea, channel)
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = get_client().chat.completions.create(
+        model=backend_model("gpt-4o-mini"),
         messages=[
             {
                 "role": "system",
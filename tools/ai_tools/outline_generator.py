@@ -1,19 +1,6 @@
-import os
 import sys
 
-from dotenv import load_dotenv
-from openai import OpenAI
-
-# Load environment variables from .env
-load_dotenv()
-
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    print("ERROR: OPENAI_API_KEY not found in .env")
-    sys.exit(1)
-
-# Create OpenAI client
-client = OpenAI(api_key=api_key)
+from llm_provider import get_client, backend_model
 
 
 def generate_outline(seed_idea: str, beats: int = 10) -> str:
@@ -52,8 +39,8 @@ REQUIREMENTS:
 - The final beat (beat {beats}) must function as a closing image or chilling final revelation.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = get_client().chat.completions.create(
+        model=backend_model("gpt-4o-mini"),
         messages=[
             {
                 "role": "system",
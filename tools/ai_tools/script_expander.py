@@ -1,19 +1,7 @@
-import os
 import sys
 import argparse
 
-from dotenv import load_dotenv
-from openai import OpenAI
-
-# Load environment variables from .env in Week 1
-load_dotenv()
-
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    print("ERROR: No OPENAI_API_KEY found in .env.")
-    sys.exit(1)
-
-client = OpenAI(api_key=api_key)
+from llm_provider import get_client, backend_model
 
 
 def build_prompt(beat_text: str, channel: str, include_broll: bool = True) -> str:
@@ -173,8 +161,8 @@ def expand_script(beat_text: str, channel: str = "shrouded", broll: bool = True)
 
     prompt = build_prompt(beat_text, channel, include_broll=broll)
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    response = get_client().chat.completions.create(
+        model=backend_model("gpt-4o-mini"),
         messages=[
             {
                 "role": "system",